@@ -0,0 +1,74 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from configs import json, time, random
+from flashscore.pricing import PRICING
+from flashscore.vectorized import BATCH_ARBITRAGE
+
+def synthetic_match_odds(matches=10000, bookmakers=100, seed=11, arb_rate=0.02):
+    """
+    Per-match odds lists in the calculate_arbitrage format, with a varying number of bookmakers per match.
+    """
+    rnd = random.Random(seed)
+    odds_by_match = []
+    for _ in range(matches):
+        home_probability = rnd.uniform(0.15, 0.85)
+        arb = rnd.random() < arb_rate
+        odds = []
+        for index in range(rnd.randint(1, bookmakers)):
+            margin = rnd.uniform(-0.02 if arb else 0.01, 0.08)
+            odds.append({
+                'BI': str(index),
+                'XA': round(1 / (home_probability * (1 + margin)), 2),
+                'XB': round(1 / ((1 - home_probability) * (1 + margin)), 2)
+            })
+        odds_by_match.append(odds)
+    return odds_by_match
+
+def main(matches=10000, bookmakers=100, capital=1000, min_profit_percentage=0.5):
+    """
+    Times the scalar reference against the vectorized engine: its padding and compute stages, and end to end
+    with the per-match details PRICING.calculate_arbitrage_batch returns. Padding grows with the widest
+    match, so the vectorized path only wins end to end when matches have few bookmakers (see tests/test_vectorized.py
+    for the equivalence tests).
+    """
+    odds_by_match = synthetic_match_odds(matches, bookmakers)
+
+    started = time.perf_counter()
+    scalar = [PRICING.calculate_arbitrage(odds, capital, min_profit_percentage) for odds in odds_by_match]
+    scalar_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    odds_matrix, bookmaker_ids, counts = BATCH_ARBITRAGE.pad_odds(odds_by_match)
+    pad_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    batch = BATCH_ARBITRAGE.calculate(odds_matrix, counts, capital, min_profit_percentage)
+    compute_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectorized = PRICING.calculate_arbitrage_batch(odds_by_match, capital, min_profit_percentage)
+    end_to_end_seconds = time.perf_counter() - started
+
+    print(json.dumps({
+        'matches': matches,
+        'max_bookmakers': bookmakers,
+        'arbs': int(batch['has_arb'].sum()),
+        'scalar_arbs': sum(1 for has_arb, _ in scalar if has_arb),
+        'mismatches': sum(
+            1 for (has_arb, details), (batch_has_arb, batch_details) in zip(scalar, vectorized)
+            if has_arb != batch_has_arb or (has_arb and details != batch_details)
+        ),
+        'scalar_seconds': round(scalar_seconds, 4),
+        'vectorized_pad_seconds': round(pad_seconds, 4),
+        'vectorized_compute_seconds': round(compute_seconds, 4),
+        'vectorized_end_to_end_seconds': round(end_to_end_seconds, 4),
+        'speedup_compute': round(scalar_seconds / compute_seconds, 1) if compute_seconds else None,
+        'speedup_including_pad': round(scalar_seconds / (pad_seconds + compute_seconds), 1),
+        'speedup_end_to_end': round(scalar_seconds / end_to_end_seconds, 1)
+    }, indent=2))
+
+if __name__ == '__main__':
+    main(
+        matches=int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+        bookmakers=int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    )
@@ -0,0 +1,53 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+from configs import json, time, datetime
+from logger import LOGGER
+
+def synchronous_write(message, log_file_path):
+    """
+    The previous Utils.write_log: open, append one line, close and print on every call.
+    """
+    current_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(log_file_path, 'a',encoding='utf-8') as log_file:
+        log_file.write(f"[{current_datetime}] [LOG] {message}\n")
+    print(message)
+
+def per_call(function, calls):
+    started = time.perf_counter()
+    for index in range(calls):
+        function(index)
+    return (time.perf_counter() - started) / calls * 1e6
+
+def main(calls=20000):
+    directory = tempfile.mkdtemp(prefix='bench_logging_')
+    message = 'Fetching events for {}'
+    stdout = sys.stdout
+    results = {'calls': calls}
+    try:
+        # Console output goes to /dev/null so the terminal does not dominate either measurement
+        sys.stdout = open(os.devnull, 'w')
+        path = os.path.join(directory, 'sync.log')
+        results['synchronous_us_per_call'] = per_call(lambda index: synchronous_write(message.format(index), path), calls)
+
+        for name, options in (('queued', {}), ('queued_json', {'json_lines': True})):
+            logger = LOGGER(os.path.join(directory, f'{name}.log'), max_bytes=1024 * 1024, **options)
+            results[f'{name}_us_per_call'] = per_call(lambda index: logger.log(message.format(index)), calls)
+            started = time.perf_counter()
+            logger.flush()
+            results[f'{name}_drain_seconds'] = time.perf_counter() - started
+            logger.close()
+            results[f'{name}_files'] = len([file for file in os.listdir(directory) if file.startswith(f'{name}.log')])
+
+        filtered = LOGGER(os.path.join(directory, 'filtered.log'), level='INFO')
+        results['filtered_debug_us_per_call'] = per_call(lambda index: filtered.log(message.format(index), level='DEBUG'), calls)
+        filtered.close()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    print(json.dumps({key: round(value, 3) if isinstance(value, float) else value for key, value in results.items()}, indent=2))
+
+if __name__ == '__main__':
+    main(calls=int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
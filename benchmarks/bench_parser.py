@@ -0,0 +1,61 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import resource, subprocess
+from configs import json, time
+from benchmarks.fixtures import fixtures_dir, synthetic_tennis_feed
+from flashscore.parser import PARSER
+
+def read_chunks(path, chunk_size=64 * 1024):
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:break
+            yield chunk
+
+def run_mode(mode, path):
+    """
+    Parses the feed at `path` once in this process and returns throughput and peak RSS.
+    """
+    started = time.perf_counter()
+    matches = 0
+    if mode in ('full', 'compact'):
+        with open(path, 'r', encoding='utf-8') as f:data = f.read()
+        success, parsed = PARSER.parse_flashscore_tennis(data, compact=mode == 'compact')
+        if not success:raise Exception(parsed)
+        matches = sum(len(t['matches']) for t in parsed['tournaments'].values())
+    else:
+        for _ in PARSER.iter_flashscore_tennis(read_chunks(path)):
+            matches += 1
+    elapsed = time.perf_counter() - started
+    return {
+        'mode': mode,
+        'matches': matches,
+        'seconds': round(elapsed, 4),
+        'matches_per_second': round(matches / elapsed, 1) if elapsed else None,
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+def main(path=None, matches=50000):
+    if not path:
+        os.makedirs(fixtures_dir, exist_ok=True)
+        path = os.path.join(fixtures_dir, f'tennis_feed_{matches}.txt')
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:f.write(synthetic_tennis_feed(matches=matches))
+
+    results = []
+    for mode in ('full', 'compact', 'stream'):
+        # Separate processes so each mode reports its own peak RSS
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--mode', mode, path],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(json.dumps({'feed': path, 'feed_mb': round(os.path.getsize(path) / 1024 / 1024, 2), 'results': results}, indent=2))
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--mode':
+        print(json.dumps(run_mode(sys.argv[2], sys.argv[3])))
+    else:
+        main(path=sys.argv[1] if len(sys.argv) > 1 else None)
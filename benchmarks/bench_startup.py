@@ -0,0 +1,38 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import subprocess, statistics
+from configs import json
+
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def import_times(module):
+    """
+    Cold import of `module` in a fresh interpreter under -X importtime.
+    Returns: dict module name -> cumulative microseconds
+    """
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True, cwd=root_dir
+    ).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+def main(module='flashscore.calculator', runs=10, top=10):
+    samples = [import_times(module) for _ in range(runs)]
+    totals = [sample.get(module, 0) for sample in samples]
+    slowest = sorted(samples[-1].items(), key=lambda item: item[1], reverse=True)[1:top + 1]
+    print(json.dumps({
+        'module': module,
+        'runs': runs,
+        'median_ms': round(statistics.median(totals) / 1000, 1),
+        'min_ms': round(min(totals) / 1000, 1),
+        'slowest_imports_ms': {name: round(cumulative / 1000, 1) for name, cumulative in slowest}
+    }, indent=2))
+
+if __name__ == '__main__':
+    main(module=sys.argv[1] if len(sys.argv) > 1 else 'flashscore.calculator')
@@ -0,0 +1,168 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import socket
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+# Telegram reports are sent by the process-wide dispatcher, whose URL is read from configs at import time,
+# so the stub's port is fixed before anything from the repo is imported
+STUB_PORT = free_port()
+os.environ['TELEGRAM_API_URL'] = f'http://127.0.0.1:{STUB_PORT}'
+os.environ.setdefault('LOG_CONSOLE', '0')
+
+import platform
+from configs import json, time
+from benchmarks.fixtures import synthetic_tennis_feed, synthetic_odds_payload
+from benchmarks.stub_server import STUB_UPSTREAM
+from flashscore.parser import PARSER
+from flashscore.feeds import FEEDS
+from flashscore.calculator import CALCULATOR
+from flashscore.pricing import PRICING
+
+def timed(function, repeat):
+    """
+    Best of `repeat` runs, in seconds, with the last run's return value.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))] if values else None
+
+def bench_parser(feed, repeat):
+    seconds, (success, parsed) = timed(lambda: PARSER.parse_flashscore_tennis(feed), repeat)
+    if not success:raise Exception(parsed)
+    matches = sum(len(tournament['matches']) for tournament in parsed['tournaments'].values())
+    return {
+        'matches': matches,
+        'feed_mb': round(len(feed.encode('utf-8')) / 1024 / 1024, 3),
+        'seconds': round(seconds, 4),
+        'matches_per_second': round(matches / seconds, 1) if seconds else None,
+        'mb_per_second': round(len(feed.encode('utf-8')) / 1024 / 1024 / seconds, 2) if seconds else None
+    }, parsed
+
+def bench_pricing(match_ids, capital, min_profit_percentage, bookmakers, repeat):
+    """
+    Per-match cost of PRICING.extract_full_time_odds on a GraphQL payload and of calculate_arbitrage on the
+    extracted odds, over the same synthetic payloads the stub serves.
+    """
+    payloads = [synthetic_odds_payload(match_id, bookmakers=bookmakers) for match_id in match_ids]
+    seconds, extracted = timed(lambda: [PRICING.extract_full_time_odds(payload)[1] for payload in payloads], repeat)
+    extract_us = seconds / len(payloads) * 1e6
+    seconds, arbs = timed(lambda: [PRICING.calculate_arbitrage(odds, capital, min_profit_percentage) for odds in extracted], repeat)
+    return {
+        'extract_full_time_odds_us_per_match': round(extract_us, 2),
+        'calculate_arbitrage_us_per_match': round(seconds / len(extracted) * 1e6, 2),
+        'bookmakers_per_match': bookmakers,
+        'arbs': sum(1 for has_arb, _ in arbs if has_arb)
+    }
+
+def bench_scan(stub, capital, min_profit_percentage, workers, scans):
+    """
+    Full scans through FEEDS and CALCULATOR against the stub: feed download and parse, one odds request per
+    match and geo, merge, arbitrage and reporting. The first scan prices every match; later scans see the
+    same odds and measure the unchanged-odds path.
+    """
+    urls = stub.urls()
+    feeds = FEEDS(pool_maxsize=max(10, workers), proxies=[], feed_url=urls['feed_url'], odds_url=urls['odds_url'])
+    calculator = CALCULATOR(capital=capital, min_profit_percentage=min_profit_percentage, workers=workers, feeds=feeds)
+    runs = []
+    for _ in range(scans):
+        before = stub.stats()
+        started = time.perf_counter()
+        success, result = calculator.get_arbitrage_opportunities()
+        elapsed = time.perf_counter() - started
+        if not success:raise Exception(result)
+        after = stub.stats()
+        runs.append({
+            'seconds': round(elapsed, 4),
+            'requests': after['requests'] - before['requests'],
+            'injected_errors': after['errors'] - before['errors'],
+            'mb_received': round((after['bytes'] - before['bytes']) / 1024 / 1024, 3),
+            'arbs': len(result.get('arbitrage_opportunities', [])),
+            'arb_events': len(result.get('arb_events', []))
+        })
+    calculator.messanger.dispatcher.flush()
+    matches = len(calculator.priced_matches) or 1
+    return {
+        'workers': workers,
+        'matches_priced': len(calculator.priced_matches),
+        'first_scan': runs[0],
+        'first_scan_ms_per_match': round(runs[0]['seconds'] / matches * 1000, 3),
+        'repeat_scans': runs[1:],
+        'repeat_scan_p50_seconds': percentile([run['seconds'] for run in runs[1:]], 0.5),
+        'session_stats': feeds.session_stats()
+    }
+
+def main(sizes=(100, 1000, 10000), workers=32, scans=3, repeat=3, latency=0.002, jitter=0.003, error_rate=0.0,
+         error_status=500, bookmakers=8, capital=1000, min_profit_percentage=0.5, feed_path=None, odds_dir=None,
+         output=None):
+    recorded = None
+    if feed_path:
+        with open(feed_path, 'r', encoding='utf-8') as f:recorded = f.read()
+
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'started_at': int(time.time()),
+        'stub': {'latency': latency, 'jitter': jitter, 'error_rate': error_rate, 'error_status': error_status},
+        'sizes': []
+    }
+    for size in sizes:
+        feed = recorded if recorded is not None else synthetic_tennis_feed(matches=size)
+        parser_result, parsed = bench_parser(feed, repeat)
+        match_ids = [match['match_id'] for tournament in parsed['tournaments'].values() for match in tournament['matches']]
+        entry = {
+            'matches': len(match_ids),
+            'parse': parser_result,
+            'pricing': bench_pricing(match_ids, capital, min_profit_percentage, bookmakers, repeat)
+        }
+        stub = STUB_UPSTREAM(
+            feed=feed, odds_dir=odds_dir, bookmakers=bookmakers, latency=latency, jitter=jitter,
+            error_rate=error_rate, error_status=error_status
+        )
+        stub.start(port=STUB_PORT)
+        try:
+            entry['scan'] = bench_scan(stub, capital, min_profit_percentage, workers, scans)
+        finally:
+            stub.stop()
+        report['sizes'].append(entry)
+        if recorded is not None:break
+
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:f.write(text + '\n')
+    print(text)
+
+if __name__ == '__main__':
+    import argparse
+    arg_parser = argparse.ArgumentParser(description='Offline benchmark of parsing, pricing and full scans against a local stub')
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help='feed sizes in matches (default 100 1000 10000)')
+    arg_parser.add_argument('--workers', type=int, default=32, help='parallel odds requests (default 32)')
+    arg_parser.add_argument('--scans', type=int, default=3, help='full scans per size (default 3)')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per micro benchmark, best is kept (default 3)')
+    arg_parser.add_argument('--latency', type=float, default=0.002, help='stub latency per request in seconds')
+    arg_parser.add_argument('--jitter', type=float, default=0.003, help='extra random stub latency, up to this many seconds')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='share of stub requests that fail')
+    arg_parser.add_argument('--error-status', type=int, default=500, help='status of injected failures (500 or 429)')
+    arg_parser.add_argument('--bookmakers', type=int, default=8, help='bookmakers per synthetic odds payload')
+    arg_parser.add_argument('--feed', default=None, help='recorded f_2_0_1_en_1 feed to use instead of synthetic sizes')
+    arg_parser.add_argument('--odds-dir', default=None, help='directory of recorded <eventId>.json odds payloads')
+    arg_parser.add_argument('--output', default=None, help='also write the JSON report to this file')
+    args = arg_parser.parse_args()
+
+    main(
+        sizes=args.sizes, workers=args.workers, scans=args.scans, repeat=args.repeat, latency=args.latency,
+        jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status, bookmakers=args.bookmakers,
+        feed_path=args.feed, odds_dir=args.odds_dir, output=args.output
+    )
@@ -0,0 +1,82 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from configs import random
+
+benchmarks_dir = os.path.dirname(os.path.abspath(__file__))
+fixtures_dir = os.path.join(benchmarks_dir, 'fixtures')
+
+def synthetic_tennis_feed(matches=1000, matches_per_tournament=20, seed=7, start=1758000000):
+    """
+    Builds a Flashscore-style `f_2_0_1_en_1` feed string with the record layout PARSER expects.
+    """
+    rnd = random.Random(seed)
+    records = ['SA÷2¬']
+    match_count = 0
+    tournament_index = 0
+    while match_count < matches:
+        slug = f'tournament-{tournament_index}'
+        records.append(
+            f'ZA÷ATP - SINGLES: Tournament {tournament_index}¬ZEE÷s{tournament_index}¬ZB÷{tournament_index % 40}¬'
+            f'ZC÷T{tournament_index:05d}¬ZD÷{rnd.choice(["clay", "hard", "grass"])}¬ZE÷u{tournament_index}¬ZF÷0¬'
+            f'ZO÷0¬ZG÷1¬ZH÷1_{tournament_index}¬ZI÷{rnd.choice(["0", "0", "1"])}¬ZL÷/tennis/atp-singles/{slug}/¬'
+            f'ZX÷00{slug}¬ZCC÷0¬ZAF÷World¬'
+        )
+        for _ in range(min(matches_per_tournament, matches - match_count)):
+            match_count += 1
+            start_time = start + rnd.randint(-7200, 3 * 86400)
+            live = start_time < start
+            records.append(
+                f'AA÷m{match_count:07d}¬AD÷{start_time}¬ADE÷{start_time}¬AB÷{"2" if live else "1"}¬CR÷1¬AC÷1¬'
+                f'CX÷Player {match_count}A¬JA÷pa{match_count}¬WU÷player-{match_count}a¬CA÷{rnd.randint(1, 200)}¬'
+                f'FU÷Country {rnd.randint(1, 60)}¬OA÷img{match_count}a.png¬AF÷Player {match_count}B¬JB÷pb{match_count}¬'
+                f'WV÷player-{match_count}b¬CB÷{rnd.randint(1, 200)}¬FV÷Country {rnd.randint(1, 60)}¬OB÷img{match_count}b.png¬'
+                f'AG÷{rnd.randint(0, 2) if live else ""}¬AH÷{rnd.randint(0, 2) if live else ""}¬BA÷{rnd.randint(0, 7)}¬BB÷{rnd.randint(0, 7)}¬'
+                f'AZ÷0¬AY÷0¬AN÷{"y" if live else "n"}¬AO÷{start_time - 600}¬RW÷{rnd.randint(1, 500)}¬BW÷{rnd.randint(1, 500)}¬WM÷PLA¬WN÷PLB¬'
+            )
+        tournament_index += 1
+    records.append('A1÷4b7d1b7c0e2f¬')
+    return '~'.join(records) + '~'
+
+def synthetic_odds_payload(match_id, geo_ip='', bookmakers=8, seed=None, arb_rate=0.02):
+    """
+    Builds a `findOddsByEventId` GraphQL payload with HOME_AWAY/FULL_TIME odds for `bookmakers` bookmakers.
+    """
+    rnd = random.Random(seed if seed is not None else f'{match_id}:{geo_ip}')
+    home_probability = random.Random(match_id).uniform(0.2, 0.8)
+    arb = random.Random(f'arb:{match_id}').random() < arb_rate
+    odds = []
+    settings = []
+    for index in range(bookmakers):
+        bookmaker_id = 10 + index * 3 + (1 if geo_ip and index % 3 == 0 else 0)
+        margin = rnd.uniform(0.02, 0.08)
+        home = round(1 / (home_probability * (1 + margin)), 2)
+        away = round(1 / ((1 - home_probability) * (1 + margin)), 2)
+        if arb and index == 0:
+            home = round(home * 1.12, 2)
+        odds.append({
+            'bookmakerId': bookmaker_id,
+            'bettingType': 'HOME_AWAY',
+            'bettingScope': 'FULL_TIME',
+            'odds': [
+                {'value': str(home), 'active': True, 'eventParticipantId': f'{match_id}-h'},
+                {'value': str(away), 'active': True, 'eventParticipantId': f'{match_id}-a'}
+            ]
+        })
+        settings.append({'bookmaker': {'id': bookmaker_id, 'name': f'Bookmaker {bookmaker_id}'}})
+    return {'data': {'findOddsByEventId': {'odds': odds, 'settings': {'bookmakers': settings}}}}
+
+def load_or_build_feed(path=None, matches=1000):
+    """
+    Returns a recorded feed from `path` if given, otherwise a synthetic feed of `matches` matches.
+    """
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:return f.read()
+    return synthetic_tennis_feed(matches=matches)
+
+if __name__ == '__main__':
+    matches = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    os.makedirs(fixtures_dir, exist_ok=True)
+    path = os.path.join(fixtures_dir, f'tennis_feed_{matches}.txt')
+    with open(path, 'w', encoding='utf-8') as f:f.write(synthetic_tennis_feed(matches=matches))
+    print(path)
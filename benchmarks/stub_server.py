@@ -0,0 +1,203 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import multiprocessing
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from configs import json, time, random, requests, Lock
+from benchmarks.fixtures import synthetic_tennis_feed, synthetic_odds_payload
+
+class STUB_HANDLER(BaseHTTPRequestHandler):
+    """
+    Serves the three upstream calls a scan makes:
+      GET  /2/x/feed/<feed id>   - the events feed (recorded or synthetic), for the feed ids the stub was given
+      GET  /odds/pq_graphql      - a findOddsByEventId payload for ?eventId=&geoIpCode= (recorded or synthetic)
+      POST /bot<token>/sendMessage - a Telegram ok, so arb reports never leave the machine
+    plus GET /__stats with the request, error and byte counts.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, body, content_type='application/json', headers=None):
+        if isinstance(body, str):body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('content-type', content_type)
+        self.send_header('content-length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.stats['bytes'] += len(body)
+
+    def inject(self):
+        """
+        Sleeps for the configured latency and decides whether this request fails.
+        Returns: True when an error response was sent.
+        """
+        server = self.server
+        with server.lock:
+            server.stats['requests'] += 1
+            delay = server.latency + server.random.uniform(0, server.jitter) if server.jitter else server.latency
+            fail = server.error_rate and server.random.random() < server.error_rate
+        if delay > 0:time.sleep(delay)
+        if not fail:return False
+        with server.lock:
+            server.stats['errors'] += 1
+        headers = {'retry-after': '1'} if server.error_status == 429 else None
+        self.reply(server.error_status, json.dumps({'error': 'injected'}), headers=headers)
+        return True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/__stats':
+            return self.reply(200, json.dumps(self.server.stats))
+        if self.inject():return
+
+        if url.path.startswith('/2/x/feed/'):
+            feed = self.server.feeds.get(url.path.rsplit('/', 1)[-1])
+            if feed is None:return self.reply(404, '', content_type='text/plain')
+            return self.reply(200, feed, content_type='text/plain; charset=utf-8')
+
+        if url.path == '/odds/pq_graphql':
+            params = parse_qs(url.query)
+            event_id = params.get('eventId', [''])[0]
+            geo_ip = params.get('geoIpCode', [''])[0]
+            return self.reply(200, self.server.odds_payload(event_id, geo_ip))
+
+        self.reply(404, '', content_type='text/plain')
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('content-length') or 0))
+        if self.path.endswith('/sendMessage'):
+            return self.reply(200, json.dumps({'ok': True, 'result': {}}))
+        self.reply(404, '', content_type='text/plain')
+
+class STUB_SERVER(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, feeds, odds_dir=None, bookmakers=8, arb_rate=0.02, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=500, seed=7):
+        super().__init__(address, STUB_HANDLER)
+        self.feeds = feeds
+        self.odds_dir = odds_dir
+        self.bookmakers = bookmakers
+        self.arb_rate = arb_rate
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = Lock()
+        self.payloads = {}
+        self.stats = {'requests': 0, 'errors': 0, 'bytes': 0}
+
+    def odds_payload(self, event_id, geo_ip):
+        """
+        Recorded `<odds_dir>/<eventId>.json` when present, otherwise a synthetic payload. Encoded once per
+        (event, geo) so repeated scans measure the client, not the stub.
+        """
+        key = (event_id, geo_ip)
+        payload = self.payloads.get(key)
+        if payload is None:
+            path = os.path.join(self.odds_dir, f'{event_id}.json') if self.odds_dir else None
+            if path and os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:payload = f.read()
+            else:
+                payload = json.dumps(synthetic_odds_payload(event_id, geo_ip, bookmakers=self.bookmakers, arb_rate=self.arb_rate))
+            payload = self.payloads[key] = payload.encode('utf-8')
+        return payload
+
+def serve(connection, feeds, options, host='127.0.0.1', port=0):
+    server = STUB_SERVER((host, port), feeds, **options)
+    connection.send(server.server_address[1])
+    connection.close()
+    server.serve_forever()
+
+class STUB_UPSTREAM:
+    """
+    Local stand-in for Flashscore and the Telegram Bot API, run in its own process so the stub's work does
+    not share the GIL with the scanner being measured.
+    Args:
+        matches (int): size of the synthetic tennis feed, ignored when `feed` is given.
+        feed (str): a recorded feed to serve instead of the synthetic one.
+        feed_ids (tuple): feed ids the feed is served under (default the tennis events feed).
+        odds_dir (str): directory of recorded `<eventId>.json` odds payloads; other events get synthetic odds.
+        latency, jitter (float): seconds added to every request, jitter drawn uniformly from [0, jitter].
+        error_rate (float): share of requests answered with `error_status` (500 or 429 with retry-after).
+    """
+    def __init__(self, matches=1000, feed=None, feed_ids=('f_2_0_1_en_1',), odds_dir=None, **options):
+        self.feed = feed if feed is not None else synthetic_tennis_feed(matches=matches)
+        self.feed_ids = feed_ids
+        self.odds_dir = odds_dir
+        self.options = options
+        self.process = None
+        self.base_url = None
+
+    def start(self, host='127.0.0.1', port=0):
+        """
+        Starts the stub process.
+        Returns: base url, e.g. http://127.0.0.1:8765
+        """
+        parent, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=serve,
+            args=(child, {feed_id: self.feed for feed_id in self.feed_ids}, {'odds_dir': self.odds_dir, **self.options}, host, port),
+            daemon=True
+        )
+        self.process.start()
+        port = parent.recv()
+        self.base_url = f'http://{host}:{port}'
+        return self.base_url
+
+    def urls(self):
+        return {
+            'feed_url': f'{self.base_url}/2/x/feed',
+            'odds_url': f'{self.base_url}/odds/pq_graphql',
+            'telegram_url': self.base_url
+        }
+
+    def stats(self):
+        return requests.get(f'{self.base_url}/__stats', timeout=5).json()
+
+    def stop(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+if __name__ == '__main__':
+    import argparse
+    arg_parser = argparse.ArgumentParser(description='Local Flashscore/Telegram stub for offline runs')
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--matches', type=int, default=1000, help='synthetic feed size (default 1000)')
+    arg_parser.add_argument('--feed', default=None, help='recorded feed file to serve instead')
+    arg_parser.add_argument('--odds-dir', default=None, help='directory of recorded <eventId>.json odds payloads')
+    arg_parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help='extra random latency, up to this many seconds')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests that fail (e.g. 0.01)')
+    arg_parser.add_argument('--error-status', type=int, default=500, help='status of injected failures (default 500)')
+    args = arg_parser.parse_args()
+
+    feed = None
+    if args.feed:
+        with open(args.feed, 'r', encoding='utf-8') as f:feed = f.read()
+    stub = STUB_UPSTREAM(
+        matches=args.matches, feed=feed, odds_dir=args.odds_dir, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status
+    )
+    stub.start(port=args.port)
+    print(json.dumps(stub.urls(), indent=2))
+    print('Point the scanner at it with FLASHSCORE_FEED_URL, FLASHSCORE_ODDS_URL and TELEGRAM_API_URL; Ctrl+C to stop')
+    try:
+        stub.process.join()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -1,19 +1,48 @@
 import sys,os
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
-import requests, json, random, uuid, sqlite3,time, string, re, traceback,pytz
-from threading import Thread
-import http.client
-http.client._MAXHEADERS = 1000
-from http.client import REQUEST_TIMEOUT
-from urllib3.exceptions import InsecureRequestWarning
-requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+import json, random, time, string, re, traceback, queue, atexit, importlib
+from threading import Thread, Lock, BoundedSemaphore
 from datetime import datetime,timedelta, timezone
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from fake_useragent import UserAgent
 from itertools import chain
-from dotenv import load_dotenv
+from functools import lru_cache
+from urllib.parse import urlparse
 
+class LAZY_MODULE:
+    """
+    Stands in for a heavy module until one of its attributes is first used, so `from configs import requests`
+    costs nothing for processes (and code paths) that never make a request. `on_load` runs once on the module.
+    """
+    def __init__(self, name, on_load=None):
+        self.__dict__.update(name=name, on_load=on_load, module=None, lock=Lock())
+
+    def load(self):
+        with self.lock:
+            if self.module is None:
+                module = importlib.import_module(self.name)
+                if self.on_load is not None:self.on_load(module)
+                self.__dict__['module'] = module
+        return self.module
+
+    def __getattr__(self, attribute):
+        return getattr(self.module or self.load(), attribute)
+
+    def __repr__(self):
+        return f"<lazy module '{self.name}'{'' if self.module is None else ' (loaded)'}>"
+
+def setup_requests(module):
+    import http.client
+    from urllib3.exceptions import InsecureRequestWarning
+    http.client._MAXHEADERS = 1000
+    module.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+
+requests = LAZY_MODULE('requests', on_load=setup_requests)
+pytz = LAZY_MODULE('pytz')
+sqlite3 = LAZY_MODULE('sqlite3')
+asyncio = LAZY_MODULE('asyncio')
+numpy = LAZY_MODULE('numpy')
+aiohttp = LAZY_MODULE('aiohttp')
 
 
 parent_folder = os.path.abspath(os.path.dirname(__file__))
@@ -21,8 +50,34 @@ env_path = os.path.join(parent_folder, '.env')
 logs_file = os.path.join(parent_folder,'app.log')
 arbs_file = os.path.join(parent_folder,'arb.log')
 
-load_dotenv(env_path)
+if os.path.exists(env_path):
+    from dotenv import load_dotenv
+    load_dotenv(env_path)
 
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN') 
 TELEGRAM_CHANNEL_ID = os.getenv('TELEGRAM_CHANNEL_ID')
 TELEGRAM_BOT_NAME = os.getenv('TELEGRAM_BOT_NAME')
+
+# Upstream endpoints, overridable to point the scanner at a local stub (see benchmarks/stub_server.py)
+FLASHSCORE_FEED_URL = os.getenv('FLASHSCORE_FEED_URL', 'https://global.flashscore.ninja/2/x/feed')
+FLASHSCORE_ODDS_URL = os.getenv('FLASHSCORE_ODDS_URL', 'https://global.ds.lsapp.eu/odds/pq_graphql')
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')
+
+# Geos the odds of every match are requested from, as comma separated geo_ip/sub_geo_ip pairs ('/' is the global, geo-less request)
+ODDS_GEOS = os.getenv('ODDS_GEOS', 'NG/NGLA,/')
+
+# Background logger (see logger.py)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_JSON = os.getenv('LOG_JSON', '0') == '1'
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 50 * 1024 * 1024))
+LOG_BACKUPS = int(os.getenv('LOG_BACKUPS', 5))
+LOG_ROTATE_SECONDS = int(os.getenv('LOG_ROTATE_SECONDS', 0))
+LOG_CONSOLE = os.getenv('LOG_CONSOLE', '1') == '1'
+
+# Stage metrics (see metrics.py); METRICS_PORT > 0 serves them in Prometheus text format on localhost
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+
+# Sharded scanning (see flashscore/sharding.py): where the coordinator listens, and the key workers must present
+SHARD_ADDRESS = os.getenv('SHARD_ADDRESS', '127.0.0.1:6001')
+SHARD_AUTHKEY = os.getenv('SHARD_AUTHKEY', '')
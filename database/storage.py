@@ -0,0 +1,221 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from configs import sqlite3, json, time, queue, traceback, Thread
+from utils import Utils, db_file
+
+class STORAGE:
+    """
+    SQLite store for scanned tournaments, matches, per-bookmaker odds snapshots and detected arbs.
+    Scans are handed to a background writer thread, which turns each one into a single transaction of
+    batched executemany inserts, so the scanner never waits on the disk. The database runs in WAL mode,
+    so queries from other threads read while the writer commits.
+    """
+    schema = [
+        """CREATE TABLE IF NOT EXISTS tournaments (
+            tournament_id TEXT PRIMARY KEY,
+            sport TEXT,
+            name TEXT,
+            category TEXT,
+            slug TEXT,
+            updated_at INTEGER
+        )""",
+        """CREATE TABLE IF NOT EXISTS matches (
+            match_id TEXT PRIMARY KEY,
+            tournament_id TEXT,
+            sport TEXT,
+            home TEXT,
+            away TEXT,
+            start_time INTEGER,
+            updated_at INTEGER
+        )""",
+        """CREATE TABLE IF NOT EXISTS odds_snapshots (
+            match_id TEXT NOT NULL,
+            market TEXT NOT NULL,
+            bookmaker_id TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            price REAL NOT NULL,
+            captured_at INTEGER NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS arbs (
+            match_id TEXT NOT NULL,
+            sport TEXT,
+            market TEXT,
+            event TEXT,
+            lifetime REAL,
+            profit_percentage REAL,
+            profit_amount REAL,
+            total_implied_prob REAL,
+            details TEXT,
+            detected_at INTEGER NOT NULL
+        )""",
+        # Covers best price lookups: the max price per outcome is read straight from the index
+        "CREATE INDEX IF NOT EXISTS idx_odds_match_price ON odds_snapshots (match_id, market, outcome, price)",
+        "CREATE INDEX IF NOT EXISTS idx_odds_bookmaker ON odds_snapshots (bookmaker_id, captured_at)",
+        "CREATE INDEX IF NOT EXISTS idx_odds_captured ON odds_snapshots (captured_at)",
+        "CREATE INDEX IF NOT EXISTS idx_matches_start ON matches (start_time)",
+        "CREATE INDEX IF NOT EXISTS idx_arbs_match ON arbs (match_id, detected_at)",
+        "CREATE INDEX IF NOT EXISTS idx_arbs_detected ON arbs (detected_at)"
+    ]
+
+    def __init__(self, database_file=db_file, max_pending=100, max_tracked=200000):
+        self.database_file = database_file
+        self.pending = queue.Queue(maxsize=max_pending)
+        # Last stored odds per match, so unchanged prices are not snapshotted again
+        self.last_odds = {}
+        self.max_tracked = max_tracked
+        self.stats = {'scans': 0, 'rows': 0, 'dropped': 0, 'errors': 0}
+        self.writer = None
+        self.connect().close()
+        self.start()
+
+    def connect(self):
+        connection = sqlite3.connect(self.database_file, timeout=30, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in self.schema:
+            connection.execute(statement)
+        connection.commit()
+        return connection
+
+    def start(self):
+        if self.writer is not None and self.writer.is_alive():return
+        self.writer = Thread(target=self.write_loop, name='storage-writer', daemon=True)
+        self.writer.start()
+
+    def record_scan(self, result, sport=None, market=None):
+        """
+        Queues a CALCULATOR scan result for the writer thread. Never blocks: when the writer falls
+        `max_pending` scans behind, the scan is dropped and counted.
+        Returns: (success, message)
+        """
+        try:
+            self.pending.put_nowait((result, sport, market, int(time.time())))
+            return True, 'Scan queued'
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False, 'Storage queue full, scan dropped'
+
+    def write_loop(self):
+        connection = self.connect()
+        while True:
+            item = self.pending.get()
+            try:
+                if item is None:break
+                rows = self.scan_rows(*item)
+                with connection:
+                    connection.executemany(
+                        'INSERT OR REPLACE INTO tournaments (tournament_id, sport, name, category, slug, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                        rows['tournaments']
+                    )
+                    connection.executemany(
+                        'INSERT OR REPLACE INTO matches (match_id, tournament_id, sport, home, away, start_time, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        rows['matches']
+                    )
+                    connection.executemany(
+                        'INSERT INTO odds_snapshots (match_id, market, bookmaker_id, outcome, price, captured_at) VALUES (?, ?, ?, ?, ?, ?)',
+                        rows['odds']
+                    )
+                    connection.executemany(
+                        'INSERT INTO arbs (match_id, sport, market, event, lifetime, profit_percentage, profit_amount, total_implied_prob, details, detected_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        rows['arbs']
+                    )
+                self.stats['scans'] += 1
+                self.stats['rows'] += sum(len(table) for table in rows.values())
+            except Exception as error:
+                self.stats['errors'] += 1
+                traceback.print_exception(error)
+            finally:
+                self.pending.task_done()
+        connection.close()
+
+    def scan_rows(self, result, sport, market, captured_at):
+        """
+        Flattens a scan result into the rows of each table. Odds rows are only produced for matches
+        whose prices differ from the last snapshot stored for them.
+        """
+        rows = {'tournaments': [], 'matches': [], 'odds': [], 'arbs': []}
+        if len(self.last_odds) > self.max_tracked:
+            self.last_odds.clear()
+        for tournament_id, tournament in result.get('tournaments', {}).items():
+            rows['tournaments'].append((
+                tournament_id, sport, tournament.get('tournament_name'), tournament.get('category'),
+                tournament.get('tournament_name_from_url'), captured_at
+            ))
+            for match_data in tournament.get('matches', []):
+                match_id = match_data['match_id']
+                rows['matches'].append((
+                    match_id, tournament_id, sport, match_data.get('home_player'), match_data.get('away_player'),
+                    Utils.parse_timestamp(match_data.get('start_time')), captured_at
+                ))
+
+                odds = tuple(tuple(sorted(row.items())) for row in match_data.get('odds', []))
+                if not odds or self.last_odds.get(match_id) == odds:
+                    continue
+                self.last_odds[match_id] = odds
+                for row in match_data['odds']:
+                    for outcome, price in row.items():
+                        if outcome == 'BI':continue
+                        rows['odds'].append((match_id, market, str(row['BI']), outcome, price, captured_at))
+
+        # Arbs are stored as the opened/changed/closed events of CALCULATOR's ARB_TRACKER, not once per scan
+        for event in result.get('arb_events', []):
+            details = event['details']
+            rows['arbs'].append((
+                event['match_id'], sport, event.get('market') or market, event['event'], event.get('lifetime'),
+                details.get('profit_percentage'), details.get('profit_amount'), details.get('total_implied_prob'),
+                json.dumps(details, default=str), captured_at
+            ))
+        return rows
+
+    def flush(self):
+        """
+        Blocks until every queued scan is written.
+        """
+        self.pending.join()
+
+    def close(self):
+        if self.writer is None:return
+        self.pending.put(None)
+        self.writer.join()
+        self.writer = None
+
+    def query(self, sql, params=()):
+        connection = sqlite3.connect(self.database_file, timeout=30)
+        try:
+            connection.row_factory = sqlite3.Row
+            return [dict(row) for row in connection.execute(sql, params).fetchall()]
+        finally:
+            connection.close()
+
+    def best_prices(self, match_id, market='HOME_AWAY:FULL_TIME', since=None):
+        """
+        Best price ever recorded per outcome of a match market, with the bookmaker that offered it.
+        Returns: dict outcome -> {'price', 'bookmaker_id', 'captured_at'}
+        """
+        sql = 'SELECT outcome, MAX(price) AS price, bookmaker_id, captured_at FROM odds_snapshots WHERE match_id = ? AND market = ?'
+        params = [match_id, market]
+        if since is not None:
+            sql += ' AND captured_at >= ?'
+            params.append(int(since))
+        rows = self.query(sql + ' GROUP BY outcome', params)
+        return {row['outcome']: {key: row[key] for key in ('price', 'bookmaker_id', 'captured_at')} for row in rows}
+
+    def price_history(self, match_id, market='HOME_AWAY:FULL_TIME', bookmaker_id=None):
+        sql = 'SELECT bookmaker_id, outcome, price, captured_at FROM odds_snapshots WHERE match_id = ? AND market = ?'
+        params = [match_id, market]
+        if bookmaker_id is not None:
+            sql += ' AND bookmaker_id = ?'
+            params.append(str(bookmaker_id))
+        return self.query(sql + ' ORDER BY captured_at', params)
+
+    def recent_arbs(self, since=None, limit=100):
+        sql = 'SELECT match_id, sport, market, event, lifetime, profit_percentage, profit_amount, total_implied_prob, details, detected_at FROM arbs'
+        params = []
+        if since is not None:
+            sql += ' WHERE detected_at >= ?'
+            params.append(int(since))
+        rows = self.query(sql + ' ORDER BY detected_at DESC LIMIT ?', params + [int(limit)])
+        for row in rows:
+            row['details'] = json.loads(row['details']) if row['details'] else None
+        return rows
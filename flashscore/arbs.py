@@ -0,0 +1,117 @@
+from collections import deque
+from configs import time
+
+class ARB_TRACKER:
+    """
+    Open arbs carried between scans, keyed by (match_id, market, bookmaker ids per outcome).
+    Each scan's arbs are diffed against the open set and turned into events:
+      opened  - a key that was not open before,
+      changed - an open key whose profit moved by at least `hysteresis` percentage points since it was last reported,
+      closed  - an open key the match no longer offers (or whose match left the feed), with its lifetime.
+    Profit moves inside the hysteresis band only refresh the stored details, so an arb that stays open
+    is reported once instead of on every scan.
+    """
+    def __init__(self, hysteresis=0.25, history=10000):
+        self.hysteresis = hysteresis
+        self.open = {}
+        self.by_match = {}
+        self.lifetimes = deque(maxlen=history)
+        self.counts = {'opened': 0, 'changed': 0, 'closed': 0}
+
+    @staticmethod
+    def arb_key(match_id, market, details):
+        if 'bookmaker_ids' in details:
+            bookmakers = tuple(str(bookmaker_id) for bookmaker_id in details['bookmaker_ids'].values())
+        else:
+            bookmakers = (str(details['home_bookmaker_id']), str(details['away_bookmaker_id']))
+        return match_id, market, bookmakers
+
+    def event(self, kind, arb, now, previous_profit=None):
+        self.counts[kind] += 1
+        return {
+            'event': kind,
+            'match_id': arb['match_id'],
+            'market': arb['market'],
+            'bookmakers': arb['bookmakers'],
+            'profit_percentage': arb['profit_percentage'],
+            'previous_profit': previous_profit,
+            'opened_at': arb['opened_at'],
+            'lifetime': round(now - arb['opened_at'], 2),
+            'details': arb['details']
+        }
+
+    def update(self, match_id, arbs, now=None):
+        """
+        Diffs the arbs found for a freshly priced match against its open arbs.
+        Args:
+            arbs (list): (market, arb_details) pairs; arb_details as returned by calculate_arbitrage or
+                calculate_market_arbitrage.
+        Returns: list of opened/changed/closed events for the match.
+        """
+        now = time.time() if now is None else now
+        events = []
+        previous_keys = self.by_match.get(match_id, set())
+        current_keys = set()
+        for market, details in arbs:
+            key = self.arb_key(match_id, market, details)
+            current_keys.add(key)
+            arb = self.open.get(key)
+            if arb is None:
+                arb = self.open[key] = {
+                    'match_id': match_id,
+                    'market': market,
+                    'bookmakers': key[2],
+                    'opened_at': now,
+                    'updated_at': now,
+                    'profit_percentage': details['profit_percentage'],
+                    'reported_profit': details['profit_percentage'],
+                    'peak_profit': details['profit_percentage'],
+                    'details': details
+                }
+                events.append(self.event('opened', arb, now))
+                continue
+
+            arb.update(updated_at=now, profit_percentage=details['profit_percentage'], details=details)
+            arb['peak_profit'] = max(arb['peak_profit'], details['profit_percentage'])
+            if abs(details['profit_percentage'] - arb['reported_profit']) >= self.hysteresis:
+                events.append(self.event('changed', arb, now, previous_profit=arb['reported_profit']))
+                arb['reported_profit'] = details['profit_percentage']
+
+        for key in previous_keys - current_keys:
+            events.append(self.close(key, now))
+        if current_keys:
+            self.by_match[match_id] = current_keys
+        else:
+            self.by_match.pop(match_id, None)
+        return events
+
+    def close(self, key, now):
+        arb = self.open.pop(key)
+        event = self.event('closed', arb, now)
+        self.lifetimes.append(event['lifetime'])
+        return event
+
+    def close_match(self, match_id, now=None):
+        now = time.time() if now is None else now
+        return [self.close(key, now) for key in self.by_match.pop(match_id, set())]
+
+    def retain(self, match_ids, now=None):
+        """
+        Closes the open arbs of matches not in `match_ids` (finished or dropped from the feed).
+        Returns: list of closed events.
+        """
+        match_ids = set(match_ids)
+        events = []
+        for match_id in [match_id for match_id in self.by_match if match_id not in match_ids]:
+            events.extend(self.close_match(match_id, now))
+        return events
+
+    def stats(self):
+        lifetimes = sorted(self.lifetimes)
+        return {
+            'open': len(self.open),
+            **self.counts,
+            'mean_lifetime': round(sum(lifetimes) / len(lifetimes), 2) if lifetimes else None,
+            'median_lifetime': lifetimes[len(lifetimes) // 2] if lifetimes else None,
+            'max_lifetime': lifetimes[-1] if lifetimes else None
+        }
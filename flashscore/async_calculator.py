@@ -0,0 +1,125 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from configs import traceback, time, sys, asyncio
+from utils import Utils
+from flashscore.calculator import CALCULATOR
+from flashscore.async_feeds import ASYNC_FEEDS
+from metrics import METRICS
+
+class ASYNC_CALCULATOR(CALCULATOR):
+    """
+    Runs the CALCULATOR pipeline with odds fetched through ASYNC_FEEDS. Parsing, merging, scoring and
+    reporting are the inherited synchronous methods, so calculate_arbitrage and extract_full_time_odds
+    behave exactly as they do for CALCULATOR.
+    """
+    def __init__(self, capital=0, min_profit_percentage=0, max_in_flight=1000, per_host_limit=200, **options):
+        super().__init__(capital=capital, min_profit_percentage=min_profit_percentage, **options)
+        self.async_feeds = ASYNC_FEEDS(max_in_flight=max_in_flight, per_host_limit=per_host_limit)
+
+    async def fetch_and_parse_events_async(self):
+        try:
+            success, data_or_error = await self.async_feeds.get_sport_events(self.sport, with_odds=False)
+            if not success:
+                return False, data_or_error
+
+            success, parsed_data = self.parse_events(data_or_error)
+            if not success:
+                raise Exception(parsed_data)
+            return True, parsed_data
+        except Exception as error:
+            return False, str(error)
+
+    async def fetch_odds_async(self, match_id, index, geo):
+        odds_response = self.cached_odds(match_id, geo)
+        if odds_response is not None:
+            return (match_id, index), (True, odds_response)
+
+        success, odds_response = await self.async_feeds.get_odds_data(
+            match_id,
+            geo_ip_code=geo['geo_ip'],
+            geo_ip_subdivision_code=geo['sub_geo_ip']
+        )
+        if success:
+            self.store_odds(match_id, geo, odds_response)
+        return (match_id, index), (success, odds_response)
+
+    async def fetch_all_odds_async(self, match_ids):
+        """
+        Async version of fetch_all_odds: schedules every planned (match, geo) request at once and lets
+        ASYNC_FEEDS enforce the in-flight limits.
+        Returns: dict keyed by (match_id, geo_index) with (success, odds_response) values.
+        """
+        tasks = [
+            self.fetch_odds_async(match_id, index, geo)
+            for match_id in match_ids
+            for index, geo in self.geo_plan(match_id)
+        ]
+        return dict(await asyncio.gather(*tasks))
+
+    async def get_arbitrage_opportunities_async(self, country='NG'):
+        try:
+            Utils.write_log(f"------------------------{self.sport_config['name']} arb operation started (async)------------------------")
+            scan_started = time.perf_counter()
+            metrics_started = METRICS.snapshot()
+            await self.async_feeds.open()
+            success, data = await self.fetch_and_parse_events_async()
+            if not success:
+                return False, data
+
+            match_ids = list(self.iter_match_ids(data))
+            odds_results = await self.fetch_all_odds_async(match_ids)
+
+            success, result = self.process_scan(data, odds_results, events=self.forget_matches(match_ids))
+            if not success:
+                return False, result
+
+            result['scan_time'] = round(time.perf_counter() - scan_started, 2)
+            result['stage_metrics'] = METRICS.summary(since=metrics_started)
+            Utils.write_log(METRICS.format_summary(result['stage_metrics']))
+            if self.odds_cache is not None:
+                self.odds_cache.log_stats()
+                self.odds_cache.save()
+            Utils.write_log(f"------------------------{self.sport_config['name']} arb operation done (async)------------------------")
+            return True, result
+
+        except Exception as error:
+            traceback.print_exception(error)
+            return False, str(error)
+
+    def get_arbitrage_opportunities(self, country='NG'):
+        return asyncio.run(self.run_once(country))
+
+    async def run_once(self, country='NG'):
+        try:
+            return await self.get_arbitrage_opportunities_async(country)
+        finally:
+            await self.async_feeds.close()
+
+    async def run_forever(self, wait_time, country='NG'):
+        async with self.async_feeds:
+            while True:
+                success, result = await self.get_arbitrage_opportunities_async(country)
+                Utils.write_log(result, level='DEBUG')
+                if success:
+                    Utils.write_log(f"Scan wall-clock time: {result['scan_time']}s (max {self.async_feeds.max_in_flight} in flight)")
+
+                Utils.write_log(f'Sleeping for {wait_time} seconds')
+                await asyncio.sleep(wait_time)
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5):
+        print("Usage: python async_calculator.py <capital> <wait_time> <min_profit_percentage> [max_in_flight]")
+        sys.exit(1)
+
+    try:
+        capital = float(sys.argv[1])
+        wait_time = int(sys.argv[2])
+        min_profit_percentage = float(sys.argv[3])
+        max_in_flight = int(sys.argv[4]) if len(sys.argv) == 5 else 1000
+    except ValueError:
+        print("Error: Capital, wait time, minimum profit percentage and max in flight must be numbers")
+        sys.exit(1)
+
+    calc = ASYNC_CALCULATOR(capital=capital, min_profit_percentage=min_profit_percentage, max_in_flight=max_in_flight)
+    asyncio.run(calc.run_forever(wait_time, country='NG'))
@@ -0,0 +1,91 @@
+import hashlib
+from utils import Utils
+from configs import random, json, asyncio, aiohttp, urlparse
+from flashscore.feeds import FEEDS, ODDS_PAYLOAD
+from metrics import METRICS
+
+class ASYNC_FEEDS(FEEDS):
+    """
+    asyncio counterpart of FEEDS. Requests are coroutines sharing one aiohttp session, bounded by a
+    global in-flight limit and a per-host limit so thousands of odds requests can be pending at once.
+    """
+    def __init__(self, max_in_flight=1000, per_host_limit=200, timeout=60, **options):
+        super().__init__(**options)
+        self.max_in_flight = max_in_flight
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.session = None
+        self.in_flight = None
+        self.host_limits = {}
+
+    async def open(self):
+        if self.session is not None and not self.session.closed:return
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight, limit_per_host=self.per_host_limit)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self.in_flight = asyncio.Semaphore(self.max_in_flight)
+        self.host_limits = {}
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+        self.session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def host_limit(self, url):
+        host = urlparse(url).netloc
+        if host not in self.host_limits:
+            self.host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self.host_limits[host]
+
+    async def fetch(self, url, params=None, as_json=False):
+        await self.open()
+        proxy = random.choice(self.proxies) if self.proxies else {}
+        proxy_url = proxy.get('https') or proxy.get('http')
+        async with self.in_flight, self.host_limit(url):
+            with METRICS.timer('http_request', proxy=(proxy_url or 'direct').split('@')[-1], host=urlparse(url).netloc) as timer:
+                async with self.session.get(url, params=params, proxy=proxy_url) as response:
+                    body = await response.read()
+                    timer.size = len(body)
+                    if response.status >= 400:raise Exception(body.decode('utf-8', 'replace'))
+                    if as_json:
+                        return ODDS_PAYLOAD(json.loads(body), hashlib.blake2b(body, digest_size=16).hexdigest())
+                    return body.decode(response.get_encoding())
+
+    async def get_sport_events(self, sport, with_odds=False):
+        try:
+            Utils.write_log(f"Fetching events for {sport}")
+            key = 'odd_id' if with_odds else 'alt_id'
+            sport_alt_id = self.sport_alt_ids.get(sport, {}).get(key, None)
+            if not sport_alt_id:
+                label = 'Odd' if with_odds else 'Alt'
+                return False, f"{label} identifier cannot be none for sport: {sport}"
+
+            data = await self.fetch(f'{self.feed_url}/{sport_alt_id}')
+            return True, data
+        except Exception as error:
+            return False, f'Error getting events {error}'
+
+    async def get_odds_data(self, event_id, project_id='2', geo_ip_code='NG', geo_ip_subdivision_code='NGLA'):
+        try:
+            Utils.write_log(f"Fetching events for {event_id}", level='DEBUG')
+            params = {
+                '_hash': 'oce',
+                'eventId': event_id,
+                'projectId': project_id,
+                'geoIpCode': geo_ip_code,
+                'geoIpSubdivisionCode': geo_ip_subdivision_code,
+            }
+            data = await self.fetch(self.odds_url, params=params, as_json=True)
+            return True, data
+        except Exception as error:
+            return False, f'Error getting odds data {error}'
@@ -0,0 +1,115 @@
+from utils import Utils
+from configs import Lock
+
+class BookmakerRegistry:
+    """
+    Process-wide bookmaker metadata, loaded once from flashscore/bookies.json and indexed by bookmaker id,
+    geo and name. Entries keep the `settings.bookmakers` layout of the odds GraphQL response
+    ({'bookmaker': {'id', 'name'}, ...}) plus precomputed display data for the Telegram reports, so
+    resolving the bookmakers of an arb is a dict lookup.
+    Bookmakers seen in odds responses are merged in the first time they appear (`refresh`); later
+    responses only cost a set lookup per bookmaker.
+    """
+    instance = None
+    instance_lock = Lock()
+    reserved = ('bookmaker', 'bookmaker_id', 'geos', 'premium', 'name', 'display_name')
+
+    def __init__(self, data=None):
+        self.by_id = {}
+        self.by_geo = {}
+        self.by_name = {}
+        self.refreshed = set()
+        self.lock = Lock()
+        if data:self.load(data)
+
+    @classmethod
+    def get(cls):
+        """
+        The shared registry, built from flashscore/bookies.json on first use.
+        """
+        if cls.instance is not None:return cls.instance
+        with cls.instance_lock:
+            if cls.instance is None:
+                cls.instance = cls(Utils.load_flash_bookies_file())
+            return cls.instance
+
+    @staticmethod
+    def escape_html(text):
+        return str(text).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+    def entry(self, bookmaker_id):
+        """
+        The entry of a bookmaker id, created empty on first sight. Callers hold the lock.
+        """
+        entry = self.by_id.get(bookmaker_id)
+        if entry is None:
+            entry = self.by_id[bookmaker_id] = {
+                'bookmaker': {'id': int(bookmaker_id) if bookmaker_id.isdigit() else bookmaker_id, 'name': 'Unknown'},
+                'bookmaker_id': bookmaker_id,
+                'geos': (),
+                'premium': False
+            }
+        return entry
+
+    def index(self, entry):
+        name = entry['bookmaker'].get('name') or 'Unknown'
+        entry['name'] = name
+        entry['display_name'] = self.escape_html(name)
+        self.by_name.setdefault(name.lower(), entry)
+        for geo in entry['geos']:
+            self.by_geo.setdefault(geo, {})[entry['bookmaker_id']] = entry
+
+    def load(self, data):
+        """
+        Indexes a bookies.json mapping of geo -> [{'main_bookmaker_id', 'geo_ip', 'name', 'premium_status_id'}].
+        """
+        with self.lock:
+            for geo, bookmakers in data.items():
+                for bookmaker in bookmakers:
+                    entry = self.entry(str(bookmaker['main_bookmaker_id']))
+                    if entry['bookmaker']['name'] == 'Unknown':
+                        entry['bookmaker']['name'] = bookmaker.get('name') or 'Unknown'
+                    if geo not in entry['geos']:
+                        entry['geos'] += (geo,)
+                    entry['premium'] = entry['premium'] or bookmaker.get('premium_status_id') == '1'
+                    self.index(entry)
+
+    def refresh(self, settings):
+        """
+        Merges the `settings.bookmakers` of an odds response; only bookmakers not refreshed before take the lock.
+        """
+        for setting in settings:
+            bookmaker = setting.get('bookmaker') or {}
+            bookmaker_id = str(bookmaker.get('id'))
+            if bookmaker_id in self.refreshed:continue
+            with self.lock:
+                entry = self.entry(bookmaker_id)
+                # The response is the live source of truth for the bookmaker's display fields
+                entry.update({key: value for key, value in setting.items() if key not in self.reserved})
+                entry['bookmaker'] = {**entry['bookmaker'], **bookmaker}
+                self.index(entry)
+                self.refreshed.add(bookmaker_id)
+
+    def resolve(self, bookmaker_id):
+        """
+        Returns: the entry of a bookmaker id, {} when it is unknown.
+        """
+        return self.by_id.get(str(bookmaker_id), {})
+
+    def resolve_many(self, bookmaker_ids):
+        """
+        Returns: dict key -> entry for a {key: bookmaker_id} mapping (e.g. outcome -> bookmaker id).
+        """
+        return {key: self.by_id.get(str(bookmaker_id), {}) for key, bookmaker_id in bookmaker_ids.items()}
+
+    def for_geo(self, geo):
+        """
+        Bookmakers listed for a geo (country code or 'default'), premium ones first.
+        """
+        return sorted(self.by_geo.get(geo, {}).values(), key=lambda entry: not entry['premium'])
+
+    def find(self, name):
+        return self.by_name.get(str(name).lower(), {})
+
+    def stats(self):
+        return {'bookmakers': len(self.by_id), 'geos': len(self.by_geo), 'refreshed_from_responses': len(self.refreshed)}
@@ -0,0 +1,148 @@
+from utils import Utils
+from flashscore.feeds import ODDS_PAYLOAD
+from configs import json, time, os, Lock
+from collections import OrderedDict
+
+class ODDS_CACHE:
+    """
+    In-process LRU cache of GraphQL odds payloads keyed by (match_id, geo). Entries expire sooner the
+    closer the match is to its start time, and the least recently used entries are evicted once the
+    approximate payload size passes `max_bytes`. Optionally persisted to a JSON file between runs.
+    """
+    # (seconds until start, ttl seconds), checked in order; matches already started use the first tier
+    default_ttl_tiers = [
+        (0, 15),
+        (3600, 60),
+        (6 * 3600, 300),
+        (24 * 3600, 900),
+        (float('inf'), 3600)
+    ]
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl_tiers=None, cache_file=None):
+        self.max_bytes = max_bytes
+        self.ttl_tiers = ttl_tiers or self.default_ttl_tiers
+        self.cache_file = cache_file
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0, 'stored': 0}
+        if cache_file:
+            self.load()
+
+    @staticmethod
+    def cache_key(match_id, geo):
+        return f'{match_id}|{geo}'
+
+    def ttl_for(self, start_time, now=None):
+        """
+        TTL in seconds for a match starting at `start_time` (epoch seconds); unknown start times get the shortest TTL.
+        """
+        return self.tier_ttl(self.ttl_tiers, start_time, now)
+
+    @staticmethod
+    def tier_ttl(ttl_tiers, start_time, now=None):
+        if start_time is None:
+            return ttl_tiers[0][1]
+        seconds_to_start = start_time - (now or time.time())
+        for threshold, ttl in ttl_tiers:
+            if seconds_to_start <= threshold:
+                return ttl
+        return ttl_tiers[-1][1]
+
+    def get(self, match_id, geo):
+        key = self.cache_key(match_id, geo)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            if entry['expires'] <= time.time():
+                self.drop(key)
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry['payload']
+
+    def put(self, match_id, geo, payload, start_time=None):
+        key = self.cache_key(match_id, geo)
+        size = len(json.dumps(payload))
+        entry = {
+            'payload': payload,
+            'payload_hash': getattr(payload, 'payload_hash', None),
+            'expires': time.time() + self.ttl_for(start_time),
+            'size': size
+        }
+        with self.lock:
+            if key in self.entries:
+                self.drop(key)
+            self.entries[key] = entry
+            self.size += size
+            self.stats['stored'] += 1
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                oldest = next(iter(self.entries))
+                self.drop(oldest)
+                self.stats['evicted'] += 1
+
+    def drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry['size']
+
+    def purge_expired(self):
+        now = time.time()
+        with self.lock:
+            expired = [key for key, entry in self.entries.items() if entry['expires'] <= now]
+            for key in expired:
+                self.drop(key)
+            self.stats['expired'] += len(expired)
+        return len(expired)
+
+    def log_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            entries = len(self.entries)
+            size = self.size
+        lookups = stats['hits'] + stats['misses']
+        hit_ratio = stats['hits'] / lookups if lookups else 0
+        Utils.write_log(
+            f"Odds cache: {stats['hits']} hits, {stats['misses']} misses ({hit_ratio:.1%} hit ratio), "
+            f"{stats['expired']} expired, {stats['evicted']} evicted, {entries} entries, {size / 1024 / 1024:.1f}MB"
+        )
+        return stats
+
+    def save(self):
+        if not self.cache_file:return False
+        try:
+            self.purge_expired()
+            with self.lock:
+                entries = {key: {'payload': entry['payload'], 'payload_hash': entry['payload_hash'], 'expires': entry['expires']} for key, entry in self.entries.items()}
+            temp_file = f'{self.cache_file}.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(temp_file, self.cache_file)
+            return True
+        except Exception as error:
+            Utils.write_log(f'Error saving odds cache: {error}')
+            return False
+
+    def load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):return False
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            now = time.time()
+            with self.lock:
+                for key, entry in entries.items():
+                    if entry['expires'] <= now:continue
+                    size = len(json.dumps(entry['payload']))
+                    payload_hash = entry.get('payload_hash')
+                    payload = ODDS_PAYLOAD(entry['payload'], payload_hash) if payload_hash else entry['payload']
+                    self.entries[key] = {'payload': payload, 'payload_hash': payload_hash, 'expires': entry['expires'], 'size': size}
+                    self.size += size
+            Utils.write_log(f'Loaded {len(self.entries)} odds cache entries from {self.cache_file}')
+            return True
+        except Exception as error:
+            Utils.write_log(f'Error loading odds cache: {error}')
+            return False
@@ -2,146 +2,625 @@ import sys,os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from collections import defaultdict
-from configs import traceback, time, json, sys
+from configs import traceback, time, json, sys, ThreadPoolExecutor, as_completed, METRICS_PORT, ODDS_GEOS
 from utils import Utils
 from flashscore.feeds import FEEDS
 from flashscore.parser import PARSER
+from flashscore.cache import ODDS_CACHE
+from flashscore.scheduler import SCHEDULER
+from flashscore.oddsbook import OddsBook
+from flashscore.pricing import PRICING
+from flashscore.sports import SPORTS
+from flashscore.arbs import ARB_TRACKER
+from flashscore.bookmakers import BookmakerRegistry
+from flashscore.geomatrix import GEO_MATRIX
+from database.storage import STORAGE
 from telegram.messanger import MESSANGER
+from metrics import METRICS
 
 class CALCULATOR:
-    def __init__(self, capital=0, min_profit_percentage=0):
-        self.feeds = FEEDS()
+    def __init__(self, capital=0, min_profit_percentage=0, workers=1, stream=False, compact=False, delta=False,
+                 cache=False, cache_file=None, cache_max_mb=64, prescreen_margin=None, vectorized=False,
+                 multi_market=False, sport='tennis', feeds=None, storage=None, arb_hysteresis=0.25, reporting=True,
+                 geos=None, adaptive_geos=False, delta_max_age=None):
+        self.sport = SPORTS.key(sport)
+        self.sport_config = SPORTS.get(self.sport)
+        if self.sport_config is None:
+            raise Exception(f'Unsupported sport: {sport}')
+        # Main market of the sport: 2-way sports price it through calculate_arbitrage, others as a market book
+        self.primary_market = SPORTS.main_market(self.sport)
+        self.two_way = self.sport_config['outcomes'] == ('XA', 'XB')
+        self.feeds = feeds or FEEDS(pool_maxsize=max(10, int(workers)))
         self.parser = PARSER
-        self.messanger = MESSANGER()
+        self.messanger = MESSANGER(dispatch=True, sport=self.sport)
         self.balance = capital
         self.min_profit_percentage = min_profit_percentage
+        self.workers = max(1, int(workers))
+        self.stream = stream
+        self.compact = compact
+        self.delta = delta
+        # Longest a delta scan carries a match's prices without refetching them, None for the odds cache TTL tiers
+        self.delta_max_age = delta_max_age
+        self.feed_state = None
+        self.priced_matches = {}
+        self.priced_at = {}
+        self.odds_fingerprints = {}
+        self.arb_tracker = ARB_TRACKER(hysteresis=arb_hysteresis)
+        self.start_times = {}
+        self.prescreen_margin = prescreen_margin
+        self.vectorized = vectorized
+        self.multi_market = multi_market
+        self.storage = storage
+        # False on shard workers (see flashscore.sharding): arbs go back to the coordinator instead of being tracked here
+        self.reporting = reporting
+        self.bookmakers = BookmakerRegistry.get()
+        self.odds_cache = ODDS_CACHE(max_bytes=int(cache_max_mb * 1024 * 1024), cache_file=cache_file) if cache or cache_file else None
+        # Requested in this order; merge_geo_odds keeps the first geo's entry when prices tie
+        self.geos = geos or Utils.parse_geos(ODDS_GEOS)
+        self.geo_matrix = GEO_MATRIX(self.geos, adaptive=adaptive_geos)
+        self.match_scopes = {}
 
-    def fetch_and_parse_tennis_data(self):
+    def parse_events(self, data_string):
+        """
+        Parses an event feed of this sport with the PARSER method its registry entry names.
+        """
+        return getattr(self.parser, self.sport_config['parser'])(data_string, compact=self.compact, sport=self.sport)
+
+    def fetch_and_parse_events(self):
         try:
-            success, data_or_error = self.feeds.get_sport_events('tennis', with_odds=False)
+            success, data_or_error = self.feeds.get_sport_events(self.sport, with_odds=False)
             if not success:
                 return False, data_or_error
 
-            success, parsed_data = self.parser.parse_flashscore_tennis(data_or_error)
+            success, parsed_data = self.parse_events(data_or_error)
             if not success:
                 raise Exception(parsed_data)
             return True, parsed_data
         except Exception as error:
             return False, str(error)
 
-    def extract_full_time_odds(self, odds_data):
+    def fetch_and_parse_tennis_data(self):
+        return self.fetch_and_parse_events()
+
+    def fetch_events_delta(self):
         """
-        Extracts full-time home/away odds from the GraphQL response for each bookmaker, filtering for active odds.
+        Fetches the event feed conditionally and merges it into the previous snapshot.
+        Returns: (success, (data, changed_match_ids))
         """
         try:
-            event_odds = odds_data.get('data', {}).get('findOddsByEventId', {}).get('odds', [])
-            if not event_odds:
-                return True, event_odds
-
-            full_time_odds = []
-            for item in event_odds:
-                if item.get('bettingType') == 'HOME_AWAY' and item.get('bettingScope') == 'FULL_TIME':
-                    bookmaker_id = item.get('bookmakerId')
-                    odds = item.get('odds', [])
-                    if len(odds) == 2 and odds[0].get('active', False) and odds[1].get('active', False):
-                        home_odds = float(odds[0]['value']) if 'value' in odds[0] else 0
-                        away_odds = float(odds[1]['value']) if 'value' in odds[1] else 0
-                        if home_odds > 0 and away_odds > 0:
-                            full_time_odds.append({
-                                'BI': str(bookmaker_id),
-                                'XA': home_odds,
-                                'XB': away_odds
-                            })
-            
-            return True, full_time_odds
+            success, feed = self.feeds.get_sport_events_delta(self.sport, with_odds=False)
+            if not success:
+                return False, feed
+
+            if self.feed_state is not None and not feed['changed']:
+                Utils.write_log(f"{self.sport_config['name']} feed unchanged since last scan")
+                return True, (self.feed_state['data'], set())
+
+            success, merged = self.parser.merge_flashscore_events(self.feed_state, feed['data'], compact=self.compact, sport=self.sport)
+            if not success:
+                raise Exception(merged)
+
+            self.feed_state = merged
+            for match_id in merged['removed']:
+                self.drop_priced(match_id)
+            Utils.write_log(f"{self.sport_config['name']} feed delta: {len(merged['changed'])} changed, {len(merged['removed'])} removed, {len(merged['index'])} total matches")
+            return True, (merged['data'], merged['changed'])
         except Exception as error:
-            return False, f'Error extracting full time odds: {error}'
+            return False, str(error)
+
+    def reuse_max_age(self, match_id, now=None):
+        """
+        Seconds a delta scan may carry a match's last prices: `delta_max_age` when set, else the odds cache TTL
+        for its start time, so prices are refetched more often as the match gets closer.
+        """
+        if self.delta_max_age is not None:
+            return self.delta_max_age
+        return ODDS_CACHE.tier_ttl(self.odds_cache.ttl_tiers if self.odds_cache is not None else ODDS_CACHE.default_ttl_tiers, self.start_times.get(match_id), now)
+
+    def stream_matches(self, data):
+        """
+        Streams the event feed through PARSER.iter_flashscore_events, filling `data` with tournaments and
+        matches as they are parsed and yielding each match id so its odds fetch can start right away.
+        """
+        success, chunks = self.feeds.stream_sport_events(self.sport, with_odds=False)
+        if not success:
+            raise Exception(chunks)
+
+        for tournament, match in self.parser.iter_flashscore_events(chunks, metadata=data['metadata'], compact=self.compact, sport=self.sport):
+            data['tournaments'].setdefault(tournament['tournament_id'], tournament)['matches'].append(match)
+            self.start_times[match['match_id']] = self.parser.start_epoch(match)
+            self.match_scopes[match['match_id']] = self.geo_matrix.scopes(tournament)
+            yield match['match_id']
+
+    def iter_match_ids(self, data):
+        """
+        Yields the match ids of parsed events in feed order, remembering each start time for the odds cache
+        and each tournament for the geo matrix.
+        """
+        for tournament_id, tournament in data.get('tournaments', {}).items():
+            scopes = self.geo_matrix.scopes({**tournament, 'tournament_id': tournament_id})
+            for match in tournament.get('matches', []):
+                self.start_times[match['match_id']] = self.parser.start_epoch(match)
+                self.match_scopes[match['match_id']] = scopes
+                yield match['match_id']
+
+    @METRICS.instrument('extract_full_time_odds', failed=lambda result: not result[0])
+    def extract_full_time_odds(self, odds_data):
+        """
+        Extracts full-time home/away odds from the GraphQL response for each bookmaker (see PRICING.extract_full_time_odds).
+        """
+        return PRICING.extract_full_time_odds(odds_data)
+
+    def extract_markets(self, odds_data):
+        """
+        Indexes every betting type, scope and line of a GraphQL odds response (see PRICING.extract_markets).
+        """
+        return PRICING.extract_markets(odds_data)
+
+    def calculate_market_arbitrage(self, odds_book, capital, market=None):
+        """
+        N-way arbitrage of any market held in an OddsBook, at this calculator's minimum profit (see PRICING.calculate_market_arbitrage).
+        Returns: (has_arb: bool, arb_details: dict or None)
+        """
+        return PRICING.calculate_market_arbitrage(odds_book, capital, self.min_profit_percentage, market=market)
 
+    @METRICS.instrument('calculate_arbitrage', failed=lambda result: isinstance(result[1], str) and result[1].startswith('Error'))
     def calculate_arbitrage(self, odds_data, capital):
         """
-        Calculates arbitrage opportunities for a match's odds.
-        Args:
-            odds_data: List of dicts with bookmaker odds (e.g., [{'BI': '417', 'XA': 1.8, 'XB': 2.0}, ...]).
-            capital: Investment capital for simulation.
+        Calculates arbitrage opportunities for a match's odds, at this calculator's minimum profit (see PRICING.calculate_arbitrage).
         Returns: (has_arb: bool, arb_details: dict or None)
         """
-        try:
-            if not odds_data or len(odds_data) < 2:
-                return False, 'No odds data'
-            
-            # Find best odds for home (XA) and away (XB)
-            best_home_odds = 0
-            best_away_odds = 0
-            home_bookmaker = None
-            away_bookmaker = None
-            
-            for bookmaker in odds_data:
-                home_odds = float(bookmaker.get('XA', 0))
-                away_odds = float(bookmaker.get('XB', 0))
-                if home_odds > best_home_odds:
-                    best_home_odds = home_odds
-                    home_bookmaker = bookmaker.get('BI')
-                if away_odds > best_away_odds:
-                    best_away_odds = away_odds
-                    away_bookmaker = bookmaker.get('BI')
-            
-            if best_home_odds <= 1 or best_away_odds <= 1:
-                return False, 'Low best home_away odds'
-            
-            # Calculate implied probabilities
-            implied_prob_home = 1 / best_home_odds if best_home_odds > 0 else 0
-            implied_prob_away = 1 / best_away_odds if best_away_odds > 0 else 0
-            total_implied_prob = implied_prob_home + implied_prob_away
-            
-            if total_implied_prob >= 1 or total_implied_prob == 0:
-                return False, None
-            
-            # Calculate stakes for arbitrage
-            stake_home = (implied_prob_home / total_implied_prob) * capital
-            stake_away = (implied_prob_away / total_implied_prob) * capital
-            profit_amount = stake_home * best_home_odds - capital  # Profit if home wins (same for away)
-            profit_percentage = (profit_amount / capital) * 100
-            
-            # Check if profit percentage meets minimum threshold
-            if profit_percentage < self.min_profit_percentage:
-                return False, f'Profit percentage {profit_percentage:.2f}% below minimum {self.min_profit_percentage}%'
-            
-            arb_details = {
-                'home_odds': best_home_odds,
-                'away_odds': best_away_odds,
-                'home_bookmaker_id': home_bookmaker,
-                'away_bookmaker_id': away_bookmaker,
-                'stake_home': round(stake_home, 2),
-                'stake_away': round(stake_away, 2),
-                'profit_amount': round(profit_amount, 2),
-                'profit_percentage': round(profit_percentage, 2),
-                'total_implied_prob': round(total_implied_prob, 4)
-            }
-            return True, arb_details
-        except Exception as error:
-            return False, f'Error calculating arb: {error}'
+        return PRICING.calculate_arbitrage(odds_data, capital, self.min_profit_percentage)
+
+    def load_bulk_odds(self):
+        """
+        Pulls the bulk odds feed of the sport once and parses its per-match best prices.
+        Returns: dict match_id -> best prices, or None when the feed is unavailable.
+        """
+        success, feed = self.feeds.get_sport_events(self.sport, with_odds=True)
+        if not success:
+            Utils.write_log(f"Bulk odds feed unavailable, skipping pre-screen: {feed}")
+            return None
+
+        success, bulk_odds = self.parser.parse_flashscore_odds(feed)
+        if not success:
+            Utils.write_log(f"Bulk odds feed unparsable, skipping pre-screen: {bulk_odds}")
+            return None
+        return bulk_odds
+
+    def plausible_arb(self, prices):
+        """
+        Quick bound check on bulk feed prices: a match stays in the scan if the implied probability of its best
+        main market prices (home/away, plus draw for 3-way sports) is within `prescreen_margin` of 1.0, or if
+        the feed has no usable prices for it.
+        """
+        outcomes = self.sport_config['outcomes']
+        if not prices or any(prices.get(outcome, 0) <= 1 for outcome in outcomes):
+            return True
+        return sum(1 / prices[outcome] for outcome in outcomes) <= 1 + self.prescreen_margin
+
+    def prescreen(self, match_ids, bulk_odds, excluded):
+        """
+        Yields the match ids worth a per-match GraphQL fetch; the rest are recorded in `excluded` with their bulk prices.
+        Without bulk odds every match id passes.
+        """
+        if bulk_odds is None:
+            yield from match_ids
+            return
+
+        for match_id in match_ids:
+            prices = bulk_odds.get(match_id)
+            if self.plausible_arb(prices):
+                yield match_id
+            else:
+                excluded[match_id] = prices
+
+    def prescreened_matches(self, data, excluded):
+        """
+        match_data entries for matches the pre-screen ruled out, for process_scan to report without pricing.
+        """
+        prescreened = {}
+        for tournament in data.get('tournaments', {}).values():
+            for match in tournament.get('matches', []):
+                if match['match_id'] in excluded:
+                    prescreened[match['match_id']] = {
+                        **self.parser.match_summary(match),
+                        'odds': [],
+                        'has_arbitrage': False,
+                        'prescreen_odds': excluded[match['match_id']]
+                    }
+        return prescreened
+
+    def close_prescreened(self, excluded):
+        """
+        Closes the open arbs of matches the pre-screen ruled out and drops their last prices, so they are
+        re-priced in full once they pass it again.
+        Returns: list of closed arb events.
+        """
+        events = []
+        for match_id in excluded:
+            self.drop_priced(match_id)
+            for event in self.arb_tracker.close_match(match_id):
+                Utils.write_arb(f"Arb closed on match {match_id} [{event['market']}] after {event['lifetime']}s (outside the pre-screen margin)")
+                events.append(event)
+        return events
+
+    @staticmethod
+    def geo_key(geo):
+        return f"{geo['geo_ip']}/{geo['sub_geo_ip']}"
+
+    def cached_odds(self, match_id, geo):
+        if self.odds_cache is None:return None
+        return self.odds_cache.get(match_id, self.geo_key(geo))
+
+    def store_odds(self, match_id, geo, odds_response):
+        if self.odds_cache is None:return
+        self.odds_cache.put(match_id, self.geo_key(geo), odds_response, start_time=self.start_times.get(match_id))
+
+    @METRICS.instrument('calculate_arbitrage_batch')
+    def calculate_arbitrage_batch(self, odds_by_match, capital):
+        """
+        Vectorized calculate_arbitrage over many matches (see PRICING.calculate_arbitrage_batch).
+        Returns: list of (has_arb: bool, arb_details: dict or None), in input order.
+        """
+        return PRICING.calculate_arbitrage_batch(odds_by_match, capital, self.min_profit_percentage)
+
+    def fetch_odds(self, match_id, geo):
+        """
+        Fetches the GraphQL odds payload of a single match for one geo, serving it from the odds cache when fresh.
+        Returns: (match_id, geo, success, odds_response)
+        """
+        odds_response = self.cached_odds(match_id, geo)
+        if odds_response is not None:
+            return match_id, geo, True, odds_response
+
+        success, odds_response = self.feeds.get_odds_data(
+            match_id,
+            geo_ip_code=geo['geo_ip'],
+            geo_ip_subdivision_code=geo['sub_geo_ip']
+        )
+        if success:
+            self.store_odds(match_id, geo, odds_response)
+        return match_id, geo, success, odds_response
+
+    def geo_plan(self, match_id):
+        """
+        (geo_index, geo) pairs to request for a match: every configured geo, or the ones the geo matrix
+        learned to add value for its tournament when adaptive_geos is on.
+        """
+        return [(index, self.geos[index]) for index in self.geo_matrix.plan(self.match_scopes.get(match_id))]
+
+    def fetch_all_odds(self, match_ids):
+        """
+        Fetches odds for every planned (match, geo) pair, fanning out over `self.workers` threads when workers > 1.
+        Args:
+            match_ids (iterable): Match ids to fetch, consumed lazily so fetches can start before the iterable is exhausted.
+        Returns: dict keyed by (match_id, geo_index) with (success, odds_response) values.
+        """
+        odds_results = {}
+        if self.workers <= 1:
+            for match_id in match_ids:
+                for index, geo in self.geo_plan(match_id):
+                    _, _, success, odds_response = self.fetch_odds(match_id, geo)
+                    odds_results[(match_id, index)] = (success, odds_response)
+            return odds_results
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {}
+            for match_id in match_ids:
+                for index, geo in self.geo_plan(match_id):
+                    futures[executor.submit(self.fetch_odds, match_id, geo)] = (match_id, index)
+
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    _, _, success, odds_response = future.result()
+                except Exception as error:
+                    success, odds_response = False, str(error)
+                odds_results[key] = (success, odds_response)
+        return odds_results
+
+    def merge_geo_odds(self, match_id, odds_results, observe_geos=True):
+        """
+        Merges the odds fetched for a match across geos, in `self.geos` order, into an OddsBook that keeps
+        each bookmaker's best price per outcome along with the geo it came from. With multi_market enabled the
+        other markets of the same payloads are merged into one OddsBook per market. The main market of 3-way
+        sports (football 1X2) is always returned as a market book, with odds_book left empty.
+        Bookmakers first seen in a payload's settings are added to the bookmaker registry.
+        Geos the geo plan skipped are left out, a payload identical to an earlier geo's is only merged once,
+        and what each geo contributed is recorded in the geo matrix (unless `observe_geos` is False, for
+        odds_results that are not one complete fetch of the match's planned geos).
+        Returns: (odds_book, market_books)
+        """
+        odds_book = OddsBook()
+        market_books = {}
+        fetched, hashes, prices, duplicates, failed = [], {}, {}, set(), set()
+
+        for index, geo in enumerate(self.geos):
+            if (match_id, index) not in odds_results:continue
+            fetched.append(index)
+            success, odds_response = odds_results[(match_id, index)]
+            if not success:
+                Utils.write_log(f"Failed to fetch odds for {match_id} with geo {geo['geo_ip']}/{geo['sub_geo_ip']}: {odds_response}", level='WARNING')
+                failed.add(index)
+                continue
+
+            if len(self.geos) > 1:
+                payload_hash = self.geo_matrix.payload_hash(odds_response)
+                if payload_hash in hashes:
+                    duplicates.add(index)
+                    continue
+                hashes[payload_hash] = index
+            geo_prices = prices[index] = {}
+
+            if self.multi_market or not self.two_way:
+                # One pass over the payload indexes every market; the main market is one of them
+                success, markets = self.extract_markets(odds_response)
+                parsed_odds = markets.get(self.primary_market, {}).get('rows', []) if success else markets
+                if success:
+                    fetched_at = time.time()
+                    for key, market in markets.items():
+                        if self.two_way and key == self.primary_market:continue
+                        if not self.multi_market and key != self.primary_market:continue
+                        book = market_books.get(key)
+                        if book is None:
+                            book = market_books[key] = OddsBook(outcomes=market['outcomes'])
+                        for row in market['rows']:
+                            book.upsert_row(row, geo=self.geo_key(geo), timestamp=fetched_at)
+                            for outcome in market['outcomes']:
+                                geo_prices[(key, row['BI'], outcome)] = row[outcome]
+            else:
+                success, parsed_odds = self.extract_full_time_odds(odds_response)
+            if not success:
+                Utils.write_log(f"Error extracting odds for {match_id} with geo {geo['geo_ip']}/{geo['sub_geo_ip']}: {parsed_odds}", level='WARNING')
+                continue
+
+            if not parsed_odds:
+                Utils.write_log(f"No odds data found for {match_id} with geo {geo['geo_ip']}/{geo['sub_geo_ip']}", level='DEBUG')
+                continue
+
+            if self.two_way:
+                fetched_at = time.time()
+                for odds in parsed_odds:
+                    odds_book.upsert_row(odds, geo=self.geo_key(geo), timestamp=fetched_at)
+                    geo_prices[(self.primary_market, odds['BI'], 'XA')] = odds['XA']
+                    geo_prices[(self.primary_market, odds['BI'], 'XB')] = odds['XB']
+
+            self.bookmakers.refresh(odds_response.get('data', {}).get('findOddsByEventId', {}).get('settings', {}).get('bookmakers', []))
+
+        if observe_geos and len(self.geos) > 1:
+            self.geo_matrix.observe(self.match_scopes.get(match_id), fetched, prices, duplicates, failed)
+        return odds_book, market_books
 
     def get_tennis_arbitrage_opportunities(self, country='NG'):
+        return self.get_arbitrage_opportunities(country)
+
+    def get_arbitrage_opportunities(self, country='NG'):
         """
-        Fetches tennis events, retrieves odds for each match using multiple geo IPs, merges odds, calculates arbitrage opportunities, and includes bookmaker details.
+        Fetches the sport's events, retrieves odds for each match using multiple geo IPs, merges odds, calculates arbitrage opportunities, and includes bookmaker details.
         Args:
             country (str): Country code for bookmaker details (default: 'NG').
         Returns: dict with tournaments, matches, odds, and arbitrage details.
         """
         try:
-            Utils.write_log("------------------------Tennis arb operation started------------------------")
-            # Fetch and parse tennis events
-            success, data = self.fetch_and_parse_tennis_data()
+            Utils.write_log(f"------------------------{self.sport_config['name']} arb operation started------------------------")
+            scan_started = time.perf_counter()
+            metrics_started = METRICS.snapshot()
+            reuse = None
+            bulk_odds = self.load_bulk_odds() if self.prescreen_margin is not None else None
+            excluded = {}
+            if self.delta:
+                # Only matches whose feed records changed, or whose prices are older than delta_max_age, are re-priced;
+                # the rest carry their last result
+                success, delta = self.fetch_events_delta()
+                if not success:
+                    return False, delta
+                data, changed = delta
+                match_ids = list(self.iter_match_ids(data))
+                now = time.time()
+                reuse = {
+                    match_id: self.priced_matches[match_id]
+                    for match_id in match_ids
+                    if match_id not in changed and match_id in self.priced_matches
+                    and now - self.priced_at.get(match_id, 0) < self.reuse_max_age(match_id, now)
+                }
+                odds_results = self.fetch_all_odds(self.prescreen((match_id for match_id in match_ids if match_id not in reuse), bulk_odds, excluded))
+            elif self.stream:
+                # Odds fetches start while the feed is still being parsed
+                data = {'tournaments': {}, 'metadata': {}}
+                odds_results = self.fetch_all_odds(self.prescreen(self.stream_matches(data), bulk_odds, excluded))
+            else:
+                # Fetch and parse the sport's events
+                success, data = self.fetch_and_parse_events()
+                if not success:
+                    return False, data
+
+                # Fetch odds for every match and geo up front, concurrently when workers > 1
+                odds_results = self.fetch_all_odds(self.prescreen(self.iter_match_ids(data), bulk_odds, excluded))
+
+            # The feed is complete once its odds are fetched (stream mode included), so matches that left it are
+            # closed now and their events stored with this scan
+            closed = self.forget_matches(self.iter_match_ids(data))
+            if bulk_odds is not None:
+                closed.extend(self.close_prescreened(excluded))
+                reuse = {**(reuse or {}), **self.prescreened_matches(data, excluded)}
+                Utils.write_log(f"Pre-screen skipped {len(excluded)} matches outside a {self.prescreen_margin:.1%} arb margin")
+
+            success, result = self.process_scan(data, odds_results, reuse=reuse, events=closed)
             if not success:
-                return False, data
-            
+                return False, result
+
+            result['scan_time'] = round(time.perf_counter() - scan_started, 2)
+            # Stages of every scan running in the process, so concurrent sports show in each other's summary
+            result['stage_metrics'] = METRICS.summary(since=metrics_started)
+            Utils.write_log(METRICS.format_summary(result['stage_metrics']))
+            if len(self.geos) > 1:
+                Utils.write_log(f"Geo matrix: {self.geo_matrix.summary()}")
+            if self.odds_cache is not None:
+                self.odds_cache.log_stats()
+                self.odds_cache.save()
+            Utils.write_log(f"------------------------{self.sport_config['name']} arb operation done------------------------")
+            return True, result
+
+        except Exception as error:
+            traceback.print_exception(error)
+            return False, str(error)
+
+    @staticmethod
+    def odds_fingerprint(odds_book, market_books):
+        """
+        Hashable snapshot of every merged price of a match, to tell whether its odds moved since the last scan.
+        """
+        return (
+            tuple(tuple(row.items()) for row in odds_book.rows()),
+            tuple((market, tuple(tuple(row.items()) for row in book.rows())) for market, book in sorted(market_books.items()))
+        )
+
+    def odds_unchanged(self, match_id, fingerprint):
+        return match_id in self.priced_matches and self.odds_fingerprints.get(match_id) == fingerprint
+
+    def drop_priced(self, match_id):
+        """
+        Forgets a match's last prices, so its next odds are priced (and its arbs tracked) from scratch.
+        """
+        self.priced_matches.pop(match_id, None)
+        self.odds_fingerprints.pop(match_id, None)
+        self.priced_at.pop(match_id, None)
+
+    def forget_matches(self, match_ids):
+        """
+        Drops the per-match state of matches that left the feed and closes their open arbs.
+        Returns: list of closed arb events, for the caller to store with its scan (or through record_arb_events).
+        """
+        match_ids = set(match_ids)
+        for match_id in [match_id for match_id in self.priced_matches if match_id not in match_ids]:
+            self.drop_priced(match_id)
+        for match_id in [match_id for match_id in self.match_scopes if match_id not in match_ids]:
+            del self.match_scopes[match_id]
+        events = self.arb_tracker.retain(match_ids)
+        for event in events:
+            Utils.write_arb(f"Arb closed on match {event['match_id']} [{event['market']}] after {event['lifetime']}s (match left the feed)")
+        return events
+
+    def record_arb_events(self, events):
+        """
+        Stores arb events that are not part of a stored scan result.
+        """
+        if events and self.storage is not None:
+            self.storage.record_scan({'arb_events': events}, sport=self.sport, market=self.primary_market)
+
+    def track_arbs(self, match_data, found, on_delivered=None):
+        """
+        Diffs the arbs found on a freshly priced match against its open arbs; only arbs that opened, or
+        moved past the hysteresis band, are reported.
+        Args:
+            found (list): (market, arb_details) pairs of the match.
+            on_delivered (callable): Optional on_delivered(event, delivered_at), called once the Telegram report of an event is delivered.
+        Returns: list of arb events.
+        """
+        match_id = match_data['match_id']
+        events = self.arb_tracker.update(match_id, found)
+        for event in events:
+            if event['event'] == 'closed':
+                Utils.write_arb(f"Arb closed on match {match_id} [{event['market']}] after {event['lifetime']}s")
+                continue
+            self.report_arb_event(match_data, event, on_delivered=on_delivered)
+        return events
+
+    def report_arb_event(self, match_data, event, on_delivered=None):
+        """
+        Logs an opened/changed arb to arb.log and queues its Telegram report.
+        """
+        match_id = match_data['match_id']
+        delivered = None if on_delivered is None else lambda delivered_at: on_delivered(event, delivered_at)
+        arb_details = event['details']
+        status = 'found' if event['event'] == 'opened' else f"changed from {event['previous_profit']}% after {event['lifetime']}s"
+        if 'home_odds' not in arb_details:
+            legs = ', '.join(
+                f"{outcome} @ {arb_details['odds'][outcome]} ({arb_details['bookmakers'][outcome].get('bookmaker', {}).get('name', 'Unknown')})"
+                for outcome in arb_details['odds']
+            )
+            Utils.write_arb(f"Market arb {status} on match {match_id} [{event['market']}] -- {arb_details['profit_percentage']}%: {legs}")
+            success,msg = self.messanger.report_market_arb(match_data, arb_details, on_delivered=delivered)
+            if not success:Utils.write_log(msg, level='WARNING')
+            return
+
+        Utils.write_arb(
+            f"""
+                /* --------------------------------------------------------------- */
+                An arb opportunity {status} on match {match_id}
+                {match_data["match_id"]} -- {arb_details["profit_percentage"]}%
+                Home: {match_data["home_player"]} @ {arb_details["home_odds"]} (Bookmaker: {arb_details["home_bookmaker"].get("bookmaker", {}).get("name", "Unknown")})
+                Away: {match_data["away_player"]} @ {arb_details["away_odds"]} (Bookmaker: {arb_details["away_bookmaker"].get("bookmaker", {}).get("name", "Unknown")})
+                Stakes: Home {arb_details["stake_home"]}, Away {arb_details["stake_away"]}
+                Profit Amount: {arb_details["profit_amount"]}
+                Profit: {arb_details["profit_percentage"]}%
+                /* --------------------------------------------------------------- */
+            """
+        )
+        # Only queued for the Telegram dispatcher; a failed report must not abort the scan
+        success,msg = self.messanger.report_arb(match_data,arb_details, on_delivered=delivered)
+        if not success:Utils.write_log(msg, level='WARNING')
+
+    @staticmethod
+    def match_opportunities(tournament_id, tournament, match_data):
+        """
+        arbitrage_opportunities entries of a priced match: its main market arb, then the arb of every other market.
+        """
+        opportunity = {
+            'tournament_id': tournament_id,
+            'tournament_name': tournament['tournament_name'],
+            'match_id': match_data['match_id'],
+            'home_player': match_data['home_player'],
+            'away_player': match_data['away_player']
+        }
+        opportunities = []
+        if match_data.get('has_arbitrage'):
+            opportunities.append({**opportunity, 'arbitrage_details': match_data['arbitrage_details']})
+        for market_details in match_data.get('market_arbitrage', []):
+            opportunities.append({**opportunity, 'market': market_details['market'], 'arbitrage_details': market_details})
+        return opportunities
+
+    def process_scan(self, data, odds_results, reuse=None, observe_geos=True, events=None):
+        """
+        Merges prefetched odds, calculates arbitrage and reports arbs for every parsed match, in feed order.
+        Args:
+            data (dict): Parsed events from PARSER.parse_flashscore_events.
+            odds_results (dict): (match_id, geo_index) -> (success, odds_response), as returned by fetch_all_odds.
+            reuse (dict): match_id -> match_data from an earlier scan, carried over without re-pricing or re-reporting.
+            observe_geos (bool): Record the geos' contributions in the geo matrix (see merge_geo_odds).
+            events (list): Arb events the caller emitted for this scan outside pricing (e.g. matches that left the feed), reported and stored with it.
+        Returns: dict with tournaments, matches, odds, and arbitrage details.
+        """
+        try:
             result = {
                 'tournaments': {},
                 'metadata': data.get('metadata', {}),
                 'arbitrage_opportunities': []
             }
+            if not self.reporting:
+                result['priced'] = {}
             iteration_profit = 0
             iteration_arbs = 0
+            unchanged = 0
+            events = list(events or [])
+
+            merged = {}
+            fingerprints = {}
+            batch_results = {}
+            if self.vectorized:
+                # Merge every match first so arbitrage is computed for the whole scan in one vectorized pass
+                for tournament in data.get('tournaments', {}).values():
+                    for match in tournament.get('matches', []):
+                        if reuse is None or match['match_id'] not in reuse:
+                            merged[match['match_id']] = self.merge_geo_odds(match['match_id'], odds_results, observe_geos)
+                            fingerprints[match['match_id']] = self.odds_fingerprint(*merged[match['match_id']])
+                priced_ids = [
+                    match_id for match_id, (odds_book, _) in merged.items()
+                    if odds_book and not self.odds_unchanged(match_id, fingerprints[match_id])
+                ]
+                batch = self.calculate_arbitrage_batch([merged[match_id][0].rows() for match_id in priced_ids], self.balance)
+                batch_results = dict(zip(priced_ids, batch))
             
             # Process each tournament and match
             for tournament_id, tournament in data.get('tournaments', {}).items():
@@ -157,158 +636,251 @@ class CALCULATOR:
                 for match in tournament.get('matches', []):
                     has_arb = False
                     match_id = match['match_id']
-                    project_id = '2'  # From params in the code
-                    
-                    # Fetch odds for the match with multiple geo IPs
-                    multi_odd_data = [
-                        {'geo_ip': 'NG', 'sub_geo_ip': 'NGLA'},
-                        {'geo_ip': '', 'sub_geo_ip': ''}
-                    ]
-                    merged_odds = []
-                    all_bookmakers = []
-                    seen_bookmakers = set()
-                    
-                    for geo in multi_odd_data:
-                        success, odds_response = self.feeds.get_odds_data(
-                            match_id,
-                            geo_ip_code=geo['geo_ip'],
-                            geo_ip_subdivision_code=geo['sub_geo_ip']
-                        )
-                        if not success:
-                            Utils.write_log(f"Failed to fetch odds for {match_id} with geo {geo['geo_ip']}/{geo['sub_geo_ip']}: {odds_response}")
-                            continue
+                    if reuse is not None and match_id in reuse:
+                        tournament_data['matches'].append(reuse[match_id])
+                        result['arbitrage_opportunities'].extend(self.match_opportunities(tournament_id, tournament, reuse[match_id]))
+                        continue
 
-                        success, parsed_odds = self.extract_full_time_odds(odds_response)
-                        if not success:
-                            Utils.write_log(f"Error extracting odds for {match_id} with geo {geo['geo_ip']}/{geo['sub_geo_ip']}: {parsed_odds}")
-                            continue
-                        
-                        if not parsed_odds:
-                            Utils.write_log(f"No odds data found for {match_id} with geo {geo['geo_ip']}/{geo['sub_geo_ip']}")
-                            continue
+                    if match_id in merged:
+                        odds_book, market_books = merged[match_id]
+                    else:
+                        odds_book, market_books = self.merge_geo_odds(match_id, odds_results, observe_geos)
 
-                        # Merge odds, avoiding duplicates
-                        for odds in parsed_odds:
-                            bookmaker_id = odds['BI']
-                            if bookmaker_id not in seen_bookmakers:
-                                merged_odds.append(odds)
-                                seen_bookmakers.add(bookmaker_id)
-                            else:
-                                # If bookmaker exists, keep the higher odds
-                                existing = next((o for o in merged_odds if o['BI'] == bookmaker_id), None)
-                                if existing and (odds['XA'] > existing['XA'] or odds['XB'] > existing['XB']):
-                                    merged_odds.remove(existing)
-                                    merged_odds.append(odds)
-
-                        # Collect bookmaker details
-                        bookmakers = odds_response.get('data', {}).get('findOddsByEventId', {}).get('settings', {}).get('bookmakers', [])
-                        all_bookmakers.extend(bookmakers)
-
-                    if not merged_odds:
-                        Utils.write_log(f'No valid odds data for {match_id} from any geo')
+                    if not odds_book and not market_books:
+                        Utils.write_log(f'No valid odds data for {match_id} from any geo', level='DEBUG')
                         match_data = {
-                            'match_id': match_id,
-                            'home_player': match['home_player']['name'],
-                            'away_player': match['away_player']['name'],
-                            'start_time': match['start_time'],
-                            'home_sets_won': match['home_sets_won'],
-                            'away_sets_won': match['away_sets_won'],
-                            'set_scores': match['set_scores'],
+                            **self.parser.match_summary(match),
                             'odds_error': 'No valid odds data'
                         }
                         tournament_data['matches'].append(match_data)
+                        # Its arbs are closed (here or by the coordinator), so the same prices coming back must be re-priced
+                        self.drop_priced(match_id)
+                        if not self.reporting:
+                            result['priced'][match_id] = []
+                            continue
+                        events.extend(self.arb_tracker.close_match(match_id))
                         continue
 
-                    # Create bookie_map from all bookmakers, prioritizing NG/NGLA
-                    bookie_map = {}
-                    for b in all_bookmakers:
-                        bookmaker_id = str(b.get('bookmaker', {}).get('id'))
-                        if bookmaker_id not in bookie_map:
-                            bookie_map[bookmaker_id] = b
+                    fingerprint = fingerprints[match_id] if match_id in fingerprints else self.odds_fingerprint(odds_book, market_books)
+                    if self.odds_unchanged(match_id, fingerprint):
+                        # Same prices as the last scan: nothing to recompute and no arb event to emit, but its arbs are still open
+                        tournament_data['matches'].append(self.priced_matches[match_id])
+                        result['arbitrage_opportunities'].extend(self.match_opportunities(tournament_id, tournament, self.priced_matches[match_id]))
+                        self.priced_at[match_id] = time.time()
+                        unchanged += 1
+                        continue
+                    self.odds_fingerprints[match_id] = fingerprint
 
                     # Calculate arbitrage with merged odds
-                    has_arb, arb_details = self.calculate_arbitrage(merged_odds, self.balance)
+                    if match_id in batch_results:
+                        has_arb, arb_details = batch_results[match_id]
+                    else:
+                        has_arb, arb_details = self.calculate_arbitrage(odds_book, self.balance)
 
                     match_data = {
-                        'match_id': match_id,
-                        'home_player': match['home_player']['name'],
-                        'away_player': match['away_player']['name'],
-                        'start_time': match['start_time'],
-                        'home_sets_won': match['home_sets_won'],
-                        'away_sets_won': match['away_sets_won'],
-                        'set_scores': match['set_scores'],
-                        'odds': merged_odds,
+                        **self.parser.match_summary(match),
+                        'odds': (odds_book if self.two_way else market_books.get(self.primary_market, odds_book)).rows(),
                         'has_arbitrage': has_arb
                     }
+                    found = []
                     
                     if has_arb:
                         # Add bookmaker details for arbitrage
-                        arb_details['home_bookmaker'] = bookie_map.get(arb_details['home_bookmaker_id'], {})
-                        arb_details['away_bookmaker'] = bookie_map.get(arb_details['away_bookmaker_id'], {})
+                        arb_details['home_bookmaker'] = self.bookmakers.resolve(arb_details['home_bookmaker_id'])
+                        arb_details['away_bookmaker'] = self.bookmakers.resolve(arb_details['away_bookmaker_id'])
                         match_data['arbitrage_details'] = arb_details
-                        result['arbitrage_opportunities'].append({
-                            'tournament_id': tournament_id,
-                            'tournament_name': tournament['tournament_name'],
-                            'match_id': match_id,
-                            'home_player': match['home_player']['name'],
-                            'away_player': match['away_player']['name'],
-                            'arbitrage_details': arb_details
-                        })
-                        # Simulate profit and update iteration counters
-                        iteration_profit += arb_details['profit_amount']
-                        iteration_arbs += 1
-
-                    tournament_data['matches'].append(match_data)
-                    if has_arb:
-                        Utils.write_arb(
-                            f"""
-                                /* --------------------------------------------------------------- */
-                                An arb opportunity found on match {match_id}
-                                {match_data["match_id"]} -- {match_data["arbitrage_details"]["profit_percentage"]}%
-                                Home: {match_data["home_player"]} @ {arb_details["home_odds"]} (Bookmaker: {arb_details["home_bookmaker"].get("bookmaker", {}).get("name", "Unknown")})
-                                Away: {match_data["away_player"]} @ {arb_details["away_odds"]} (Bookmaker: {arb_details["away_bookmaker"].get("bookmaker", {}).get("name", "Unknown")})
-                                Stakes: Home {arb_details["stake_home"]}, Away {arb_details["stake_away"]}
-                                Profit Amount: {arb_details["profit_amount"]}
-                                Profit: {arb_details["profit_percentage"]}%
-                                /* --------------------------------------------------------------- */
-                            """
-                        )
-                        success,msg = self.messanger.report_arb(match_data,arb_details)
-                        if not success:raise Exception(msg)
+                        found.append((self.primary_market, arb_details))
 
                     elif isinstance(arb_details, str) and 'below minimum' in arb_details:
                         Utils.write_log(f"Skipped arb for {match_id}: {arb_details}")
+
+                    # Other markets from the same payloads (sets, totals, handicaps, 3-way)
+                    for market, market_book in market_books.items():
+                        has_market_arb, market_details = self.calculate_market_arbitrage(market_book, self.balance, market=market)
+                        if not has_market_arb:continue
+
+                        market_details['bookmakers'] = self.bookmakers.resolve_many(market_details['bookmaker_ids'])
+                        match_data.setdefault('market_arbitrage', []).append(market_details)
+                        found.append((market, market_details))
+
+                    tournament_data['matches'].append(match_data)
+                    result['arbitrage_opportunities'].extend(self.match_opportunities(tournament_id, tournament, match_data))
+                    self.priced_matches[match_id] = match_data
+                    self.priced_at[match_id] = time.time()
+
+                    if not self.reporting:
+                        result['priced'][match_id] = found
+                        continue
+
+                    for event in self.track_arbs(match_data, found):
+                        events.append(event)
+                        if event['event'] == 'opened':
+                            # Simulate profit once per arb, not once per scan it stays open
+                            iteration_profit += event['details']['profit_amount']
+                            iteration_arbs += 1
                 
                 result['tournaments'][tournament_id] = tournament_data
             
             # Update balance with iteration profit
             self.balance += iteration_profit
-            Utils.write_log(f"Iteration Summary: {iteration_arbs} arbs found, Total Profit: {iteration_profit:.2f}, New Balance: {self.balance:.2f}")
-            Utils.write_log("------------------------Tennis arb operation done------------------------")
+            result['arb_events'] = events
+            if self.reporting:
+                # Non-reporting callers (shard workers, the live scanner) summarize on their side
+                Utils.write_log(f"Iteration Summary: {iteration_arbs} arbs found, Total Profit: {iteration_profit:.2f}, New Balance: {self.balance:.2f}")
+                Utils.write_log(f"Arb events: {sum(event['event'] == 'opened' for event in events)} opened, {sum(event['event'] == 'changed' for event in events)} changed, {sum(event['event'] == 'closed' for event in events)} closed, {unchanged} matches with unchanged odds skipped; {self.arb_tracker.stats()}")
+            if self.storage is not None:
+                # Written by the storage thread, the scan does not wait for the database; a copy, as callers add scan_time and metrics
+                success, msg = self.storage.record_scan(dict(result), sport=self.sport, market=self.primary_market)
+                if not success:Utils.write_log(msg)
             return True, result
         
         except Exception as error:
             traceback.print_exception(error)
             return False, str(error)
 
+    def load_events(self):
+        """
+        Fetches the event feed (conditionally when delta is enabled) for the scheduled scanner.
+        Returns: (success, parsed data)
+        """
+        if self.delta:
+            success, delta = self.fetch_events_delta()
+            return (True, delta[0]) if success else (False, delta)
+        return self.fetch_and_parse_events()
+
+    def run_scheduled(self, feed_interval=300, batch_size=None, scheduler=None):
+        """
+        Continuously refreshes the most urgent matches instead of rescanning everything every `wait_time`.
+        The event feed is reloaded every `feed_interval` seconds; in between, due matches are popped from
+        the SCHEDULER in batches, priced through process_scan and rescheduled from their new odds.
+        """
+        scheduler = scheduler or SCHEDULER(outcomes=self.sport_config['outcomes'])
+        batch_size = batch_size or self.workers * 4
+        matches = {}
+        last_feed = 0
+        while True:
+            try:
+                now = time.time()
+                if now - last_feed >= feed_interval:
+                    success, data = self.load_events()
+                    if success:
+                        matches = {
+                            match['match_id']: (tournament, match)
+                            for tournament in data.get('tournaments', {}).values()
+                            for match in tournament.get('matches', [])
+                            if not self.parser.is_finished(match)
+                        }
+                        scheduler.sync({
+                            match_id: (self.parser.start_epoch(match), self.parser.is_live(match))
+                            for match_id, (tournament, match) in matches.items()
+                        })
+                        for match_id, (tournament, match) in matches.items():
+                            self.start_times[match_id] = self.parser.start_epoch(match)
+                        self.record_arb_events(self.forget_matches(matches))
+                        Utils.write_log(f"Scheduler tracking {len(scheduler.matches)} matches")
+                    else:
+                        Utils.write_log(f"Failed to refresh {self.sport} events: {data}")
+                    last_feed = now
+
+                due = [match_id for match_id in scheduler.pop_due(limit=batch_size) if match_id in matches]
+                if not due:
+                    next_deadline = scheduler.next_deadline()
+                    wake_at = last_feed + feed_interval
+                    if next_deadline is not None:
+                        wake_at = min(wake_at, next_deadline)
+                    time.sleep(max(0.1, min(wake_at - time.time(), feed_interval)))
+                    continue
+
+                odds_results = self.fetch_all_odds(due)
+                batch = {'tournaments': {}, 'metadata': {}}
+                for match_id in due:
+                    tournament, match = matches[match_id]
+                    tournament_id = tournament['tournament_id']
+                    if tournament_id not in batch['tournaments']:
+                        batch['tournaments'][tournament_id] = {
+                            'tournament_name': tournament['tournament_name'],
+                            'sport_name': tournament['sport_name'],
+                            'category': tournament['category'],
+                            'tournament_name_from_url': tournament['tournament_name_from_url'],
+                            'matches': []
+                        }
+                    batch['tournaments'][tournament_id]['matches'].append(match)
+
+                success, result = self.process_scan(batch, odds_results)
+                priced = {}
+                if success:
+                    priced = {
+                        match_data['match_id']: match_data.get('odds', [])
+                        for tournament in result['tournaments'].values()
+                        for match_data in tournament['matches']
+                    }
+                for match_id in due:
+                    scheduler.record(match_id, priced.get(match_id, []))
+            except Exception as error:
+                traceback.print_exception(error)
+                time.sleep(1)
+
 # Example usage
 if __name__ == "__main__":
-    if len(sys.argv) != 4:
-        print("Usage: python calculator.py <capital> <wait_time> <min_profit_percentage>")
-        sys.exit(1)
-    
-    try:
-        capital = float(sys.argv[1])
-        wait_time = int(sys.argv[2])
-        min_profit_percentage = float(sys.argv[3])
-    except ValueError:
-        print("Error: Capital, wait time, and minimum profit percentage must be numbers")
-        sys.exit(1)
-
-    calc = CALCULATOR(capital=capital, min_profit_percentage=min_profit_percentage)
+    import argparse
+    arg_parser = argparse.ArgumentParser(description='Single sport arbitrage scanner (see flashscore/scanner.py for all sports)')
+    arg_parser.add_argument('capital', type=float)
+    arg_parser.add_argument('wait_time', type=int)
+    arg_parser.add_argument('min_profit_percentage', type=float)
+    arg_parser.add_argument('workers', type=int, nargs='?', default=1, help='parallel odds requests (default 1)')
+    arg_parser.add_argument('--stream', action='store_true', help='start odds fetches while the feed is parsed')
+    arg_parser.add_argument('--compact', action='store_true', help='keep parsed matches as compact records')
+    arg_parser.add_argument('--delta', action='store_true', help='only re-price matches whose feed records changed')
+    arg_parser.add_argument('--delta-max-age', type=float, default=None, help='with --delta, seconds before unchanged matches are re-priced anyway (default the odds cache TTL for their start time)')
+    arg_parser.add_argument('--cache', action='store_true', help='serve odds from a start-time aware TTL cache')
+    arg_parser.add_argument('--cache-file', default=None, help='persist the odds cache to this file')
+    arg_parser.add_argument('--cache-max-mb', type=float, default=64)
+    arg_parser.add_argument('--prescreen-margin', type=float, default=None, help='only fetch per-match odds when the bulk odds feed is within this margin of an arb (e.g. 0.03)')
+    arg_parser.add_argument('--vectorized', action='store_true', help='compute arbitrage for the whole scan in one NumPy pass (only faster with few bookmakers per match, see benchmarks/bench_arbitrage.py)')
+    arg_parser.add_argument('--multi-market', action='store_true', help='also price set, totals and handicap markets from the same odds payloads')
+    arg_parser.add_argument('--scheduled', action='store_true', help='refresh matches by priority; wait_time becomes the feed reload interval')
+    arg_parser.add_argument('--db', action='store_true', help='store events, odds snapshots and arbs in database.db')
+    arg_parser.add_argument('--sport', default='tennis', choices=sorted(SPORTS.registry), help='sport to scan (default tennis)')
+    arg_parser.add_argument('--record', default=None, help='record every feed and odds payload to this directory for flashscore/replay.py')
+    arg_parser.add_argument('--geos', default=None, help='geos to request odds from, e.g. NG/NGLA,KE/,/ (default ODDS_GEOS)')
+    arg_parser.add_argument('--adaptive-geos', action='store_true', help='learn per tournament which geos add bookmakers or better prices and skip the others')
+    arg_parser.add_argument('--metrics-port', type=int, default=METRICS_PORT, help='serve Prometheus metrics on this localhost port (default METRICS_PORT, 0 = off)')
+    args = arg_parser.parse_args()
+    if args.metrics_port:
+        Utils.write_log(METRICS.serve(args.metrics_port)[1])
+
+    calc = CALCULATOR(
+        capital=args.capital,
+        min_profit_percentage=args.min_profit_percentage,
+        workers=args.workers,
+        stream=args.stream,
+        compact=args.compact,
+        delta=args.delta,
+        delta_max_age=args.delta_max_age,
+        cache=args.cache,
+        cache_file=args.cache_file,
+        cache_max_mb=args.cache_max_mb,
+        prescreen_margin=args.prescreen_margin,
+        vectorized=args.vectorized,
+        multi_market=args.multi_market,
+        sport=args.sport,
+        storage=STORAGE() if args.db else None,
+        geos=Utils.parse_geos(args.geos) if args.geos else None,
+        adaptive_geos=args.adaptive_geos
+    )
+    if args.record:
+        from flashscore.replay import RECORDER, RECORDING_FEEDS
+        calc.feeds = RECORDING_FEEDS(calc.feeds, RECORDER(args.record), calc.sport)
+    wait_time = args.wait_time
+    if args.scheduled:
+        calc.run_scheduled(feed_interval=wait_time)
+
     while True:
-        success, result = calc.get_tennis_arbitrage_opportunities(country='NG')
-        Utils.write_log(result)
+        scan_started = time.perf_counter()
+        success, result = calc.get_arbitrage_opportunities(country='NG')
+        Utils.write_log(result, level='DEBUG')
+        Utils.write_log(f'Scan wall-clock time: {time.perf_counter() - scan_started:.2f}s ({args.workers} worker(s))')
+        Utils.write_log(f'Proxy session stats: {calc.feeds.session_stats()}')
 
         Utils.write_log(f'Sleeping for {wait_time} seconds')
-        time.sleep(wait_time)
\ No newline at end of file
+        time.sleep(wait_time)
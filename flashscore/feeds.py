@@ -1,9 +1,36 @@
+import hashlib
 from utils import Utils
-from configs import string, random, requests
+from configs import string, random, FLASHSCORE_FEED_URL, FLASHSCORE_ODDS_URL
+from flashscore.sessions import SESSIONS
+from flashscore.sports import SPORTS
+from metrics import METRICS
+
+class ODDS_PAYLOAD(dict):
+    """
+    A decoded odds response, exactly as the upstream sent it, carrying the blake2b hash of its raw bytes as
+    the `payload_hash` attribute so merges can spot geos that returned the very same payload (see GEO_MATRIX.payload_hash).
+    """
+    __slots__ = ('payload_hash',)
+
+    def __init__(self, data, payload_hash=None):
+        super().__init__(data)
+        self.payload_hash = payload_hash
 
 class FEEDS:
-    def __init__(self):
-        self.proxies = Utils.load_proxies()
+    def __init__(self, pool_connections=10, pool_maxsize=10, idle_timeout=300, max_in_flight=None, proxies=None,
+                 feed_url=FLASHSCORE_FEED_URL, odds_url=FLASHSCORE_ODDS_URL):
+        self.proxies = Utils.load_proxies() if proxies is None else proxies
+        self.feed_url = feed_url.rstrip('/')
+        self.odds_url = odds_url
+        self.sessions = SESSIONS(
+            self.proxies,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            idle_timeout=idle_timeout,
+            max_in_flight=max_in_flight
+        )
+        self.validators = {}
+        self.snapshots = {}
         self.headers = {
             'accept': '*/*',
             'accept-language': 'en-US,en;q=0.9',
@@ -21,13 +48,7 @@ class FEEDS:
             'x-geoip': '1',
         }
 
-        self.sport_alt_ids = {
-            'tennis': {
-                'id':2,
-                'alt_id':'f_2_0_1_en_1',
-                'odd_id':'fo_2_0_1_en_1_0'
-            }
-        }
+        self.sport_alt_ids = SPORTS.feed_ids()
 
     @staticmethod
     def generate_fsign(length=8):
@@ -46,22 +67,83 @@ class FEEDS:
                 sport_alt_id = self.sport_alt_ids.get(sport, {}).get('alt_id', None)
                 if not sport_alt_id:return False, f"Alt identifier cannot be none for sport: {sport}"
 
-            response = requests.get(
-                f'https://global.flashscore.ninja/2/x/feed/{sport_alt_id}',
+            with METRICS.timer('get_sport_events', sport=sport) as timer:
+                response = self.sessions.get(
+                    f'{self.feed_url}/{sport_alt_id}',
+                    headers=self.headers,
+                    timeout=60
+                )
+                timer.size = len(response.content)
+                if not response.ok:raise Exception(response.text)
+            return True, response.text
+        except Exception as error:
+            return False, f'Error getting events {error}'
+        
+
+    def get_sport_events_delta(self, sport, with_odds=False):
+        """
+        Conditional variant of get_sport_events. Sends the ETag/Last-Modified validators of the previous
+        response when the server gave any and, when the body comes back anyway, compares it to the last snapshot.
+        Returns: (success, {'changed': bool, 'data': feed text, 'not_modified': bool})
+        """
+        try:
+            key = 'odd_id' if with_odds else 'alt_id'
+            sport_alt_id = self.sport_alt_ids.get(sport, {}).get(key, None)
+            if not sport_alt_id:return False, f"Identifier cannot be none for sport: {sport}"
+
+            Utils.write_log(f"Fetching events for {sport} (conditional)")
+            url = f'{self.feed_url}/{sport_alt_id}'
+            headers = dict(self.headers)
+            validators = self.validators.get(url, {})
+            previous = self.snapshots.get(url)
+            if previous is not None:
+                if validators.get('etag'):headers['if-none-match'] = validators['etag']
+                if validators.get('last_modified'):headers['if-modified-since'] = validators['last_modified']
+
+            with METRICS.timer('get_sport_events', sport=sport) as timer:
+                response = self.sessions.get(url, headers=headers, timeout=60)
+                timer.size = len(response.content)
+                if response.status_code != 304 and not response.ok:raise Exception(response.text)
+            if response.status_code == 304 and previous is not None:
+                return True, {'changed': False, 'data': previous, 'not_modified': True}
+
+            if not response.ok:raise Exception(response.text)
+            self.validators[url] = {
+                'etag': response.headers.get('etag'),
+                'last_modified': response.headers.get('last-modified')
+            }
+            data = response.text
+            self.snapshots[url] = data
+            return True, {'changed': data != previous, 'data': data, 'not_modified': False}
+        except Exception as error:
+            return False, f'Error getting events {error}'
+
+    def stream_sport_events(self, sport, with_odds=False, chunk_size=64 * 1024):
+        """
+        Like get_sport_events but returns an iterator of decoded text chunks, for PARSER.iter_flashscore_events.
+        """
+        try:
+            Utils.write_log(f"Streaming events for {sport}")
+            key = 'odd_id' if with_odds else 'alt_id'
+            sport_alt_id = self.sport_alt_ids.get(sport, {}).get(key, None)
+            if not sport_alt_id:return False, f"Identifier cannot be none for sport: {sport}"
+
+            response = self.sessions.get(
+                f'{self.feed_url}/{sport_alt_id}',
                 headers=self.headers,
-                proxies=random.choice(self.proxies),
-                timeout=60
+                timeout=60,
+                stream=True
             )
 
             if not response.ok:raise Exception(response.text)
-            return True, response.text
+            response.encoding = response.encoding or 'utf-8'
+            return True, response.iter_content(chunk_size=chunk_size, decode_unicode=True)
         except Exception as error:
-            return False, f'Error getting events {error}'
-        
+            return False, f'Error streaming events {error}'
 
     def get_odds_data(self, event_id, project_id='2', geo_ip_code='NG', geo_ip_subdivision_code='NGLA'):
         try:
-            Utils.write_log(f"Fetching events for {event_id}")
+            Utils.write_log(f"Fetching events for {event_id}", level='DEBUG')
             params = {
                 '_hash': 'oce',
                 'eventId': event_id,
@@ -70,15 +152,23 @@ class FEEDS:
                 'geoIpSubdivisionCode': geo_ip_subdivision_code,
             }
 
-            response = requests.get(
-                'https://global.ds.lsapp.eu/odds/pq_graphql',
-                headers=self.headers,
-                params=params,
-                proxies=random.choice(self.proxies),
-                timeout=60
-            )
-
-            if not response.ok:raise Exception(response.text)
-            return True, response.json()
+            geo = geo_ip_code or 'default'
+            with METRICS.timer('get_odds_data', geo=geo) as timer:
+                response = self.sessions.get(
+                    self.odds_url,
+                    headers=self.headers,
+                    params=params,
+                    timeout=60
+                )
+                timer.size = len(response.content)
+                if not response.ok:raise Exception(response.text)
+            # GraphQL decoding is its own stage, so slow payloads show apart from slow proxies
+            with METRICS.timer('odds_decode', geo=geo) as timer:
+                timer.size = len(response.content)
+                data = ODDS_PAYLOAD(response.json(), hashlib.blake2b(response.content, digest_size=16).hexdigest())
+                return True, data
         except Exception as error:
-            return False, f'Error getting odds data {error}'
\ No newline at end of file
+            return False, f'Error getting odds data {error}'
+
+    def session_stats(self):
+        return self.sessions.stats()
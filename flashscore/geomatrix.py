@@ -0,0 +1,152 @@
+import hashlib
+from configs import json, Lock
+
+class GEO_MATRIX:
+    """
+    Learns which geos are worth requesting odds from. Every merged match records, per geo, whether its
+    response added value: a bookmaker or a price (per market and outcome) better than every other distinct
+    response of the match. A response whose payload hash equals an earlier geo's is a duplicate and adds
+    nothing. A failed request says nothing about a geo's value, so failures are counted apart and only
+    answered requests (`fetched`) weigh in the value rate.
+    Stats are kept per tournament, per category and overall; `plan` uses the most specific scope
+    with `min_samples` answered fetches and, when `adaptive`, skips geos whose share of valuable responses is below
+    `min_value_rate`. Every `explore_every`-th skip is fetched anyway so a geo can earn its place back, and
+    at least one geo is always fetched.
+    """
+    def __init__(self, geos, adaptive=False, min_samples=20, min_value_rate=0.05, explore_every=10):
+        self.geos = geos
+        self.adaptive = adaptive
+        self.min_samples = min_samples
+        self.min_value_rate = min_value_rate
+        self.explore_every = explore_every
+        self.all_geos = list(range(len(geos)))
+        self.stats = {}
+        self.lock = Lock()
+
+    @staticmethod
+    def scopes(tournament):
+        """
+        Scope keys of a tournament's matches, most specific first.
+        """
+        return (f"tournament:{tournament.get('tournament_id')}", f"category:{tournament.get('category')}", '*')
+
+    @staticmethod
+    def payload_hash(odds_response):
+        """
+        Hash of an odds payload: the hash of the raw response FEEDS returned it with (ODDS_PAYLOAD), else one of its odds list.
+        """
+        payload_hash = getattr(odds_response, 'payload_hash', None)
+        if payload_hash is not None:return payload_hash
+        odds = (odds_response.get('data') or {}).get('findOddsByEventId', {}).get('odds') or []
+        return hashlib.blake2b(json.dumps(odds, separators=(',', ':')).encode('utf-8'), digest_size=16).hexdigest()
+
+    def entry(self, scope, index):
+        geo_stats = self.stats.setdefault(scope, {})
+        entry = geo_stats.get(index)
+        if entry is None:
+            entry = geo_stats[index] = {'fetched': 0, 'valuable': 0, 'unique_prices': 0, 'duplicates': 0, 'failed': 0, 'skipped': 0}
+        return entry
+
+    def learned(self, scopes, index):
+        """
+        Stats of a geo in the most specific scope with enough answered fetches, None while it is still learning.
+        """
+        for scope in scopes:
+            entry = self.stats.get(scope, {}).get(index)
+            if entry is not None and entry['fetched'] >= self.min_samples:
+                return entry
+        return None
+
+    @staticmethod
+    def value_rate(entry):
+        return entry['valuable'] / entry['fetched'] if entry['fetched'] else 0
+
+    def plan(self, scopes=None):
+        """
+        Geo indexes to request for a match of the given scopes (GEO_MATRIX.scopes); every geo when not adaptive.
+        """
+        if not self.adaptive or scopes is None or len(self.geos) < 2:
+            return self.all_geos
+        with self.lock:
+            planned = []
+            skipped = []
+            for index in self.all_geos:
+                entry = self.learned(scopes, index)
+                if entry is None or self.value_rate(entry) >= self.min_value_rate:
+                    planned.append(index)
+                    continue
+                entry['skipped'] += 1
+                if entry['skipped'] % self.explore_every == 0:
+                    planned.append(index)
+                else:
+                    skipped.append((self.value_rate(entry), -index))
+            if not planned:
+                planned.append(-max(skipped)[1])
+            return planned
+
+    @staticmethod
+    def unique_prices(prices):
+        """
+        Args:
+            prices (dict): geo index -> {(market, bookmaker_id, outcome): price} of the distinct responses of a match.
+        Returns: dict geo index -> number of prices no other response matches or beats.
+        """
+        # key -> [best price, geo index of the best price, second best price]
+        best = {}
+        for index, geo_prices in prices.items():
+            for key, price in geo_prices.items():
+                entry = best.get(key)
+                if entry is None:
+                    best[key] = [price, index, 0.0]
+                elif price > entry[0]:
+                    entry[2], entry[0], entry[1] = entry[0], price, index
+                elif price > entry[2]:
+                    entry[2] = price
+        unique = {index: 0 for index in prices}
+        for price, index, second in best.values():
+            if price > second:unique[index] += 1
+        return unique
+
+    def observe(self, scopes, fetched, prices, duplicates, failed):
+        """
+        Records the geos requested for one match.
+        Args:
+            fetched (iterable): geo indexes requested.
+            prices (dict): geo index -> {(market, bookmaker_id, outcome): price} of each distinct response.
+            duplicates, failed (set): geo indexes whose payload repeated an earlier geo's, or whose request failed.
+        """
+        unique = self.unique_prices(prices) if len(prices) > 1 else {index: len(geo_prices) for index, geo_prices in prices.items()}
+        with self.lock:
+            for scope in scopes or ('*',):
+                for index in fetched:
+                    entry = self.entry(scope, index)
+                    if index in failed:
+                        entry['failed'] += 1
+                        continue
+                    entry['fetched'] += 1
+                    entry['unique_prices'] += unique.get(index, 0)
+                    if unique.get(index):entry['valuable'] += 1
+                    if index in duplicates:entry['duplicates'] += 1
+
+    def summary(self):
+        """
+        Overall stats per geo: requests, share of valuable responses, duplicates, failures and skipped requests.
+        """
+        with self.lock:
+            overall = {index: dict(entry) for index, entry in self.stats.get('*', {}).items()}
+            skipped = {index: 0 for index in self.all_geos}
+            for scope, geo_stats in self.stats.items():
+                for index, entry in geo_stats.items():
+                    skipped[index] += entry['skipped']
+        rows = {}
+        for index, geo in enumerate(self.geos):
+            entry = overall.get(index, {'fetched': 0, 'valuable': 0, 'unique_prices': 0, 'duplicates': 0, 'failed': 0})
+            rows[f"{geo['geo_ip']}/{geo['sub_geo_ip']}"] = {
+                'requests': entry['fetched'] + entry['failed'],
+                'value_rate': round(self.value_rate(entry), 3),
+                'unique_prices': entry['unique_prices'],
+                'duplicates': entry['duplicates'],
+                'failed': entry['failed'],
+                'skipped': skipped[index]
+            }
+        return rows
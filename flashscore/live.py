@@ -0,0 +1,251 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from collections import deque
+from concurrent.futures import wait, FIRST_COMPLETED
+from configs import traceback, time, Lock, ThreadPoolExecutor, METRICS_PORT
+from utils import Utils
+from flashscore.sports import SPORTS
+from flashscore.calculator import CALCULATOR
+from database.storage import STORAGE
+from metrics import METRICS
+
+class LIVE_SCANNER:
+    """
+    In-play scanning. Only matches the feed marks live are tracked; each one is polled for its planned geos every
+    `poll_interval` seconds, with at most `batch_size` matches in flight, and re-priced as soon as one of
+    its odds responses arrives (merged with the latest response of the other geos). Finished matches, and
+    matches that left the feed, are dropped and their open arbs closed on the next feed refresh, every
+    `feed_interval` seconds (a conditional request, see CALCULATOR.fetch_events_delta).
+    Each opened or changed arb is timed from the odds response that revealed it (detection) to the
+    delivery of its Telegram report (alert); latencies are logged per arb, kept for `summary()` and
+    exported as the `live_alert` metric.
+    """
+    def __init__(self, capital=0, min_profit_percentage=0, workers=8, batch_size=None, poll_interval=1.0,
+                 feed_interval=15, target_latency=3.0, sport='tennis', multi_market=False, feeds=None, storage=None,
+                 arb_hysteresis=0.25, history=1000, geos=None, adaptive_geos=False):
+        self.calculator = CALCULATOR(
+            capital=capital, min_profit_percentage=min_profit_percentage, workers=workers, delta=True,
+            multi_market=multi_market, sport=sport, feeds=feeds, storage=storage, arb_hysteresis=arb_hysteresis,
+            reporting=False, geos=geos, adaptive_geos=adaptive_geos
+        )
+        self.executor = ThreadPoolExecutor(max_workers=self.calculator.workers, thread_name_prefix='live-odds')
+        # Matches in flight at once; each costs one request per geo
+        self.batch_size = batch_size or max(1, self.calculator.workers // len(self.calculator.geos))
+        self.poll_interval = poll_interval
+        self.feed_interval = feed_interval
+        self.target_latency = target_latency
+        self.matches = {}
+        self.responses = {}
+        self.next_poll = {}
+        self.outstanding = {}
+        self.in_flight = {}
+        self.last_feed = None
+        self.latencies = deque(maxlen=history)
+        self.lock = Lock()
+
+    def refresh_matches(self):
+        """
+        Reloads the event feed and keeps the matches in play. Matches that finished or left the feed are
+        dropped and their open arbs closed; new live matches are due at once.
+        """
+        success, data = self.calculator.load_events()
+        if not success:
+            Utils.write_log(f"Failed to refresh live {self.calculator.sport} events: {data}", level='WARNING')
+            return False
+        live = {
+            match['match_id']: (tournament, match)
+            for tournament in data.get('tournaments', {}).values()
+            for match in tournament.get('matches', [])
+            if self.calculator.parser.is_live(match)
+        }
+        dropped = [match_id for match_id in self.matches if match_id not in live]
+        added = [match_id for match_id in live if match_id not in self.matches]
+        for match_id in dropped:
+            self.responses.pop(match_id, None)
+            self.next_poll.pop(match_id, None)
+        for match_id in added:
+            self.next_poll[match_id] = 0
+            tournament, _ = live[match_id]
+            self.calculator.match_scopes[match_id] = self.calculator.geo_matrix.scopes(tournament)
+        self.matches = live
+        self.calculator.record_arb_events(self.calculator.forget_matches(live))
+        if added or dropped:
+            Utils.write_log(f"Live {self.calculator.sport}: {len(live)} matches in play (+{len(added)}, -{len(dropped)})")
+        return True
+
+    def fetch(self, match_id, geo):
+        # Live odds are never served from the odds cache
+        return self.calculator.feeds.get_odds_data(
+            match_id,
+            geo_ip_code=geo['geo_ip'],
+            geo_ip_subdivision_code=geo['sub_geo_ip']
+        )
+
+    def poll(self):
+        """
+        Starts the odds requests of due matches while fewer than `batch_size` matches are in flight.
+        """
+        now = time.monotonic()
+        due = sorted((deadline, match_id) for match_id, deadline in self.next_poll.items() if deadline <= now and match_id not in self.outstanding)
+        for _, match_id in due:
+            if len(self.outstanding) >= self.batch_size:break
+            requested_at = time.time()
+            plan = self.calculator.geo_plan(match_id)
+            self.outstanding[match_id] = len(plan)
+            # Responses of geos the plan stopped requesting would go stale, so they are not merged any more
+            planned = {index for index, _ in plan}
+            responses = self.responses.get(match_id, {})
+            for index in [index for index in responses if index not in planned]:
+                del responses[index]
+            for index, geo in plan:
+                self.in_flight[self.executor.submit(self.fetch, match_id, geo)] = (match_id, index, requested_at)
+
+    def handle(self, future):
+        """
+        Stores one odds response and re-prices its match right away.
+        """
+        match_id, index, requested_at = self.in_flight.pop(future)
+        received_at = time.time()
+        try:
+            success, odds_response = future.result()
+        except Exception as error:
+            success, odds_response = False, str(error)
+
+        self.outstanding[match_id] -= 1
+        # The last response of a poll completes one fetch of every planned geo, the only merge the geo matrix learns from
+        complete = not self.outstanding[match_id]
+        if complete:
+            del self.outstanding[match_id]
+            if match_id in self.next_poll:
+                self.next_poll[match_id] = time.monotonic() + self.poll_interval
+        if match_id not in self.matches:return
+
+        self.responses.setdefault(match_id, {})[index] = (success, odds_response)
+        self.price(match_id, requested_at, received_at, observe_geos=complete)
+
+    def price(self, match_id, requested_at, received_at, observe_geos=True):
+        calculator = self.calculator
+        tournament, match = self.matches[match_id]
+        batch = {'tournaments': {tournament['tournament_id']: {
+            'tournament_name': tournament['tournament_name'],
+            'sport_name': tournament['sport_name'],
+            'category': tournament['category'],
+            'tournament_name_from_url': tournament['tournament_name_from_url'],
+            'matches': [match]
+        }}, 'metadata': {}}
+        odds_results = {(match_id, index): response for index, response in self.responses[match_id].items()}
+        success, result = calculator.process_scan(batch, odds_results, observe_geos=observe_geos)
+        if not success:
+            Utils.write_log(f"Failed to price live match {match_id}: {result}", level='WARNING')
+            return
+        if match_id not in result['priced']:return
+
+        match_data = next(iter(result['tournaments'].values()))['matches'][0]
+        on_delivered = lambda event, delivered_at: self.record_latency(event, requested_at, received_at, delivered_at)
+        events = calculator.track_arbs(match_data, result['priced'][match_id], on_delivered=on_delivered)
+        for event in events:
+            if event['event'] == 'opened':
+                calculator.balance += event['details']['profit_amount']
+                Utils.write_log(f"Live arb on {match_id} [{event['market']}] {event['profit_percentage']}%, New Balance: {calculator.balance:.2f}")
+        calculator.record_arb_events(events)
+
+    def record_latency(self, event, requested_at, received_at, delivered_at):
+        """
+        Called from the Telegram dispatcher once the report of a live arb event was delivered (or dropped).
+        """
+        latency = {
+            'match_id': event['match_id'],
+            'market': event['market'],
+            'event': event['event'],
+            'profit_percentage': event['profit_percentage'],
+            'fetch_seconds': round(received_at - requested_at, 3),
+            'alert_seconds': round(delivered_at - received_at, 3) if delivered_at is not None else None
+        }
+        with self.lock:
+            self.latencies.append(latency)
+        if delivered_at is None:
+            METRICS.observe('live_alert', time.time() - received_at, error=True, market=event['market'])
+            Utils.write_arb(f"Live arb alert on match {event['match_id']} [{event['market']}] was not delivered")
+            return
+        METRICS.observe('live_alert', delivered_at - received_at, error=delivered_at - received_at > self.target_latency, market=event['market'])
+        Utils.write_arb(
+            f"Live arb alert on match {event['match_id']} [{event['market']}] delivered {latency['alert_seconds']}s after detection "
+            f"(odds request {latency['fetch_seconds']}s)"
+        )
+
+    def summary(self):
+        """
+        Detection-to-alert latencies of the arbs reported so far (the last `history` ones).
+        """
+        with self.lock:
+            latencies = list(self.latencies)
+        delivered = sorted(latency['alert_seconds'] for latency in latencies if latency['alert_seconds'] is not None)
+        pick = lambda share: delivered[min(len(delivered) - 1, int(len(delivered) * share))] if delivered else None
+        return {
+            'matches_in_play': len(self.matches),
+            'alerts': len(delivered),
+            'undelivered': len(latencies) - len(delivered),
+            'alert_p50_seconds': pick(0.5),
+            'alert_p95_seconds': pick(0.95),
+            'alert_max_seconds': delivered[-1] if delivered else None,
+            'over_target': sum(1 for seconds in delivered if seconds > self.target_latency),
+            'target_seconds': self.target_latency
+        }
+
+    def run(self):
+        while True:
+            try:
+                if self.last_feed is None or time.monotonic() - self.last_feed >= self.feed_interval:
+                    self.refresh_matches()
+                    self.last_feed = time.monotonic()
+                    Utils.write_log(f"Live summary: {self.summary()}; arb tracker: {self.calculator.arb_tracker.stats()}")
+
+                self.poll()
+                feed_due = self.last_feed + self.feed_interval - time.monotonic()
+                if not self.in_flight:
+                    next_poll = min(self.next_poll.values(), default=None)
+                    sleep = feed_due if next_poll is None else min(feed_due, next_poll - time.monotonic())
+                    time.sleep(min(max(0.01, sleep), self.feed_interval))
+                    continue
+                done, _ = wait(list(self.in_flight), timeout=max(0.01, min(feed_due, self.poll_interval)), return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.handle(future)
+            except Exception as error:
+                traceback.print_exception(error)
+                time.sleep(1)
+
+if __name__ == "__main__":
+    import argparse
+    arg_parser = argparse.ArgumentParser(description='In-play arbitrage scanner: polls only live matches on a tight loop')
+    arg_parser.add_argument('capital', type=float)
+    arg_parser.add_argument('min_profit_percentage', type=float)
+    arg_parser.add_argument('workers', type=int, nargs='?', default=8, help='parallel odds requests (default 8)')
+    arg_parser.add_argument('--poll-interval', type=float, default=1.0, help='seconds between odds polls of a live match (default 1)')
+    arg_parser.add_argument('--feed-interval', type=float, default=15, help='seconds between live feed refreshes (default 15)')
+    arg_parser.add_argument('--batch-size', type=int, default=None, help='matches in flight at once (default workers / geos)')
+    arg_parser.add_argument('--target-latency', type=float, default=3.0, help='detection-to-alert target in seconds (default 3)')
+    arg_parser.add_argument('--sport', default='tennis', choices=sorted(SPORTS.registry), help='sport to scan (default tennis)')
+    arg_parser.add_argument('--multi-market', action='store_true', help='also price set, totals and handicap markets')
+    arg_parser.add_argument('--db', action='store_true', help='store events, odds snapshots and arbs in database.db')
+    arg_parser.add_argument('--geos', default=None, help='geos to request odds from, e.g. NG/NGLA,KE/,/ (default ODDS_GEOS)')
+    arg_parser.add_argument('--adaptive-geos', action='store_true', help='learn per tournament which geos add bookmakers or better prices and skip the others')
+    arg_parser.add_argument('--metrics-port', type=int, default=METRICS_PORT, help='serve Prometheus metrics on this localhost port (default METRICS_PORT, 0 = off)')
+    args = arg_parser.parse_args()
+    if args.metrics_port:
+        Utils.write_log(METRICS.serve(args.metrics_port)[1])
+
+    LIVE_SCANNER(
+        capital=args.capital,
+        min_profit_percentage=args.min_profit_percentage,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        poll_interval=args.poll_interval,
+        feed_interval=args.feed_interval,
+        target_latency=args.target_latency,
+        sport=args.sport,
+        multi_market=args.multi_market,
+        storage=STORAGE() if args.db else None,
+        geos=Utils.parse_geos(args.geos) if args.geos else None,
+        adaptive_geos=args.adaptive_geos
+    ).run()
@@ -0,0 +1,90 @@
+from configs import time
+from bisect import insort
+
+class OddsBook:
+    """
+    Odds of one match indexed by bookmaker id and outcome. Upserts from any geo are O(1) per price and
+    keep the best price per (bookmaker, outcome) together with its source geo and timestamp; the top-k
+    prices per outcome are maintained incrementally so the best price is read without a rescan.
+    """
+    outcomes = ('XA', 'XB')
+
+    def __init__(self, outcomes=outcomes, top_k=3):
+        self.outcomes = outcomes
+        self.top_k = top_k
+        self.prices = {}
+        self.tops = {outcome: [] for outcome in outcomes}
+        self.order = {}
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __bool__(self):
+        return bool(self.prices)
+
+    def __contains__(self, bookmaker_id):
+        return bookmaker_id in self.prices
+
+    def upsert(self, bookmaker_id, outcome, price, geo=None, timestamp=None):
+        """
+        Records a price; a bookmaker's existing price for the outcome is only replaced by a higher one.
+        Returns True if the book changed.
+        """
+        price = float(price)
+        if bookmaker_id not in self.prices:
+            self.prices[bookmaker_id] = {}
+            self.order[bookmaker_id] = len(self.order)
+        bookmaker = self.prices[bookmaker_id]
+        existing = bookmaker.get(outcome)
+        if existing is not None and existing['price'] >= price:
+            return False
+
+        bookmaker[outcome] = {
+            'price': price,
+            'geo': geo,
+            'timestamp': timestamp if timestamp is not None else time.time()
+        }
+
+        # Prices per bookmaker only go up, so an entry never has to be refilled from outside the top-k
+        top = self.tops[outcome]
+        if existing is not None:
+            top[:] = [item for item in top if item[2] != bookmaker_id]
+        # Ties go to the bookmaker seen first, like the first-strictly-greater scan in calculate_arbitrage
+        insort(top, (-price, self.order[bookmaker_id], bookmaker_id))
+        del top[self.top_k:]
+        return True
+
+    def upsert_row(self, row, geo=None, timestamp=None):
+        """
+        Upserts a calculate_arbitrage style row ({'BI': '417', 'XA': 1.8, 'XB': 2.0}).
+        """
+        changed = False
+        for outcome in self.outcomes:
+            if outcome in row:
+                changed = self.upsert(row['BI'], outcome, row[outcome], geo=geo, timestamp=timestamp) or changed
+        return changed
+
+    def best(self, outcome):
+        """
+        Best price for an outcome: {'price', 'bookmaker_id', 'geo', 'timestamp'} or None.
+        """
+        top = self.tops[outcome]
+        if not top:return None
+        _, _, bookmaker_id = top[0]
+        entry = self.prices[bookmaker_id][outcome]
+        return {'price': entry['price'], 'bookmaker_id': bookmaker_id, 'geo': entry['geo'], 'timestamp': entry['timestamp']}
+
+    def top(self, outcome, k=None):
+        return [
+            {'price': -negative_price, 'bookmaker_id': bookmaker_id}
+            for negative_price, _, bookmaker_id in self.tops[outcome][:k or self.top_k]
+        ]
+
+    def rows(self):
+        """
+        The book as calculate_arbitrage rows, one per bookmaker in first-seen order.
+        """
+        return [
+            {'BI': bookmaker_id, **{outcome: entry['price'] for outcome, entry in outcomes.items()}}
+            for bookmaker_id, outcomes in self.prices.items()
+        ]
@@ -3,193 +3,500 @@
 
 from utils import Utils
 from configs import json, re
+from flashscore.records import TournamentRecord, MatchRecord
+from flashscore.sports import SPORTS
+from metrics import METRICS
 
 class PARSER:
     @staticmethod
-    def parse_tournament_url(url):
+    def parse_tournament_url(url, sport='tennis'):
         """
         Extracts sport_name, category, and tournament_name_from_url from a tournament URL.
         Example: '/tennis/atp-singles/us-open/' -> ('tennis', 'atp-singles', 'us-open')
         """
         if not url or not isinstance(url, str):
-            return 'tennis', None, None
+            return sport, None, None
         pattern = r'^/(\w+)/([\w-]+)/([\w-]+)/?$'
         match = re.match(pattern, url)
-        return match.groups() if match else ('tennis', None, None)
+        return match.groups() if match else (sport, None, None)
 
     @staticmethod
-    def parse_flashscore_tennis(data_string):
+    def iter_records(data):
         """
-        Parses the Flashscore tennis data string dynamically, assigning correct keys and handling matches.
+        Yields raw `¬~` separated records from a feed string or from an iterable of text chunks
+        (e.g. a streamed response), skipping the leading SA÷ record, without holding the split feed in memory.
+        """
+        chunks = [data] if isinstance(data, str) else data
+        buffer = ''
+        first = True
+        for chunk in chunks:
+            if not chunk:
+                continue
+            buffer += chunk
+            start = 0
+            while True:
+                end = buffer.find('¬~', start)
+                if end == -1:
+                    break
+                record = buffer[start:end]
+                start = end + 2
+                if first:
+                    first = False
+                    if record.startswith('SA÷'):
+                        continue
+                yield record
+            buffer = buffer[start:]
+        if buffer:
+            yield buffer
+
+    @staticmethod
+    def field_value(record, key):
+        """
+        Reads one field from a raw record without splitting the rest of it. Returns None when absent.
+        """
+        marker = f'{key}÷'
+        if record.startswith(marker):
+            start = len(marker)
+        else:
+            start = record.find(f'¬{marker}')
+            if start == -1:return None
+            start += len(marker) + 1
+        end = record.find('¬', start)
+        return record[start:] if end == -1 else record[start:end]
+
+    @staticmethod
+    def split_fields(record):
+        """
+        Splits a single record into its raw key/value fields.
+        """
+        record_dict = {}
+        for field in record.split('¬'):
+            if not field or '÷' not in field:
+                continue
+            key, value = field.split('÷', 1)
+            record_dict[key] = value
+        return record_dict
+
+    @staticmethod
+    def parse_record(record):
+        """
+        Splits a single record into its key/value fields, converting timestamps and bookmaker JSON.
+        """
+        record_dict = {}
+        for key, value in PARSER.split_fields(record).items():
+            # Convert timestamps
+            if key in ['AD', 'ADE', 'AO', 'QC']:
+                value = Utils.convert_timestamp(value.rstrip('|'))
+            # Parse JSON for bookmakers
+            if key == 'AL' and value.startswith('{"2":'):
+                try:
+                    value = json.loads(value)
+                except json.JSONDecodeError:
+                    pass
+            record_dict[key] = value
+        return record_dict
+
+    @staticmethod
+    def build_tournament(record_dict, index=0, sport='tennis'):
+        sport_name, category, tournament_name_from_url = PARSER.parse_tournament_url(record_dict.get('ZL'), sport=sport)
+        tournament_id = record_dict.get('ZC', f'tournament_{index}')
+        return {
+            'tournament_name': record_dict.get('ZA'),
+            'tournament_id': tournament_id,
+            'sport_id': SPORTS.sport_id(sport),
+            'sport_name': sport_name,
+            'category': category,
+            'tournament_name_from_url': tournament_name_from_url,
+            'category_id': record_dict.get('ZB'),
+            'surface': record_dict.get('ZD'),
+            'tournament_unique_id': record_dict.get('ZE'),
+            'format': record_dict.get('ZF'),
+            'status': record_dict.get('ZG'),
+            'game_type': record_dict.get('ZI'),
+            'combined_id': record_dict.get('ZO'),
+            'stage': record_dict.get('ZH'),
+            'link': record_dict.get('ZL'),
+            'image': record_dict.get('OAJ'),
+            'zx_field': record_dict.get('ZX'),
+            'season_id': record_dict.get('ZEE'),
+            'tournament_status': record_dict.get('ZHS'),
+            'tss': record_dict.get('ZCC'),
+            'category_name': record_dict.get('ZAF'),
+            'matches': []
+        }
+
+    @staticmethod
+    def is_doubles(tournament):
+        """
+        Tennis doubles tournaments (game type 1) list pairs of players; other sports reuse ZI for other purposes.
+        """
+        return tournament.get('sport_id') == SPORTS.sport_id('tennis') and tournament.get('game_type') == '1'
+
+    @staticmethod
+    def build_match(record_dict, tournament):
+        # Handle doubles matches
+        is_doubles = PARSER.is_doubles(tournament)
+        home_country = record_dict.get('CC', record_dict.get('FU', ''))
+        away_country = record_dict.get('FV', record_dict.get('FX', ''))
+        home_image = record_dict.get('OA', '')
+        away_image = record_dict.get('OB', '')
+        if is_doubles:
+            if '/' in home_country:
+                home_country = home_country.split('/')[0]
+            if '/' in away_country:
+                away_country = away_country.split('/')[0]
+            if ';' in home_image:
+                home_image = home_image.split(';')[0]
+            if ';' in away_image:
+                away_image = away_image.split(';')[0]
+
+        return {
+            'match_id': record_dict.get('AA'),
+            'start_time': record_dict.get('AD'),
+            'start_time_alt': record_dict.get('ADE'),
+            'update_time': record_dict.get('AO'),
+            'sets_played': record_dict.get('AB'),
+            'current_round': record_dict.get('CR'),
+            'game_count': record_dict.get('AC'),
+            'home_player': {
+                'name': record_dict.get('CX'),
+                'full_name': record_dict.get('AE', record_dict.get('CX')),
+                'first_name': record_dict.get('FH', record_dict.get('CX')),
+                'id': record_dict.get('JA'),
+                'slug': record_dict.get('WU'),
+                'country_code': record_dict.get('CA', record_dict.get('CY')),
+                'country': home_country,
+                'image': home_image,
+                'is_winner': record_dict.get('AS') == '1'
+            },
+            'away_player': {
+                'name': record_dict.get('AF', record_dict.get('CX')),
+                'full_name': record_dict.get('AF', record_dict.get('CX')),
+                'first_name': record_dict.get('FK', record_dict.get('CX')),
+                'id': record_dict.get('JB'),
+                'slug': record_dict.get('WV'),
+                'country_code': record_dict.get('CB', record_dict.get('GB')),
+                'country': away_country,
+                'image': away_image,
+                'is_winner': record_dict.get('AW') == '1'
+            },
+            'home_sets_won': record_dict.get('AG') if not is_doubles else None,
+            'away_sets_won': record_dict.get('AH') if not is_doubles else None,
+            'set_scores': {
+                'set1': {
+                    'home': record_dict.get('BA') if not is_doubles else None,
+                    'away': record_dict.get('BB') if not is_doubles else None
+                },
+                'set2': {
+                    'home': record_dict.get('BC') if not is_doubles else None,
+                    'away': record_dict.get('BD') if not is_doubles else None
+                },
+                'set3': {
+                    'home': record_dict.get('BE') if not is_doubles else None,
+                    'away': record_dict.get('BF') if not is_doubles else None
+                },
+                'set4': {
+                    'home': record_dict.get('BG') if not is_doubles else None,
+                    'away': record_dict.get('BH') if not is_doubles else None
+                }
+            },
+            'home_match_count': record_dict.get('HMC'),
+            'live_status': record_dict.get('AN'),
+            'market_watchers': record_dict.get('MW'),
+            'bookmakers': record_dict.get('AL'),
+            'misc_flags': {
+                'home_rank_weight': record_dict.get('RW'),
+                'away_rank_weight': record_dict.get('BW'),
+                'bx_flag': record_dict.get('BX'),
+                'link_status': record_dict.get('WL'),
+                'home_code': record_dict.get('WM'),
+                'away_code': record_dict.get('WN'),
+                'home_rank_alt': record_dict.get('GRA'),
+                'away_rank_alt': record_dict.get('GRB'),
+                'home_set_flag': record_dict.get('AZ'),
+                'away_set_flag': record_dict.get('AY'),
+                'away_status': record_dict.get('AW')
+            }
+        }
+
+    @staticmethod
+    def iter_events(data, compact=False, known=None, index=None, sport='tennis'):
+        """
+        Scans the event feed of `sport` record by record and yields ('tournament', tournament), ('match', (tournament, match)),
+        ('featured', featured_match) and ('metadata', (key, value)) events as they are decoded.
+        With compact=True tournaments and matches are TournamentRecord/MatchRecord objects instead of dicts.
+        When `index` is given it is filled with match_id -> (tournament record, match record) fingerprints, and
+        matches whose fingerprint equals the one in `known` (match_id -> (fingerprint, match)) are reused undecoded.
+        """
+        current_tournament = None
+        tournament_record = None
+        tournament_count = 0
+        for record in PARSER.iter_records(data):
+            if not record.strip():
+                continue
+
+            if index is not None and current_tournament is not None and PARSER.field_value(record, 'ZA') is None:
+                match_id = PARSER.field_value(record, 'AA')
+                if match_id is not None:
+                    fingerprint = (tournament_record, record)
+                    index[match_id] = fingerprint
+                    fingerprint_match = (known or {}).get(match_id)
+                    if fingerprint_match is not None and fingerprint_match[0] == fingerprint:
+                        yield 'match', (current_tournament, fingerprint_match[1])
+                        continue
+
+            record_dict = PARSER.split_fields(record) if compact else PARSER.parse_record(record)
+
+            # Organize into result structure
+            if 'ZA' in record_dict:
+                current_tournament = PARSER.build_tournament(record_dict, tournament_count, sport=sport)
+                if compact:
+                    current_tournament = TournamentRecord(current_tournament)
+                tournament_record = record
+                tournament_count += 1
+                yield 'tournament', current_tournament
+            elif 'AA' in record_dict and current_tournament is not None:
+                if compact:
+                    match = MatchRecord(record_dict, record, is_doubles=PARSER.is_doubles(current_tournament))
+                else:
+                    match = PARSER.build_match(record_dict, current_tournament)
+                yield 'match', (current_tournament, match)
+            elif 'QB' in record_dict:
+                timestamp = record_dict.get('QC')
+                yield 'featured', {
+                    'match_id': record_dict.get('QB'),
+                    'timestamp': Utils.convert_timestamp(timestamp.rstrip('|')) if compact and timestamp else timestamp
+                }
+            elif 'A1' in record_dict:
+                yield 'metadata', ('session_hash', record_dict.get('A1'))
+
+    @staticmethod
+    def iter_flashscore_events(data, metadata=None, compact=False, sport='tennis'):
+        """
+        Streaming variant of parse_flashscore_events: yields (tournament, match) pairs while the feed is scanned.
+        The tournament dict is shared by its matches and its `matches` list is left for the caller to fill.
+        
+        Args:
+            data (str | iterable): The raw feed string, or an iterable of text chunks from a streamed response.
+            metadata (dict): Optional dict that receives `session_hash` and `featured_matches` as they are seen.
+            compact (bool): Yield TournamentRecord/MatchRecord objects instead of dicts.
+            sport (str): Registry key of the sport the feed belongs to (see flashscore.sports).
+        """
+        for kind, payload in PARSER.iter_events(data, compact=compact, sport=sport):
+            if kind == 'match':
+                yield payload
+            elif metadata is None:
+                continue
+            elif kind == 'featured':
+                metadata.setdefault('featured_matches', []).append(payload)
+            elif kind == 'metadata':
+                metadata[payload[0]] = payload[1]
+
+    @staticmethod
+    def iter_flashscore_tennis(data, metadata=None, compact=False):
+        return PARSER.iter_flashscore_events(data, metadata=metadata, compact=compact, sport='tennis')
+
+    @staticmethod
+    def parse_flashscore_events(data_string, compact=False, sport='tennis'):
+        """
+        Parses a Flashscore event feed dynamically, assigning correct keys and handling matches.
+        Every sport's feed shares the tournament/match record layout; set fields hold periods for team sports.
         
         Args:
             data_string (str): The raw data string from odds_data.html.
+            compact (bool): Store tournaments and matches as slotted records (see flashscore.records);
+                PARSER.to_dict converts the result back to the plain dict layout.
+            sport (str): Registry key of the sport the feed belongs to (see flashscore.sports).
         
         Returns:
             dict: Structured data with tournaments, matches, featured matches, and metadata.
         """
         try:
-            # Remove SA prefix and split records by ¬~
-            if data_string.startswith('SA÷'):
-                data_string = data_string.split('¬~', 1)[1] if '¬~' in data_string else data_string
-            records = data_string.split('¬~')
-            
             result = {
                 'tournaments': {},
                 'featured_matches': [],
                 'metadata': {}
             }
-            current_tournament = None
-            
-            for record in records:
-                if not record.strip():
-                    continue
-                # Split fields by ¬
-                fields = record.split('¬')
-                record_dict = {}
-                
-                # Process each field
-                for field in fields:
-                    if not field or '÷' not in field:
-                        continue
-                    key, value = field.split('÷', 1)
-                    # Convert timestamps
-                    if key in ['AD', 'ADE', 'AO', 'QC']:
-                        value = Utils.convert_timestamp(value.rstrip('|'))
-                    # Parse JSON for bookmakers
-                    if key == 'AL' and value.startswith('{"2":'):
-                        try:
-                            value = json.loads(value)
-                        except json.JSONDecodeError:
-                            pass
-                    record_dict[key] = value
-                
-                # Organize into result structure
-                if 'ZA' in record_dict:
-                    sport_name, category, tournament_name_from_url = PARSER.parse_tournament_url(record_dict.get('ZL'))
-                    tournament_id = record_dict.get('ZC', f'tournament_{len(result["tournaments"])}')
-                    current_tournament = {
-                        'tournament_name': record_dict.get('ZA'),
-                        'tournament_id': tournament_id,
-                        'sport_id': 2,  # Tennis
-                        'sport_name': sport_name,
-                        'category': category,
-                        'tournament_name_from_url': tournament_name_from_url,
-                        'category_id': record_dict.get('ZB'),
-                        'surface': record_dict.get('ZD'),
-                        'tournament_unique_id': record_dict.get('ZE'),
-                        'format': record_dict.get('ZF'),
-                        'status': record_dict.get('ZG'),
-                        'game_type': record_dict.get('ZI'),
-                        'combined_id': record_dict.get('ZO'),
-                        'stage': record_dict.get('ZH'),
-                        'link': record_dict.get('ZL'),
-                        'image': record_dict.get('OAJ'),
-                        'zx_field': record_dict.get('ZX'),
-                        'season_id': record_dict.get('ZEE'),
-                        'tournament_status': record_dict.get('ZHS'),
-                        'tss': record_dict.get('ZCC'),
-                        'category_name': record_dict.get('ZAF'),
-                        'matches': []
-                    }
-                    result['tournaments'][tournament_id] = current_tournament
-                elif 'AA' in record_dict and current_tournament is not None:
-                    # Handle doubles matches
-                    is_doubles = current_tournament.get('game_type') == '1'
-                    home_country = record_dict.get('CC', record_dict.get('FU', ''))
-                    away_country = record_dict.get('FV', record_dict.get('FX', ''))
-                    home_image = record_dict.get('OA', '')
-                    away_image = record_dict.get('OB', '')
-                    if is_doubles:
-                        if '/' in home_country:
-                            home_country = home_country.split('/')[0]
-                        if '/' in away_country:
-                            away_country = away_country.split('/')[0]
-                        if ';' in home_image:
-                            home_image = home_image.split(';')[0]
-                        if ';' in away_image:
-                            away_image = away_image.split(';')[0]
-                    
-                    match = {
-                        'match_id': record_dict.get('AA'),
-                        'start_time': record_dict.get('AD'),
-                        'start_time_alt': record_dict.get('ADE'),
-                        'update_time': record_dict.get('AO'),
-                        'sets_played': record_dict.get('AB'),
-                        'current_round': record_dict.get('CR'),
-                        'game_count': record_dict.get('AC'),
-                        'home_player': {
-                            'name': record_dict.get('CX'),
-                            'full_name': record_dict.get('AE', record_dict.get('CX')),
-                            'first_name': record_dict.get('FH', record_dict.get('CX')),
-                            'id': record_dict.get('JA'),
-                            'slug': record_dict.get('WU'),
-                            'country_code': record_dict.get('CA', record_dict.get('CY')),
-                            'country': home_country,
-                            'image': home_image,
-                            'is_winner': record_dict.get('AS') == '1'
-                        },
-                        'away_player': {
-                            'name': record_dict.get('AF', record_dict.get('CX')),
-                            'full_name': record_dict.get('AF', record_dict.get('CX')),
-                            'first_name': record_dict.get('FK', record_dict.get('CX')),
-                            'id': record_dict.get('JB'),
-                            'slug': record_dict.get('WV'),
-                            'country_code': record_dict.get('CB', record_dict.get('GB')),
-                            'country': away_country,
-                            'image': away_image,
-                            'is_winner': record_dict.get('AW') == '1'
-                        },
-                        'home_sets_won': record_dict.get('AG') if not is_doubles else None,
-                        'away_sets_won': record_dict.get('AH') if not is_doubles else None,
-                        'set_scores': {
-                            'set1': {
-                                'home': record_dict.get('BA') if not is_doubles else None,
-                                'away': record_dict.get('BB') if not is_doubles else None
-                            },
-                            'set2': {
-                                'home': record_dict.get('BC') if not is_doubles else None,
-                                'away': record_dict.get('BD') if not is_doubles else None
-                            },
-                            'set3': {
-                                'home': record_dict.get('BE') if not is_doubles else None,
-                                'away': record_dict.get('BF') if not is_doubles else None
-                            },
-                            'set4': {
-                                'home': record_dict.get('BG') if not is_doubles else None,
-                                'away': record_dict.get('BH') if not is_doubles else None
-                            }
-                        },
-                        'home_match_count': record_dict.get('HMC'),
-                        'live_status': record_dict.get('AN'),
-                        'market_watchers': record_dict.get('MW'),
-                        'bookmakers': record_dict.get('AL'),
-                        'misc_flags': {
-                            'home_rank_weight': record_dict.get('RW'),
-                            'away_rank_weight': record_dict.get('BW'),
-                            'bx_flag': record_dict.get('BX'),
-                            'link_status': record_dict.get('WL'),
-                            'home_code': record_dict.get('WM'),
-                            'away_code': record_dict.get('WN'),
-                            'home_rank_alt': record_dict.get('GRA'),
-                            'away_rank_alt': record_dict.get('GRB'),
-                            'home_set_flag': record_dict.get('AZ'),
-                            'away_set_flag': record_dict.get('AY'),
-                            'away_status': record_dict.get('AW')
-                        }
-                    }
-                    current_tournament['matches'].append(match)
-                elif 'QB' in record_dict:
-                    result['featured_matches'].append({
-                        'match_id': record_dict.get('QB'),
-                        'timestamp': record_dict.get('QC')
-                    })
-                elif 'A1' in record_dict:
-                    result['metadata']['session_hash'] = record_dict.get('A1')
+
+            with METRICS.timer('parse_events', sport=sport) as timer:
+                timer.size = len(data_string)
+                for kind, payload in PARSER.iter_events(data_string, compact=compact, sport=sport):
+                    if kind == 'tournament':
+                        result['tournaments'][payload['tournament_id']] = payload
+                    elif kind == 'match':
+                        tournament, match = payload
+                        tournament['matches'].append(match)
+                    elif kind == 'featured':
+                        result['featured_matches'].append(payload)
+                    elif kind == 'metadata':
+                        result['metadata'][payload[0]] = payload[1]
             
             return True, result
         
         except Exception as error:
             return False, f'Error parsing events data {error}'
-    
 
+    @staticmethod
+    def parse_flashscore_tennis(data_string, compact=False, sport='tennis'):
+        return PARSER.parse_flashscore_events(data_string, compact=compact, sport=sport)
+
+    @staticmethod
+    def merge_flashscore_events(previous, data_string, compact=False, sport='tennis'):
+        """
+        Parses a new feed snapshot against the previous one, decoding only match records whose raw text
+        (or whose tournament record) changed and reusing the previously parsed match objects for the rest.
+        
+        Args:
+            previous (dict): The value returned by the last merge, or None for a full parse.
+            data_string (str): The new raw feed.
+            compact (bool): Build MatchRecord/TournamentRecord objects, as in parse_flashscore_events.
+            sport (str): Registry key of the sport the feed belongs to.
+        
+        Returns:
+            (success, {'data': parsed feed, 'index': raw record index, 'changed': set of match ids, 'removed': set of match ids})
+        """
+        try:
+            previous = previous or {}
+            previous_index = previous.get('index', {})
+            known = {
+                match['match_id']: (previous_index.get(match['match_id']), match)
+                for tournament in previous.get('data', {}).get('tournaments', {}).values()
+                for match in tournament['matches']
+            }
+
+            result = {
+                'tournaments': {},
+                'featured_matches': [],
+                'metadata': {}
+            }
+            index = {}
+            for kind, payload in PARSER.iter_events(data_string, compact=compact, known=known, index=index, sport=sport):
+                if kind == 'tournament':
+                    result['tournaments'][payload['tournament_id']] = payload
+                elif kind == 'match':
+                    tournament, match = payload
+                    tournament['matches'].append(match)
+                elif kind == 'featured':
+                    result['featured_matches'].append(payload)
+                elif kind == 'metadata':
+                    result['metadata'][payload[0]] = payload[1]
+
+            changed = {match_id for match_id, fingerprint in index.items() if previous_index.get(match_id) != fingerprint}
+            removed = set(known) - set(index)
+            return True, {'data': result, 'index': index, 'changed': changed, 'removed': removed}
+
+        except Exception as error:
+            return False, f'Error merging events data {error}'
+
+    @staticmethod
+    def merge_flashscore_tennis(previous, data_string, compact=False):
+        return PARSER.merge_flashscore_events(previous, data_string, compact=compact, sport='tennis')
+
+    @staticmethod
+    def odds_value(value):
+        """
+        Decimal odds from a feed field such as '1.85' or '1.85[u]'; 0 when missing or unparsable.
+        """
+        match = re.match(r'\d+(?:\.\d+)?', value or '')
+        return float(match.group()) if match else 0
+
+    @staticmethod
+    def parse_flashscore_odds(data_string):
+        """
+        Parses the bulk odds feed (`fo_2_0_1_en_1_0`) into per-match best prices.
+        A record with an `AA` field opens a match; `XA`/`XB` home/away prices that follow, on the same record or on
+        bookmaker records carrying a `BI` id, are folded into that match's best prices. 3-way feeds (football) also
+        carry an `XX` draw price, kept as `XX`/`draw_bookmaker_id`.
+        
+        Returns:
+            dict: match_id -> {'XA', 'XB', 'home_bookmaker_id', 'away_bookmaker_id', 'bookmakers'}
+        """
+        try:
+            result = {}
+            current_match = None
+            for record in PARSER.iter_records(data_string):
+                if not record.strip():
+                    continue
+                fields = PARSER.split_fields(record)
+                if 'AA' in fields:
+                    current_match = fields['AA']
+                if current_match is None or ('XA' not in fields and 'XB' not in fields and 'XX' not in fields):
+                    continue
+
+                prices = result.setdefault(current_match, {
+                    'XA': 0,
+                    'XB': 0,
+                    'home_bookmaker_id': None,
+                    'away_bookmaker_id': None,
+                    'bookmakers': 0
+                })
+                bookmaker_id = fields.get('BI')
+                home_odds = PARSER.odds_value(fields.get('XA'))
+                away_odds = PARSER.odds_value(fields.get('XB'))
+                prices['bookmakers'] += 1
+                if home_odds > prices['XA']:
+                    prices['XA'] = home_odds
+                    prices['home_bookmaker_id'] = bookmaker_id
+                if away_odds > prices['XB']:
+                    prices['XB'] = away_odds
+                    prices['away_bookmaker_id'] = bookmaker_id
+                if 'XX' in fields:
+                    draw_odds = PARSER.odds_value(fields.get('XX'))
+                    if draw_odds > prices.get('XX', 0):
+                        prices['XX'] = draw_odds
+                        prices['draw_bookmaker_id'] = bookmaker_id
+
+            return True, result
+        except Exception as error:
+            return False, f'Error parsing odds feed {error}'
+
+    @staticmethod
+    def to_dict(parsed):
+        """
+        Converts a compact parse_flashscore_events result to the plain dict layout; dict results pass through.
+        """
+        return {
+            **parsed,
+            'tournaments': {
+                tournament_id: tournament.to_dict() if isinstance(tournament, TournamentRecord) else tournament
+                for tournament_id, tournament in parsed.get('tournaments', {}).items()
+            }
+        }
+
+    @staticmethod
+    def start_epoch(match):
+        """
+        Start time of a match dict or MatchRecord as epoch seconds, None if unknown.
+        """
+        if isinstance(match, MatchRecord):
+            return match.start_epoch
+        return Utils.parse_timestamp(match.get('start_time'))
+
+    @staticmethod
+    def is_live(match):
+        """
+        Whether a match is in play. The feed's AB field (stored as `sets_played`) is the event stage:
+        1 scheduled, 2 live, 3 finished.
+        """
+        return str(match.get('sets_played')) == '2'
+
+    @staticmethod
+    def is_finished(match):
+        return str(match.get('sets_played')) == '3'
+
+    @staticmethod
+    def match_summary(match):
+        """
+        The fields CALCULATOR reports for a match, from either a match dict or a MatchRecord.
+        """
+        if isinstance(match, MatchRecord):
+            return match.summary()
+        return {
+            'match_id': match['match_id'],
+            'home_player': match['home_player']['name'],
+            'away_player': match['away_player']['name'],
+            'start_time': match['start_time'],
+            'home_sets_won': match['home_sets_won'],
+            'away_sets_won': match['away_sets_won'],
+            'set_scores': match['set_scores']
+        }
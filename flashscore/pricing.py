@@ -0,0 +1,230 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flashscore.oddsbook import OddsBook
+from flashscore.vectorized import BATCH_ARBITRAGE
+
+class PRICING:
+    """
+    Odds extraction and arbitrage maths, free of any scanner state: everything a price depends on is an
+    argument. CALCULATOR (which adds its stage metrics), REPLAY and the benchmarks all price through it.
+    """
+    @staticmethod
+    def extract_full_time_odds(odds_data):
+        """
+        Extracts full-time home/away odds from the GraphQL response for each bookmaker, filtering for active odds.
+        """
+        try:
+            event_odds = odds_data.get('data', {}).get('findOddsByEventId', {}).get('odds', [])
+            if not event_odds:
+                return True, event_odds
+
+            full_time_odds = []
+            for item in event_odds:
+                if item.get('bettingType') == 'HOME_AWAY' and item.get('bettingScope') == 'FULL_TIME':
+                    bookmaker_id = item.get('bookmakerId')
+                    odds = item.get('odds', [])
+                    if len(odds) == 2 and odds[0].get('active', False) and odds[1].get('active', False):
+                        home_odds = float(odds[0]['value']) if 'value' in odds[0] else 0
+                        away_odds = float(odds[1]['value']) if 'value' in odds[1] else 0
+                        if home_odds > 0 and away_odds > 0:
+                            full_time_odds.append({
+                                'BI': str(bookmaker_id),
+                                'XA': home_odds,
+                                'XB': away_odds
+                            })
+            
+            return True, full_time_odds
+        except Exception as error:
+            return False, f'Error extracting full time odds: {error}'
+
+    @staticmethod
+    def market_key(betting_type, betting_scope, line=None):
+        return f'{betting_type}:{betting_scope}' if line in (None, '') else f'{betting_type}:{betting_scope}:{line}'
+
+    @staticmethod
+    def outcome_keys(count):
+        """
+        Row keys for a market's outcomes: XA/XB for 2-way markets (as in extract_full_time_odds), XA/XX/XB for 3-way.
+        """
+        if count == 2:return ('XA', 'XB')
+        if count == 3:return ('XA', 'XX', 'XB')
+        return tuple(f'X{index + 1}' for index in range(count))
+
+    @staticmethod
+    def extract_markets(odds_data):
+        """
+        Indexes every betting type, scope and line of a GraphQL odds response in one pass.
+        Rows follow the extract_full_time_odds format, with one key per outcome (see outcome_keys), and only
+        bookmakers whose outcomes are all active and priced are kept. Outcomes are matched by their label
+        (selection or participant), in the order the market's first bookmaker lists them; rows whose labels
+        differ from the market's are dropped.
+        Returns: (success, {market_key: {'outcomes': keys, 'labels': outcome labels, 'rows': [...]}})
+        """
+        try:
+            event_odds = odds_data.get('data', {}).get('findOddsByEventId', {}).get('odds', []) or []
+            markets = {}
+            for item in event_odds:
+                odds = item.get('odds', [])
+                if len(odds) < 2 or not all(odd.get('active', False) for odd in odds):
+                    continue
+                try:
+                    values = [float(odd['value']) if 'value' in odd else 0 for odd in odds]
+                except (TypeError, ValueError):
+                    continue
+                if min(values) <= 0:
+                    continue
+
+                line = (odds[0].get('handicap') or {}).get('value')
+                key = PRICING.market_key(item.get('bettingType'), item.get('bettingScope'), line)
+                labels = [odd.get('selection') or odd.get('eventParticipantId') for odd in odds]
+                market = markets.get(key)
+                if market is None:
+                    market = markets[key] = {
+                        'outcomes': PRICING.outcome_keys(len(odds)),
+                        'labels': labels,
+                        'rows': []
+                    }
+                if len(odds) != len(market['outcomes']):
+                    continue
+                if labels != market['labels']:
+                    # Same outcomes listed in another order are re-keyed by label, anything else would price the wrong outcome
+                    if len(set(labels)) != len(labels) or set(labels) != set(market['labels']):
+                        continue
+                    by_label = dict(zip(labels, values))
+                    values = [by_label[label] for label in market['labels']]
+                market['rows'].append({'BI': str(item.get('bookmakerId')), **dict(zip(market['outcomes'], values))})
+
+            return True, markets
+        except Exception as error:
+            return False, f'Error extracting markets: {error}'
+
+    @staticmethod
+    def calculate_market_arbitrage(odds_book, capital, min_profit_percentage=0, market=None):
+        """
+        N-way counterpart of calculate_arbitrage for any market held in an OddsBook (2-way, 3-way, totals, handicaps).
+        Returns: (has_arb: bool, arb_details: dict or None)
+        """
+        try:
+            if not odds_book or len(odds_book) < 2:
+                return False, 'No odds data'
+
+            best = {outcome: odds_book.best(outcome) for outcome in odds_book.outcomes}
+            if any(price is None or price['price'] <= 1 for price in best.values()):
+                return False, 'Low best odds'
+
+            implied = {outcome: 1 / price['price'] for outcome, price in best.items()}
+            total_implied_prob = sum(implied.values())
+            if total_implied_prob >= 1:
+                return False, None
+
+            stakes = {outcome: probability / total_implied_prob * capital for outcome, probability in implied.items()}
+            profit_amount = capital / total_implied_prob - capital
+            profit_percentage = (profit_amount / capital) * 100
+            if profit_percentage < min_profit_percentage:
+                return False, f'Profit percentage {profit_percentage:.2f}% below minimum {min_profit_percentage}%'
+
+            return True, {
+                'market': market,
+                'odds': {outcome: price['price'] for outcome, price in best.items()},
+                'bookmaker_ids': {outcome: price['bookmaker_id'] for outcome, price in best.items()},
+                'stakes': {outcome: round(stake, 2) for outcome, stake in stakes.items()},
+                'profit_amount': round(profit_amount, 2),
+                'profit_percentage': round(profit_percentage, 2),
+                'total_implied_prob': round(total_implied_prob, 4)
+            }
+        except Exception as error:
+            return False, f'Error calculating market arb: {error}'
+
+    @staticmethod
+    def calculate_arbitrage(odds_data, capital, min_profit_percentage=0):
+        """
+        Calculates arbitrage opportunities for a match's odds.
+        Args:
+            odds_data: List of dicts with bookmaker odds (e.g., [{'BI': '417', 'XA': 1.8, 'XB': 2.0}, ...]) or an OddsBook.
+            capital: Investment capital for simulation.
+            min_profit_percentage: Arbs below this profit are reported as skipped.
+        Returns: (has_arb: bool, arb_details: dict or None)
+        """
+        try:
+            if not odds_data or len(odds_data) < 2:
+                return False, 'No odds data'
+            
+            # Find best odds for home (XA) and away (XB)
+            best_home_odds = 0
+            best_away_odds = 0
+            home_bookmaker = None
+            away_bookmaker = None
+            
+            if isinstance(odds_data, OddsBook):
+                # The book keeps its best prices indexed, no need to scan every bookmaker
+                best_home, best_away = odds_data.best('XA'), odds_data.best('XB')
+                if best_home:
+                    best_home_odds, home_bookmaker = best_home['price'], best_home['bookmaker_id']
+                if best_away:
+                    best_away_odds, away_bookmaker = best_away['price'], best_away['bookmaker_id']
+            else:
+                for bookmaker in odds_data:
+                    home_odds = float(bookmaker.get('XA', 0))
+                    away_odds = float(bookmaker.get('XB', 0))
+                    if home_odds > best_home_odds:
+                        best_home_odds = home_odds
+                        home_bookmaker = bookmaker.get('BI')
+                    if away_odds > best_away_odds:
+                        best_away_odds = away_odds
+                        away_bookmaker = bookmaker.get('BI')
+            
+            if best_home_odds <= 1 or best_away_odds <= 1:
+                return False, 'Low best home_away odds'
+            
+            # Calculate implied probabilities
+            implied_prob_home = 1 / best_home_odds if best_home_odds > 0 else 0
+            implied_prob_away = 1 / best_away_odds if best_away_odds > 0 else 0
+            total_implied_prob = implied_prob_home + implied_prob_away
+            
+            if total_implied_prob >= 1 or total_implied_prob == 0:
+                return False, None
+            
+            # Calculate stakes for arbitrage
+            stake_home = (implied_prob_home / total_implied_prob) * capital
+            stake_away = (implied_prob_away / total_implied_prob) * capital
+            profit_amount = stake_home * best_home_odds - capital  # Profit if home wins (same for away)
+            profit_percentage = (profit_amount / capital) * 100
+            
+            # Check if profit percentage meets minimum threshold
+            if profit_percentage < min_profit_percentage:
+                return False, f'Profit percentage {profit_percentage:.2f}% below minimum {min_profit_percentage}%'
+            
+            arb_details = {
+                'home_odds': best_home_odds,
+                'away_odds': best_away_odds,
+                'home_bookmaker_id': home_bookmaker,
+                'away_bookmaker_id': away_bookmaker,
+                'stake_home': round(stake_home, 2),
+                'stake_away': round(stake_away, 2),
+                'profit_amount': round(profit_amount, 2),
+                'profit_percentage': round(profit_percentage, 2),
+                'total_implied_prob': round(total_implied_prob, 4)
+            }
+            return True, arb_details
+        except Exception as error:
+            return False, f'Error calculating arb: {error}'
+
+    @staticmethod
+    def calculate_arbitrage_batch(odds_by_match, capital, min_profit_percentage=0):
+        """
+        Vectorized calculate_arbitrage over many matches (see BATCH_ARBITRAGE).
+        Args:
+            odds_by_match: List of per-match odds lists, each in the calculate_arbitrage format.
+            capital: Investment capital for simulation.
+            min_profit_percentage: Arbs below this profit are left out.
+        Returns: list of (has_arb: bool, arb_details: dict or None), in input order.
+        """
+        if not odds_by_match:
+            return []
+        odds_matrix, bookmaker_ids, counts = BATCH_ARBITRAGE.pad_odds(odds_by_match)
+        batch = BATCH_ARBITRAGE.calculate(odds_matrix, counts, capital, min_profit_percentage)
+        return [
+            (True, BATCH_ARBITRAGE.arb_details(batch, bookmaker_ids, row)) if batch['has_arb'][row] else (False, None)
+            for row in range(len(odds_by_match))
+        ]
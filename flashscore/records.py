@@ -0,0 +1,131 @@
+from configs import sys
+
+def intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+def epoch(value):
+    """
+    Feed timestamps as ints (e.g. 'AD÷1757595600' -> 1757595600), None when missing or malformed.
+    """
+    if value is None:return None
+    try:
+        return int(str(value).rstrip('|'))
+    except (ValueError, TypeError):
+        return None
+
+class Record:
+    """
+    Mapping-style access shared by the compact records, so code written against the dict output
+    (record['key'], record.get('key')) keeps working.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return self.field(key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            value = self.field(key)
+        except AttributeError:
+            return default
+        return value
+
+    def __contains__(self, key):
+        try:
+            self.field(key)
+            return True
+        except AttributeError:
+            return False
+
+    def field(self, key):
+        return getattr(self, key)
+
+class TournamentRecord(Record):
+    __slots__ = (
+        'tournament_name', 'tournament_id', 'sport_id', 'sport_name', 'category', 'tournament_name_from_url',
+        'category_id', 'surface', 'tournament_unique_id', 'format', 'status', 'game_type', 'combined_id',
+        'stage', 'link', 'image', 'zx_field', 'season_id', 'tournament_status', 'tss', 'category_name', 'matches'
+    )
+
+    def __init__(self, tournament):
+        for key in self.__slots__:
+            setattr(self, key, intern(tournament.get(key)))
+        self.matches = []
+
+    def to_dict(self):
+        tournament = {key: getattr(self, key) for key in self.__slots__}
+        tournament['matches'] = [match.to_dict() for match in self.matches]
+        return tournament
+
+class MatchRecord(Record):
+    """
+    Compact parsed match. Fields the calculator reads on every scan are stored decoded (epoch ints,
+    interned strings); everything else stays in the raw feed record and is decoded on first access, then
+    kept. Mapping access always returns what the dict output has: record['start_time'] is the formatted
+    timestamp, the epoch ints are the start_epoch/start_epoch_alt/update_epoch attributes.
+    """
+    __slots__ = (
+        'match_id', 'start_epoch', 'start_epoch_alt', 'update_epoch', 'sets_played', 'live_status',
+        'home_name', 'away_name', 'home_country_code', 'away_country_code',
+        'home_sets_won', 'away_sets_won', 'is_doubles', 'raw', 'decoded'
+    )
+
+    def __init__(self, fields, raw, is_doubles=False):
+        self.match_id = fields.get('AA')
+        self.start_epoch = epoch(fields.get('AD'))
+        self.start_epoch_alt = epoch(fields.get('ADE'))
+        self.update_epoch = epoch(fields.get('AO'))
+        self.sets_played = intern(fields.get('AB'))
+        self.live_status = intern(fields.get('AN'))
+        self.home_name = fields.get('CX')
+        self.away_name = fields.get('AF', fields.get('CX'))
+        self.home_country_code = intern(fields.get('CA', fields.get('CY')))
+        self.away_country_code = intern(fields.get('CB', fields.get('GB')))
+        self.home_sets_won = intern(fields.get('AG')) if not is_doubles else None
+        self.away_sets_won = intern(fields.get('AH')) if not is_doubles else None
+        self.is_doubles = is_doubles
+        self.raw = raw
+        self.decoded = None
+
+    def to_dict(self):
+        """
+        The match exactly as PARSER.parse_flashscore_events returns it without compact=True.
+        """
+        from flashscore.parser import PARSER
+        return PARSER.build_match(PARSER.parse_record(self.raw), self.tournament_stub())
+
+    def tournament_stub(self):
+        """
+        The tournament fields PARSER.build_match reads, enough to rebuild the match without its tournament.
+        """
+        from flashscore.sports import SPORTS
+        return {'sport_id': SPORTS.sport_id('tennis'), 'game_type': '1'} if self.is_doubles else {}
+
+    def field(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        # Legacy keys (formatted timestamps, nested players, set scores, flags) come from the raw record
+        if self.decoded is None:
+            self.decoded = self.to_dict()
+        if key not in self.decoded:raise AttributeError(key)
+        return self.decoded[key]
+
+    def summary(self):
+        """
+        The per-match fields CALCULATOR reports, decoding only the set scores from the raw record.
+        """
+        from flashscore.parser import PARSER
+        from utils import Utils
+        set_scores = PARSER.build_match(PARSER.split_fields(self.raw), self.tournament_stub())['set_scores']
+        return {
+            'match_id': self.match_id,
+            'home_player': self.home_name,
+            'away_player': self.away_name,
+            'start_time': Utils.convert_timestamp(self.start_epoch) if self.start_epoch is not None else self.field('start_time'),
+            'home_sets_won': self.home_sets_won,
+            'away_sets_won': self.away_sets_won,
+            'set_scores': set_scores
+        }
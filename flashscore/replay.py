@@ -0,0 +1,421 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import gzip, glob, heapq, hashlib, itertools, multiprocessing, shutil, zlib
+from configs import json, time, traceback, datetime, timezone, Lock, Thread, atexit
+from utils import Utils
+from flashscore.parser import PARSER
+from flashscore.oddsbook import OddsBook
+from flashscore.sports import SPORTS
+from flashscore.arbs import ARB_TRACKER
+from flashscore.pricing import PRICING
+from metrics import METRICS
+
+class RECORDER:
+    """
+    Appends the raw event feeds and odds payloads a scanner fetches to one JSON-lines file per UTC day
+    (`<directory>/scans-YYYYMMDD.jsonl`), for REPLAY. Lines are flushed as they are written, so a killed scanner
+    loses at most the line in progress; a day's file is gzipped to `scans-YYYYMMDD.jsonl.gz` in the background
+    once the day is over (at the first record of the next day, or when a recorder starts on a later day). Each line is
+    {'t': epoch, 'k': 'feed', 's': sport, 'p': feed text} or {'t', 'k': 'odds', 's', 'm': match_id, 'g': geo, 'p': payload}.
+    A feed identical to the last one recorded for its sport is skipped, and so is an odds payload whose hash
+    (attached by FEEDS) equals the last one recorded for its match and geo: replaying it would change nothing.
+    """
+    def __init__(self, directory, compresslevel=1):
+        self.directory = directory
+        self.compresslevel = compresslevel
+        self.file = None
+        self.day = None
+        self.feed_hashes = {}
+        self.odds_hashes = {}
+        self.lock = Lock()
+        os.makedirs(directory, exist_ok=True)
+        atexit.register(self.close)
+        # Days left uncompressed by a scanner that stopped before they were over
+        today = datetime.now(timezone.utc).strftime('%Y%m%d')
+        for path in glob.glob(os.path.join(directory, 'scans-*.jsonl')):
+            if os.path.basename(path)[len('scans-'):-len('.jsonl')] < today:
+                self.compress_later(path)
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        day = datetime.fromtimestamp(record['t'], tz=timezone.utc).strftime('%Y%m%d')
+        with self.lock:
+            if day != self.day:
+                if self.file is not None:
+                    self.file.close()
+                    self.compress_later(self.file.name)
+                path = os.path.join(self.directory, f'scans-{day}.jsonl')
+                # A line cut short by a killed scanner is ended, so it only costs itself
+                torn = os.path.exists(path) and os.path.getsize(path) and not self.ends_with_newline(path)
+                self.file = open(path, 'a', encoding='utf-8', buffering=1)
+                if torn:self.file.write('\n')
+                self.day = day
+            self.file.write(line)
+
+    @staticmethod
+    def ends_with_newline(path):
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def compress_later(self, path):
+        Thread(target=self.compress, args=(path,), daemon=True).start()
+
+    def compress(self, path):
+        """
+        Gzips a finished day's file to `<path>.gz`, after the records already archived there (read up to any cut
+        left by a killed recorder), and removes it. The archive is written to a temporary file first, so an
+        interrupted compression leaves the day's file intact.
+        """
+        try:
+            target = path + '.gz'
+            partial = target + '.tmp'
+            with gzip.open(partial, 'wb', compresslevel=self.compresslevel) as archive:
+                if os.path.exists(target):
+                    last = b'\n'
+                    try:
+                        with gzip.open(target, 'rb') as previous:
+                            for chunk in iter(lambda: previous.read1(1 << 16), b''):
+                                archive.write(chunk)
+                                last = chunk[-1:]
+                    except (EOFError, zlib.error, gzip.BadGzipFile) as error:
+                        Utils.write_log(f'{target} is truncated ({error}), archived up to the cut', level='WARNING')
+                    if last != b'\n':archive.write(b'\n')
+                with open(path, 'rb') as source:
+                    shutil.copyfileobj(source, archive)
+            os.replace(partial, target)
+            os.remove(path)
+        except Exception as error:
+            Utils.write_log(f'Could not compress recording {path}: {error}', level='WARNING')
+
+    def record_feed(self, sport, data_string):
+        feed_hash = hashlib.blake2b(data_string.encode('utf-8'), digest_size=16).digest()
+        if self.feed_hashes.get(sport) == feed_hash:return
+        self.feed_hashes[sport] = feed_hash
+        self.write({'t': time.time(), 'k': 'feed', 's': sport, 'p': data_string})
+
+    def record_odds(self, sport, match_id, geo, payload):
+        payload_hash = getattr(payload, 'payload_hash', None)
+        if payload_hash is not None:
+            if self.odds_hashes.get((match_id, geo)) == payload_hash:return
+            self.odds_hashes[(match_id, geo)] = payload_hash
+        self.write({'t': time.time(), 'k': 'odds', 's': sport, 'm': match_id, 'g': geo, 'p': payload})
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+                self.day = None
+
+class RECORDING_FEEDS:
+    """
+    FEEDS of one sport's CALCULATOR that also hands every event feed and odds payload it returns to a RECORDER.
+    Everything else is delegated to the wrapped FEEDS, which can be shared between sports.
+    """
+    def __init__(self, feeds, recorder, sport):
+        self.feeds = feeds
+        self.recorder = recorder
+        self.sport = sport
+
+    def __getattr__(self, name):
+        return getattr(self.feeds, name)
+
+    def get_sport_events(self, sport, with_odds=False):
+        success, data = self.feeds.get_sport_events(sport, with_odds=with_odds)
+        if success and not with_odds:self.recorder.record_feed(sport, data)
+        return success, data
+
+    def get_sport_events_delta(self, sport, with_odds=False):
+        success, feed = self.feeds.get_sport_events_delta(sport, with_odds=with_odds)
+        if success and feed['changed'] and not with_odds:self.recorder.record_feed(sport, feed['data'])
+        return success, feed
+
+    def stream_sport_events(self, sport, with_odds=False, **options):
+        success, chunks = self.feeds.stream_sport_events(sport, with_odds=with_odds, **options)
+        if not success or with_odds:return success, chunks
+
+        def recorded():
+            received = []
+            for chunk in chunks:
+                received.append(chunk)
+                yield chunk
+            self.recorder.record_feed(sport, ''.join(received))
+        return success, recorded()
+
+    def get_odds_data(self, event_id, project_id='2', geo_ip_code='NG', geo_ip_subdivision_code='NGLA'):
+        success, payload = self.feeds.get_odds_data(event_id, project_id=project_id, geo_ip_code=geo_ip_code, geo_ip_subdivision_code=geo_ip_subdivision_code)
+        if success:self.recorder.record_odds(self.sport, event_id, f'{geo_ip_code}/{geo_ip_subdivision_code}', payload)
+        return success, payload
+
+def iter_records(paths, sport=None):
+    """
+    Yields recorded records from .jsonl.gz / .jsonl files and directories of them, in file name order (a day's
+    .jsonl.gz before its .jsonl, which holds the later records). Unreadable lines are skipped, and a file whose
+    gzip stream is cut short (its recorder was killed) is read up to the cut.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = glob.glob(os.path.join(path, '*.jsonl.gz')) + glob.glob(os.path.join(path, '*.jsonl'))
+            files.extend(sorted(found, key=lambda file: (file.split('.jsonl')[0], not file.endswith('.gz'))))
+        else:
+            files.append(path)
+    for file in files:
+        opener = gzip.open if file.endswith('.gz') else open
+        try:
+            with opener(file, 'rt', encoding='utf-8', errors='replace') as f:
+                for number, line in enumerate(f, 1):
+                    if not line.strip():continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        Utils.write_log(f'Skipped unreadable line {number} of {file}', level='WARNING')
+                        continue
+                    if sport is None or record.get('s') == sport:
+                        yield record
+        except (EOFError, zlib.error, gzip.BadGzipFile) as error:
+            Utils.write_log(f'{file} is truncated ({error}), replayed up to the cut', level='WARNING')
+
+class REPLAY:
+    """
+    Backtest of recorded scans on a simulated clock. Feed snapshots go through PARSER (incrementally, see
+    PARSER.merge_flashscore_events) to know which matches exist; every odds snapshot is extracted once
+    (extract_full_time_odds, or extract_markets for multi-market and 3-way sports), merged with the latest
+    snapshot of the match's other geos and priced with PRICING.calculate_arbitrage / calculate_market_arbitrage.
+    Several parameter sets share one pass over the data as long as they share `refresh_interval`, the
+    simulated odds refresh policy: a (match, geo) is re-read at most every `refresh_interval` seconds, so a
+    snapshot arriving sooner waits for the next refresh (and is replaced by any newer one meanwhile).
+    Each set keeps its own ARB_TRACKER, hysteresis, minimum profit and balance, booking the profit of each
+    arb once when it opens, like the live scanner.
+    """
+    def __init__(self, parameter_sets, sport='tennis', multi_market=False, max_curve_points=500):
+        intervals = {params.get('refresh_interval', 0) for params in parameter_sets}
+        if len(intervals) > 1:
+            raise Exception('Parameter sets of one REPLAY must share refresh_interval')
+        self.refresh_interval = intervals.pop()
+        self.sport = SPORTS.key(sport)
+        self.two_way = SPORTS.get(self.sport)['outcomes'] == ('XA', 'XB')
+        self.primary_market = SPORTS.main_market(self.sport)
+        self.multi_market = multi_market
+        self.max_curve_points = max_curve_points
+        self.runs = [
+            {
+                'params': params,
+                'min_profit_percentage': params.get('min_profit_percentage', 0),
+                'tracker': ARB_TRACKER(hysteresis=params.get('arb_hysteresis', 0.25), history=None),
+                'balance': params.get('capital', 1000),
+                'curve': []
+            }
+            for params in parameter_sets
+        ]
+        # Prices once for every set: an arb is only re-priced per set when it clears the lowest minimum
+        self.screen_min_profit = min(params.get('min_profit_percentage', 0) for params in parameter_sets)
+        self.feed_state = None
+        self.odds = {}
+        self.used_at = {}
+        self.pending = {}
+        self.due = []
+        self.clock = 0
+        self.counts = {'feeds': 0, 'odds': 0, 'odds_deferred': 0, 'odds_superseded': 0, 'priced': 0}
+
+    def extract(self, payload):
+        """
+        Returns: dict market -> rows of one odds snapshot, or None when it cannot be read.
+        """
+        if self.two_way and not self.multi_market:
+            success, rows = PRICING.extract_full_time_odds(payload)
+            return {self.primary_market: (OddsBook.outcomes, rows)} if success else None
+        success, markets = PRICING.extract_markets(payload)
+        if not success:return None
+        return {
+            key: (market['outcomes'], market['rows'])
+            for key, market in markets.items()
+            if self.multi_market or key == self.primary_market
+        }
+
+    def merge(self, match_id):
+        """
+        OddsBook per market from the latest snapshot of every geo of a match.
+        """
+        books = {}
+        for geo, markets in self.odds[match_id].items():
+            for key, (outcomes, rows) in markets.items():
+                book = books.get(key)
+                if book is None:
+                    book = books[key] = OddsBook(outcomes=outcomes)
+                for row in rows:
+                    book.upsert_row(row, geo=geo, timestamp=self.clock)
+        return books
+
+    def price(self, min_profit_percentage, key, book, capital):
+        if self.two_way and key == self.primary_market:
+            return PRICING.calculate_arbitrage(book, capital, min_profit_percentage)
+        return PRICING.calculate_market_arbitrage(book, capital, min_profit_percentage, market=key)
+
+    def on_feed(self, record):
+        success, merged = PARSER.merge_flashscore_events(self.feed_state, record['p'], sport=self.sport)
+        if not success:
+            Utils.write_log(f"Skipped unreadable feed snapshot at {record['t']}: {merged}", level='WARNING')
+            return
+        self.counts['feeds'] += 1
+        self.feed_state = merged
+        if not merged['removed']:return
+        for match_id in merged['removed']:
+            self.odds.pop(match_id, None)
+            for key in [key for key in self.pending if key[0] == match_id]:
+                del self.pending[key]
+        current = merged['index'].keys()
+        for run in self.runs:
+            run['tracker'].retain(current, now=self.clock)
+
+    def on_odds(self, record):
+        key = (record['m'], record['g'])
+        last = self.used_at.get(key)
+        if last is not None and record['t'] - last < self.refresh_interval:
+            if key in self.pending:
+                self.counts['odds_superseded'] += 1
+            else:
+                heapq.heappush(self.due, (last + self.refresh_interval, key))
+                self.counts['odds_deferred'] += 1
+            self.pending[key] = record
+            return
+        self.apply(record)
+
+    def refresh_due(self, until):
+        """
+        Applies the deferred snapshots whose refresh time is not after `until`, each at its refresh time.
+        """
+        while self.due and self.due[0][0] <= until:
+            due, key = heapq.heappop(self.due)
+            record = self.pending.pop(key, None)
+            if record is None:continue
+            self.clock = max(self.clock, due)
+            self.apply(record)
+
+    def apply(self, record):
+        match_id, geo = record['m'], record['g']
+        self.used_at[(match_id, geo)] = self.clock
+        self.counts['odds'] += 1
+        markets = self.extract(record['p'])
+        if markets is None:return
+        self.odds.setdefault(match_id, {})[geo] = markets
+
+        books = self.merge(match_id)
+        self.counts['priced'] += 1
+        screened = []
+        for key, book in books.items():
+            has_arb, details = self.price(self.screen_min_profit, key, book, 100)
+            if has_arb:screened.append((key, book, details['profit_percentage']))
+
+        for run in self.runs:
+            found = []
+            for key, book, profit_percentage in screened:
+                if profit_percentage < run['min_profit_percentage']:continue
+                has_arb, details = self.price(run['min_profit_percentage'], key, book, run['balance'])
+                if has_arb:found.append((key, details))
+            if not found and match_id not in run['tracker'].by_match:continue
+            for event in run['tracker'].update(match_id, found, now=self.clock):
+                if event['event'] == 'opened':
+                    run['balance'] += event['details']['profit_amount']
+                    run['curve'].append((self.clock, round(run['balance'], 2)))
+
+    def run(self, records):
+        started = time.perf_counter()
+        first = None
+        for record in records:
+            if first is None:first = record['t']
+            self.refresh_due(record['t'])
+            self.clock = max(self.clock, record['t'])
+            if record['k'] == 'feed':
+                self.on_feed(record)
+            elif record['k'] == 'odds':
+                self.on_odds(record)
+        self.refresh_due(float('inf'))
+        wall = time.perf_counter() - started
+        return {
+            'refresh_interval': self.refresh_interval,
+            'records': self.counts,
+            'simulated_seconds': round(self.clock - first, 1) if first is not None else 0,
+            'wall_seconds': round(wall, 2),
+            'speedup': round((self.clock - first) / wall, 1) if first is not None and wall else None,
+            'results': [self.report(run) for run in self.runs]
+        }
+
+    def report(self, run):
+        tracker = run['tracker']
+        lifetimes = sorted(tracker.lifetimes)
+        pick = lambda share: lifetimes[min(len(lifetimes) - 1, int(len(lifetimes) * share))] if lifetimes else None
+        curve = run['curve']
+        step = max(1, len(curve) // self.max_curve_points)
+        capital = run['params'].get('capital', 1000)
+        return {
+            'params': run['params'],
+            'arbs': {**tracker.counts, 'open_at_end': len(tracker.open)},
+            'duration_seconds': {
+                'mean': round(sum(lifetimes) / len(lifetimes), 2) if lifetimes else None,
+                'median': pick(0.5),
+                'p95': pick(0.95),
+                'max': lifetimes[-1] if lifetimes else None
+            },
+            'balance': {'start': capital, 'end': round(run['balance'], 2), 'profit': round(run['balance'] - capital, 2)},
+            'balance_curve': curve[::step] + ([curve[-1]] if curve and (len(curve) - 1) % step else [])
+        }
+
+def run_replay(paths, parameter_sets, sport='tennis', multi_market=False):
+    """
+    One REPLAY over the recordings at `paths`; the entry point of each replay process.
+    Returns: (success, report)
+    """
+    try:
+        # Stage metrics would cost more than the pricing they time
+        METRICS.enabled = False
+        replay = REPLAY(parameter_sets, sport=sport, multi_market=multi_market)
+        return True, replay.run(iter_records(paths, sport=SPORTS.key(sport)))
+    except Exception as error:
+        traceback.print_exception(error)
+        return False, str(error)
+
+def replay_grid(paths, parameter_sets, sport='tennis', multi_market=False, processes=None):
+    """
+    Replays every parameter set, one process per refresh_interval (each process reads the recordings once
+    for all of its sets).
+    Returns: list of (success, report), in refresh_interval order.
+    """
+    groups = {}
+    for params in parameter_sets:
+        groups.setdefault(params.get('refresh_interval', 0), []).append(params)
+    jobs = [(paths, group, sport, multi_market) for _, group in sorted(groups.items())]
+    if len(jobs) == 1 or processes == 1:
+        return [run_replay(*job) for job in jobs]
+    with multiprocessing.get_context('spawn').Pool(min(len(jobs), processes or os.cpu_count() or 1)) as pool:
+        return pool.starmap(run_replay, jobs)
+
+if __name__ == "__main__":
+    import argparse
+    arg_parser = argparse.ArgumentParser(description='Replay recorded scans (see --record of flashscore/calculator.py) over parameter sets')
+    arg_parser.add_argument('paths', nargs='+', help='recording directories or scans-*.jsonl(.gz) files')
+    arg_parser.add_argument('--capital', type=float, default=1000)
+    arg_parser.add_argument('--min-profit', type=float, nargs='+', default=[0.5], help='min_profit_percentage values to try')
+    arg_parser.add_argument('--hysteresis', type=float, nargs='+', default=[0.25], help='arb hysteresis values to try')
+    arg_parser.add_argument('--refresh', type=float, nargs='+', default=[0], help='simulated odds refresh intervals in seconds (0 = every recorded snapshot)')
+    arg_parser.add_argument('--sport', default='tennis', choices=sorted(SPORTS.registry), help='sport to replay (default tennis)')
+    arg_parser.add_argument('--multi-market', action='store_true', help='also price set, totals and handicap markets')
+    arg_parser.add_argument('--processes', type=int, default=None, help='parallel replays (default CPU count)')
+    arg_parser.add_argument('--output', default=None, help='also write the JSON report to this file')
+    args = arg_parser.parse_args()
+
+    parameter_sets = [
+        {'capital': args.capital, 'min_profit_percentage': min_profit, 'arb_hysteresis': hysteresis, 'refresh_interval': refresh}
+        for min_profit, hysteresis, refresh in itertools.product(args.min_profit, args.hysteresis, args.refresh)
+    ]
+    started = time.perf_counter()
+    reports = replay_grid(args.paths, parameter_sets, sport=args.sport, multi_market=args.multi_market, processes=args.processes)
+    text = json.dumps({
+        'wall_seconds': round(time.perf_counter() - started, 2),
+        'replays': [report if success else {'error': report} for success, report in reports]
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:f.write(text + '\n')
+    print(text)
@@ -0,0 +1,135 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from configs import traceback, time, ThreadPoolExecutor, as_completed, METRICS_PORT
+from utils import Utils
+from flashscore.feeds import FEEDS
+from flashscore.sports import SPORTS
+from flashscore.calculator import CALCULATOR
+from database.storage import STORAGE
+from metrics import METRICS
+
+class SCANNER:
+    """
+    Scans every configured sport concurrently from one process. Each sport gets its own CALCULATOR (feed
+    state, balance, priced matches), but they all share one FEEDS, so their requests go through the same
+    keep-alive session pool and draw on one budget of `max_in_flight` concurrent requests. A STORAGE passed
+    in `options` is shared the same way, its writer thread serialises the sports' scans.
+    """
+    def __init__(self, capital=0, min_profit_percentage=0, sports=None, workers=4, max_in_flight=32, **options):
+        self.capital = capital
+        self.sports = [SPORTS.key(sport) for sport in sports] if sports else SPORTS.configured()
+        unsupported = [sport for sport in self.sports if SPORTS.get(sport) is None]
+        if unsupported:
+            raise Exception(f"Unsupported sport(s): {', '.join(unsupported)}")
+
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.feeds = FEEDS(pool_maxsize=max(10, self.max_in_flight), max_in_flight=self.max_in_flight)
+        self.calculators = {
+            sport: CALCULATOR(
+                capital=capital,
+                min_profit_percentage=min_profit_percentage,
+                workers=workers,
+                sport=sport,
+                feeds=self.feeds,
+                **options
+            )
+            for sport in self.sports
+        }
+
+    def scan(self, country='NG'):
+        """
+        Runs one arbitrage scan per sport in parallel.
+        Returns: dict sport -> (success, result) as returned by CALCULATOR.get_arbitrage_opportunities.
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(self.calculators) or 1) as executor:
+            futures = {
+                executor.submit(calculator.get_arbitrage_opportunities, country): sport
+                for sport, calculator in self.calculators.items()
+            }
+            for future in as_completed(futures):
+                sport = futures[future]
+                try:
+                    results[sport] = future.result()
+                except Exception as error:
+                    traceback.print_exception(error)
+                    results[sport] = (False, str(error))
+        return results
+
+    def summary(self, results):
+        """
+        One line per sport plus the combined arb count and simulated profit across sports.
+        """
+        lines = []
+        total_arbs = 0
+        for sport in self.sports:
+            success, result = results.get(sport, (False, 'Not scanned'))
+            if not success:
+                lines.append(f"{sport}: failed ({result})")
+                continue
+            arbs = len(result.get('arbitrage_opportunities', []))
+            total_arbs += arbs
+            lines.append(f"{sport}: {arbs} arbs in {result.get('scan_time', 0)}s, balance {self.calculators[sport].balance:.2f}")
+
+        profit = sum(calculator.balance - self.capital for calculator in self.calculators.values())
+        lines.append(f"All sports: {total_arbs} arbs, Total Profit: {profit:.2f}")
+        return '\n'.join(lines)
+
+    def run_forever(self, wait_time, country='NG'):
+        while True:
+            scan_started = time.perf_counter()
+            results = self.scan(country)
+            Utils.write_log(self.summary(results))
+            Utils.write_log(f'Multi-sport scan wall-clock time: {time.perf_counter() - scan_started:.2f}s ({len(self.sports)} sport(s), max {self.max_in_flight} requests in flight)')
+            Utils.write_log(f'Proxy session stats: {self.feeds.session_stats()}')
+
+            Utils.write_log(f'Sleeping for {wait_time} seconds')
+            time.sleep(wait_time)
+
+if __name__ == "__main__":
+    import argparse
+    arg_parser = argparse.ArgumentParser(description='Multi-sport arbitrage scanner')
+    arg_parser.add_argument('capital', type=float)
+    arg_parser.add_argument('wait_time', type=int)
+    arg_parser.add_argument('min_profit_percentage', type=float)
+    arg_parser.add_argument('workers', type=int, nargs='?', default=4, help='parallel odds requests per sport (default 4)')
+    arg_parser.add_argument('--sports', nargs='+', default=None, help='sports to scan (default: universals/sports.json)')
+    arg_parser.add_argument('--max-in-flight', type=int, default=32, help='requests in flight across all sports (default 32)')
+    arg_parser.add_argument('--compact', action='store_true', help='keep parsed matches as compact records')
+    arg_parser.add_argument('--delta', action='store_true', help='only re-price matches whose feed records changed')
+    arg_parser.add_argument('--delta-max-age', type=float, default=None, help='with --delta, seconds before unchanged matches are re-priced anyway (default the odds cache TTL for their start time)')
+    arg_parser.add_argument('--cache', action='store_true', help='serve odds from a start-time aware TTL cache')
+    arg_parser.add_argument('--prescreen-margin', type=float, default=None, help='only fetch per-match odds when the bulk odds feed is within this margin of an arb (e.g. 0.03)')
+    arg_parser.add_argument('--db', action='store_true', help='store events, odds snapshots and arbs in database.db')
+    arg_parser.add_argument('--multi-market', action='store_true', help='also price set, totals and handicap markets from the same odds payloads')
+    arg_parser.add_argument('--record', default=None, help='record every feed and odds payload to this directory for flashscore/replay.py')
+    arg_parser.add_argument('--geos', default=None, help='geos to request odds from, e.g. NG/NGLA,KE/,/ (default ODDS_GEOS)')
+    arg_parser.add_argument('--adaptive-geos', action='store_true', help='learn per tournament which geos add bookmakers or better prices and skip the others')
+    arg_parser.add_argument('--metrics-port', type=int, default=METRICS_PORT, help='serve Prometheus metrics on this localhost port (default METRICS_PORT, 0 = off)')
+    args = arg_parser.parse_args()
+    if args.metrics_port:
+        Utils.write_log(METRICS.serve(args.metrics_port)[1])
+
+    scanner = SCANNER(
+        capital=args.capital,
+        min_profit_percentage=args.min_profit_percentage,
+        sports=args.sports,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        compact=args.compact,
+        delta=args.delta,
+        delta_max_age=args.delta_max_age,
+        cache=args.cache,
+        prescreen_margin=args.prescreen_margin,
+        multi_market=args.multi_market,
+        storage=STORAGE() if args.db else None,
+        geos=Utils.parse_geos(args.geos) if args.geos else None,
+        adaptive_geos=args.adaptive_geos
+    )
+    if args.record:
+        from flashscore.replay import RECORDER, RECORDING_FEEDS
+        recorder = RECORDER(args.record)
+        for sport, calculator in scanner.calculators.items():
+            calculator.feeds = RECORDING_FEEDS(calculator.feeds, recorder, sport)
+    scanner.run_forever(args.wait_time, country='NG')
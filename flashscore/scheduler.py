@@ -0,0 +1,145 @@
+from configs import time
+import heapq
+
+class SCHEDULER:
+    """
+    Priority queue of per-match odds refresh deadlines. A match's refresh interval shrinks as its start
+    time approaches, while it is live, when its best prices move and when its best-price implied
+    probability gets close to 1.0, so the scanner keeps working the most urgent matches first.
+    `outcomes` are the odds row keys of the sport's main market (SPORTS), e.g. XA/XX/XB for football.
+    """
+    # (seconds until start, refresh interval seconds), checked in order
+    start_tiers = [
+        (0, 5),
+        (15 * 60, 5),
+        (3600, 30),
+        (6 * 3600, 120),
+        (24 * 3600, 600),
+        (float('inf'), 3600)
+    ]
+
+    def __init__(self, min_interval=3, max_interval=3600, near_arb_prob=1.02, close_prob=1.05, volatile_change=0.02,
+                 outcomes=('XA', 'XB')):
+        self.outcomes = outcomes
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.near_arb_prob = near_arb_prob
+        self.close_prob = close_prob
+        self.volatile_change = volatile_change
+        self.heap = []
+        self.matches = {}
+        self.counter = 0
+
+    @staticmethod
+    def best_prices(odds, outcomes=('XA', 'XB')):
+        return tuple(max((float(o.get(outcome, 0)) for o in odds), default=0) for outcome in outcomes)
+
+    def interval_for(self, state, now=None):
+        now = now or time.time()
+        interval = self.start_tiers[-1][1]
+        if state.get('live'):
+            interval = self.start_tiers[0][1]
+        elif state.get('start_time') is not None:
+            seconds_to_start = state['start_time'] - now
+            for threshold, tier_interval in self.start_tiers:
+                if seconds_to_start <= threshold:
+                    interval = tier_interval
+                    break
+
+        total_implied_prob = state.get('total_implied_prob')
+        if total_implied_prob is not None:
+            if total_implied_prob <= self.near_arb_prob:
+                interval = min(interval, self.min_interval)
+            elif total_implied_prob <= self.close_prob:
+                interval = interval / 4
+
+        if state.get('volatility', 0) >= self.volatile_change:
+            interval = interval / 2
+
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def push(self, match_id, deadline):
+        state = self.matches[match_id]
+        state['deadline'] = deadline
+        self.counter += 1
+        state['version'] = self.counter
+        heapq.heappush(self.heap, (deadline, self.counter, match_id))
+
+    def upsert(self, match_id, start_time=None, live=False):
+        """
+        Adds a match (due immediately) or refreshes its start time and live flag, rescheduling it if that makes it more urgent.
+        """
+        now = time.time()
+        state = self.matches.get(match_id)
+        if state is None:
+            self.matches[match_id] = {'start_time': start_time, 'live': live, 'volatility': 0, 'total_implied_prob': None, 'best': None}
+            self.push(match_id, now)
+            return
+
+        state['start_time'] = start_time
+        state['live'] = live
+        deadline = state.get('refreshed', now) + self.interval_for(state, now)
+        if deadline < state['deadline']:
+            self.push(match_id, deadline)
+
+    def remove(self, match_id):
+        self.matches.pop(match_id, None)
+
+    def sync(self, matches):
+        """
+        Makes the schedule follow the latest feed: `matches` maps match_id -> (start_time, live).
+        """
+        for match_id in set(self.matches) - set(matches):
+            self.remove(match_id)
+        for match_id, (start_time, live) in matches.items():
+            self.upsert(match_id, start_time=start_time, live=live)
+
+    def record(self, match_id, odds):
+        """
+        Records a refresh of a match's merged odds and schedules its next deadline.
+        """
+        state = self.matches.get(match_id)
+        if state is None:return None
+        now = time.time()
+        best = self.best_prices(odds, self.outcomes) if odds else None
+        if best and state['best']:
+            state['volatility'] = max(
+                abs(new - old) / old if old else 0
+                for new, old in zip(best, state['best'])
+            )
+        if best and all(price > 0 for price in best):
+            state['total_implied_prob'] = sum(1 / price for price in best)
+            state['best'] = best
+        state['refreshed'] = now
+        interval = self.interval_for(state, now)
+        self.push(match_id, now + interval)
+        return interval
+
+    def pop_due(self, limit=None, now=None):
+        """
+        Pops up to `limit` matches whose deadline has passed, most overdue first.
+        """
+        now = now or time.time()
+        due = []
+        while self.heap and (limit is None or len(due) < limit):
+            deadline, version, match_id = self.heap[0]
+            state = self.matches.get(match_id)
+            if state is None or state['version'] != version:
+                heapq.heappop(self.heap)
+                continue
+            if deadline > now:
+                break
+            heapq.heappop(self.heap)
+            state['deadline'] = float('inf')
+            due.append(match_id)
+        return due
+
+    def next_deadline(self):
+        while self.heap:
+            deadline, version, match_id = self.heap[0]
+            state = self.matches.get(match_id)
+            if state is None or state['version'] != version:
+                heapq.heappop(self.heap)
+                continue
+            return deadline
+        return None
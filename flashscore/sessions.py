@@ -0,0 +1,140 @@
+from utils import Utils
+from configs import random, time, requests, Lock, BoundedSemaphore, urlparse
+from metrics import METRICS
+
+class SESSIONS:
+    """
+    Pool of persistent keep-alive requests sessions, one per proxy, so repeated calls through the
+    same proxy reuse already-open TCP/TLS connections instead of paying a new handshake each time.
+    With `max_in_flight` set, callers sharing the pool (e.g. one scanner per sport) also share a budget of
+    concurrent requests.
+    """
+    def __init__(self, proxies, pool_connections=10, pool_maxsize=10, idle_timeout=300, max_retries=0, max_in_flight=None):
+        self.proxies = proxies or [{}]
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.idle_timeout = idle_timeout
+        self.max_retries = max_retries
+        self.sessions = {}
+        self.lock = Lock()
+        self.max_in_flight = max_in_flight
+        self.budget = BoundedSemaphore(max_in_flight) if max_in_flight else None
+
+    @staticmethod
+    def proxy_key(proxy):
+        if not proxy:return 'direct'
+        return proxy.get('https') or proxy.get('http') or 'direct'
+
+    def new_session(self, proxy):
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self.max_retries
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if proxy:session.proxies.update(proxy)
+        return {
+            'session': session,
+            'adapter': adapter,
+            'proxy': proxy,
+            'created': time.monotonic(),
+            'last_used': time.monotonic(),
+            'requests': 0,
+            'errors': 0
+        }
+
+    def get_session(self, proxy=None):
+        """
+        Returns the pooled session entry for a proxy, creating it on first use. A random proxy is picked when none is given.
+        """
+        if proxy is None:
+            proxy = random.choice(self.proxies)
+        key = self.proxy_key(proxy)
+        with self.lock:
+            entry = self.sessions.get(key)
+            if entry is None:
+                entry = self.new_session(proxy)
+                self.sessions[key] = entry
+            entry['last_used'] = time.monotonic()
+        return entry
+
+    def request(self, method, url, proxy=None, **kwargs):
+        self.evict_idle()
+        entry = self.get_session(proxy)
+        if self.budget is not None:self.budget.acquire()
+        # Per proxy and host, without the proxy credentials
+        timer = METRICS.timer('http_request', proxy=self.proxy_key(entry['proxy']).split('@')[-1], host=urlparse(url).netloc)
+        try:
+            with timer:
+                response = entry['session'].request(method, url, **kwargs)
+                # A streamed body is not downloaded yet, its size is counted by the caller's stage
+                timer.size = 0 if kwargs.get('stream') else len(response.content)
+                timer.error = not response.ok and response.status_code != 304
+            entry['requests'] += 1
+            return response
+        except Exception:
+            entry['errors'] += 1
+            raise
+        finally:
+            if self.budget is not None:self.budget.release()
+
+    def get(self, url, proxy=None, **kwargs):
+        return self.request('GET', url, proxy=proxy, **kwargs)
+
+    def evict_idle(self):
+        """
+        Closes and drops sessions that have not been used for `idle_timeout` seconds.
+        """
+        if not self.idle_timeout:return 0
+        now = time.monotonic()
+        with self.lock:
+            idle_keys = [key for key, entry in self.sessions.items() if now - entry['last_used'] > self.idle_timeout]
+            evicted = [self.sessions.pop(key) for key in idle_keys]
+        for entry in evicted:
+            entry['session'].close()
+        if evicted:
+            Utils.write_log(f"Evicted {len(evicted)} idle proxy session(s)")
+        return len(evicted)
+
+    @staticmethod
+    def connection_pools(adapter):
+        managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+        for manager in managers:
+            if manager is None:continue
+            for key in list(manager.pools.keys()):
+                pool = manager.pools.get(key)
+                if pool is not None:
+                    yield pool
+
+    def stats(self):
+        """
+        Per-session counters: requests sent, connections opened and the share of requests served on a reused connection.
+        """
+        with self.lock:
+            entries = dict(self.sessions)
+
+        stats = {}
+        for key, entry in entries.items():
+            connections = 0
+            pool_requests = 0
+            for pool in self.connection_pools(entry['adapter']):
+                connections += pool.num_connections
+                pool_requests += pool.num_requests
+            reuse_ratio = 1 - connections / pool_requests if pool_requests else 0
+            stats[key.split('@')[-1]] = {
+                'requests': entry['requests'],
+                'errors': entry['errors'],
+                'connections': connections,
+                'reuse_ratio': round(max(reuse_ratio, 0), 4),
+                'idle_for': round(time.monotonic() - entry['last_used'], 2)
+            }
+        return stats
+
+    def close(self):
+        with self.lock:
+            entries = list(self.sessions.values())
+            self.sessions.clear()
+        for entry in entries:
+            entry['session'].close()
@@ -0,0 +1,454 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import hashlib, multiprocessing
+from bisect import bisect
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client, wait
+from configs import traceback, time, Thread, Lock, SHARD_ADDRESS, SHARD_AUTHKEY, METRICS_PORT
+from utils import Utils
+from flashscore.sports import SPORTS
+from flashscore.feeds import FEEDS
+from flashscore.calculator import CALCULATOR
+from database.storage import STORAGE
+from metrics import METRICS
+
+class HASH_RING:
+    """
+    Consistent hash ring of worker names. Each worker owns `replicas` points on the ring and a match belongs
+    to the first point after its hash, so adding or removing a worker only moves the matches of that worker
+    and every other match keeps hitting the worker that holds its odds cache and fingerprints.
+    """
+    def __init__(self, nodes=(), replicas=64):
+        self.replicas = replicas
+        self.nodes = set()
+        self.points = []
+        self.owners = []
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def hash(key):
+        return int.from_bytes(hashlib.blake2b(str(key).encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def rebuild(self):
+        ring = sorted((self.hash(f'{node}#{replica}'), node) for node in self.nodes for replica in range(self.replicas))
+        self.points = [point for point, _ in ring]
+        self.owners = [node for _, node in ring]
+
+    def add(self, node):
+        self.nodes.add(node)
+        self.rebuild()
+
+    def remove(self, node):
+        self.nodes.discard(node)
+        self.rebuild()
+
+    def node_for(self, key):
+        if not self.points:return None
+        return self.owners[bisect(self.points, self.hash(key)) % len(self.points)]
+
+    def partition(self, keys):
+        """
+        Returns: dict node -> list of keys, each list in input order.
+        """
+        shards = {}
+        for key in keys:
+            shards.setdefault(self.node_for(key), []).append(key)
+        return shards
+
+def parse_address(address):
+    host, port = str(address).rsplit(':', 1)
+    return host, int(port)
+
+def shard_batch(data, match_ids):
+    """
+    The part of a parsed feed holding `match_ids`, in the layout process_scan reads.
+    """
+    match_ids = set(match_ids)
+    batch = {'tournaments': {}, 'metadata': {}}
+    for tournament_id, tournament in data.get('tournaments', {}).items():
+        matches = [match for match in tournament.get('matches', []) if match['match_id'] in match_ids]
+        if not matches:continue
+        batch['tournaments'][tournament_id] = {
+            'tournament_name': tournament['tournament_name'],
+            'sport_name': tournament['sport_name'],
+            'category': tournament['category'],
+            'tournament_name_from_url': tournament['tournament_name_from_url'],
+            'tournament_id': tournament_id,
+            'matches': matches
+        }
+    return batch
+
+def price_shard(calculator, message):
+    """
+    Fetches, merges and prices one shard on a non-reporting CALCULATOR, with the coordinator's balance and
+    min_profit_percentage so remote workers never price with thresholds of their own.
+    Returns: (success, process_scan result with 'priced': match_id -> [(market, arb_details)])
+    """
+    batch = message['batch']
+    calculator.balance = message['balance']
+    calculator.min_profit_percentage = message['min_profit_percentage']
+    match_ids = list(calculator.iter_match_ids(batch))
+    # Matches hashed to another worker (or gone from the feed) no longer need their state here
+    calculator.forget_matches(match_ids)
+    odds_results = calculator.fetch_all_odds(match_ids)
+    return calculator.process_scan(batch, odds_results)
+
+class SHARD_WORKER:
+    """
+    Prices the shards a coordinator sends it. Connects to the coordinator at `address` (host:port) over
+    multiprocessing.connection, so workers can run on this machine or any host that reaches the address.
+    `name` should be stable across restarts: the hash ring places matches by worker name.
+    `feed_options` are FEEDS arguments (proxies, feed_url, odds_url, ...) for the worker's own sessions.
+    """
+    def __init__(self, address=SHARD_ADDRESS, authkey=SHARD_AUTHKEY, name=None, feed_options=None, **options):
+        self.address = parse_address(address)
+        self.authkey = authkey.encode('utf-8') if isinstance(authkey, str) else authkey
+        self.name = name or f'{os.uname().nodename}-{os.getpid()}'
+        if feed_options is not None:
+            options['feeds'] = FEEDS(pool_maxsize=max(10, int(options.get('workers', 1))), **feed_options)
+        self.calculator = CALCULATOR(reporting=False, **options)
+
+    def serve(self, connection):
+        connection.send({'type': 'hello', 'name': self.name, 'pid': os.getpid()})
+        while True:
+            message = connection.recv()
+            if message['type'] == 'stop':return True
+            if message['type'] != 'scan':continue
+            started = time.perf_counter()
+            try:
+                success, result = price_shard(self.calculator, message)
+            except Exception as error:
+                traceback.print_exception(error)
+                success, result = False, str(error)
+            connection.send({
+                'type': 'result',
+                'scan_id': message['scan_id'],
+                'success': success,
+                'result': result,
+                'seconds': round(time.perf_counter() - started, 3)
+            })
+
+    def run(self, retry_interval=2):
+        """
+        Serves the coordinator until it sends stop, reconnecting when the connection drops.
+        """
+        while True:
+            try:
+                with Client(self.address, authkey=self.authkey) as connection:
+                    Utils.write_log(f'Shard worker {self.name} connected to {self.address[0]}:{self.address[1]}')
+                    if self.serve(connection):return
+            except AuthenticationError as error:
+                # Keeps retrying: the coordinator may be restarting with the right key
+                Utils.write_log(f'Shard worker {self.name} was refused by the coordinator ({error}), check SHARD_AUTHKEY; retrying in {retry_interval}s', level='ERROR')
+            except (EOFError, OSError) as error:
+                Utils.write_log(f'Shard worker {self.name} lost the coordinator ({error}), retrying in {retry_interval}s', level='WARNING')
+            time.sleep(retry_interval)
+
+def run_worker(address, authkey, name, options):
+    SHARD_WORKER(address=address, authkey=authkey, name=name, **options).run()
+
+class SHARD_COORDINATOR:
+    """
+    Sharded execution of a CALCULATOR scan. The coordinator fetches and parses the event feed once,
+    partitions the match ids over the connected workers on a consistent hash ring, and each worker fetches,
+    merges and prices its shard in its own process. Arbs come back per match and go through the
+    coordinator's CALCULATOR (its arb tracker, balance, storage and Telegram reports), so alert dedup stays
+    global whatever the number of workers. A worker that fails or times out is dropped from the ring and its
+    shard is re-partitioned over the others, or priced by the coordinator when none is left.
+    """
+    def __init__(self, calculator, address=SHARD_ADDRESS, authkey=SHARD_AUTHKEY, replicas=64, timeout=300):
+        self.calculator = calculator
+        self.address = parse_address(address)
+        self.authkey = authkey.encode('utf-8') if isinstance(authkey, str) else authkey
+        if not self.authkey:
+            # Only the workers spawn() starts get a generated key; remote workers need SHARD_AUTHKEY
+            self.authkey = os.urandom(16)
+            Utils.write_log('SHARD_AUTHKEY is not set: using a generated key, only local shard workers can join', level='WARNING')
+        self.timeout = timeout
+        self.ring = HASH_RING(replicas=replicas)
+        self.workers = {}
+        self.lock = Lock()
+        self.processes = []
+        self.worker_options = {}
+        self.local = None
+        self.scan_id = 0
+        self.listener = Listener(self.address, authkey=self.authkey)
+        Thread(target=self.accept_loop, name='shard-accept', daemon=True).start()
+
+    def accept_loop(self):
+        while True:
+            try:
+                connection = self.listener.accept()
+                hello = connection.recv()
+                name = hello['name']
+            except AuthenticationError as error:
+                Utils.write_log(f'Rejected shard worker connection with a wrong SHARD_AUTHKEY: {error}', level='WARNING')
+                continue
+            except (EOFError, OSError) as error:
+                if self.listener is None:return
+                Utils.write_log(f'Rejected shard worker connection: {error}', level='WARNING')
+                continue
+            with self.lock:
+                previous = self.workers.pop(name, None)
+                if previous is not None:previous.close()
+                self.workers[name] = connection
+                self.ring.add(name)
+            Utils.write_log(f"Shard worker {name} joined (pid {hello.get('pid')}), {len(self.workers)} connected")
+
+    def spawn(self, count, **options):
+        """
+        Starts `count` local worker processes and waits until they joined.
+        Args:
+            options: SHARD_WORKER options of the workers: CALCULATOR options (sport, workers, multi_market,
+                cache, ...) and feed_options.
+        """
+        self.worker_options = options
+        context = multiprocessing.get_context('spawn')
+        address = f'{self.address[0]}:{self.address[1]}'
+        for index in range(count):
+            process = context.Process(
+                target=run_worker,
+                args=(address, self.authkey, f'{self.calculator.sport}-{index}', options),
+                name=f'shard-worker-{index}',
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+        return self.wait_for_workers(count)
+
+    def wait_for_workers(self, count, timeout=60):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self.lock:
+                if len(self.workers) >= count:return True
+            time.sleep(0.1)
+        return False
+
+    def drop(self, name, reason):
+        with self.lock:
+            connection = self.workers.pop(name, None)
+            self.ring.remove(name)
+        if connection is not None:connection.close()
+        Utils.write_log(f'Dropped shard worker {name}: {reason}', level='WARNING')
+
+    def price_locally(self, message):
+        """
+        Prices a shard in the coordinator once no worker is left, with the options spawn() gave the workers
+        (defaulting to the coordinator's own) so the shard keeps its geos, cache and pricing path.
+        """
+        if self.local is None:
+            calculator = self.calculator
+            options = {
+                'workers': calculator.workers, 'sport': calculator.sport, 'multi_market': calculator.multi_market,
+                'geos': calculator.geos, 'adaptive_geos': calculator.geo_matrix.adaptive,
+                'cache': calculator.odds_cache is not None, 'vectorized': calculator.vectorized,
+                **self.worker_options
+            }
+            # The coordinator's sessions stand in for the workers' own
+            options.pop('feed_options', None)
+            self.local = CALCULATOR(**options, feeds=calculator.feeds, reporting=False)
+        return price_shard(self.local, message)
+
+    def scan_message(self, batch):
+        return {'batch': batch, 'balance': self.calculator.balance, 'min_profit_percentage': self.calculator.min_profit_percentage}
+
+    def dispatch(self, data, match_ids):
+        """
+        Prices `match_ids` across the workers.
+        Returns: (list of worker results, shard sizes per worker)
+        """
+        results = []
+        sizes = {}
+        remaining = list(match_ids)
+        while remaining:
+            with self.lock:
+                shards = self.ring.partition(remaining)
+                connections = {name: self.workers[name] for name in shards if name in self.workers}
+            remaining = []
+            if not connections:
+                success, result = self.price_locally(self.scan_message(shard_batch(data, shards.get(None, []))))
+                if not success:raise Exception(result)
+                sizes['coordinator'] = sizes.get('coordinator', 0) + len(shards.get(None, []))
+                results.append(result)
+                break
+
+            self.scan_id += 1
+            pending = {}
+            for name, connection in connections.items():
+                try:
+                    connection.send({'type': 'scan', 'scan_id': self.scan_id, **self.scan_message(shard_batch(data, shards[name]))})
+                    pending[connection] = name
+                except (OSError, ValueError) as error:
+                    self.drop(name, error)
+                    remaining.extend(shards[name])
+
+            deadline = time.time() + self.timeout
+            while pending:
+                ready = wait(list(pending), timeout=max(0, deadline - time.time()))
+                if not ready:
+                    for connection, name in pending.items():
+                        self.drop(name, f'no result within {self.timeout}s')
+                        remaining.extend(shards[name])
+                    break
+                for connection in ready:
+                    name = pending.pop(connection)
+                    try:
+                        reply = connection.recv()
+                    except (EOFError, OSError) as error:
+                        self.drop(name, error)
+                        remaining.extend(shards[name])
+                        continue
+                    if not reply['success']:
+                        Utils.write_log(f"Shard worker {name} failed: {reply['result']}", level='WARNING')
+                        remaining.extend(shards[name])
+                        self.drop(name, reply['result'])
+                        continue
+                    sizes[name] = sizes.get(name, 0) + len(shards[name])
+                    results.append(reply['result'])
+        return results, sizes
+
+    def scan(self):
+        """
+        One sharded scan, with the same result layout as CALCULATOR.get_arbitrage_opportunities.
+        """
+        calculator = self.calculator
+        try:
+            Utils.write_log(f"------------------------{calculator.sport_config['name']} sharded arb operation started------------------------")
+            scan_started = time.perf_counter()
+            metrics_started = METRICS.snapshot()
+            success, data = calculator.load_events()
+            if not success:
+                return False, data
+            match_ids = list(calculator.iter_match_ids(data))
+            shard_results, sizes = self.dispatch(data, match_ids)
+
+            match_data_by_id, priced, opportunities = {}, {}, {}
+            for shard_result in shard_results:
+                for tournament in shard_result['tournaments'].values():
+                    for match_data in tournament['matches']:
+                        match_data_by_id[match_data['match_id']] = match_data
+                priced.update(shard_result['priced'])
+                for opportunity in shard_result['arbitrage_opportunities']:
+                    opportunities.setdefault(opportunity['match_id'], []).append(opportunity)
+
+            result = {'tournaments': {}, 'metadata': data.get('metadata', {}), 'arbitrage_opportunities': []}
+            events = []
+            iteration_profit = 0
+            iteration_arbs = 0
+            # Feed order, and one arb tracker for every shard
+            for tournament_id, tournament in data.get('tournaments', {}).items():
+                tournament_data = {
+                    'tournament_name': tournament['tournament_name'],
+                    'sport_name': tournament['sport_name'],
+                    'category': tournament['category'],
+                    'tournament_name_from_url': tournament['tournament_name_from_url'],
+                    'tournament_id': tournament_id,
+                    'matches': []
+                }
+                for match in tournament.get('matches', []):
+                    match_data = match_data_by_id.get(match['match_id'])
+                    if match_data is None:continue
+                    tournament_data['matches'].append(match_data)
+                    result['arbitrage_opportunities'].extend(opportunities.get(match['match_id'], []))
+                    if match['match_id'] not in priced:continue
+                    for event in calculator.track_arbs(match_data, priced[match['match_id']]):
+                        events.append(event)
+                        if event['event'] == 'opened':
+                            iteration_profit += event['details']['profit_amount']
+                            iteration_arbs += 1
+                result['tournaments'][tournament_id] = tournament_data
+
+            calculator.balance += iteration_profit
+            # Stored with the scan result below, forget_matches leaves storing its events to the caller
+            events.extend(calculator.forget_matches(match_ids))
+            result['arb_events'] = events
+            result['shards'] = sizes
+            result['scan_time'] = round(time.perf_counter() - scan_started, 2)
+            # Coordinator-side stages only, workers keep their own metrics
+            result['stage_metrics'] = METRICS.summary(since=metrics_started)
+            Utils.write_log(f"Iteration Summary: {iteration_arbs} arbs found, Total Profit: {iteration_profit:.2f}, New Balance: {calculator.balance:.2f}")
+            Utils.write_log(f"Shards: {sizes}; arb tracker: {calculator.arb_tracker.stats()}")
+            if calculator.storage is not None:
+                success, msg = calculator.storage.record_scan(result, sport=calculator.sport, market=calculator.primary_market)
+                if not success:Utils.write_log(msg)
+            Utils.write_log(f"------------------------{calculator.sport_config['name']} sharded arb operation done------------------------")
+            return True, result
+        except Exception as error:
+            traceback.print_exception(error)
+            return False, str(error)
+
+    def run_forever(self, wait_time):
+        while True:
+            success, result = self.scan()
+            Utils.write_log(result, level='DEBUG')
+            if success:
+                Utils.write_log(f"Sharded scan wall-clock time: {result['scan_time']}s over {len(result['shards'])} shard(s)")
+            Utils.write_log(f'Sleeping for {wait_time} seconds')
+            time.sleep(wait_time)
+
+    def close(self):
+        with self.lock:
+            workers = dict(self.workers)
+            self.workers.clear()
+        for connection in workers.values():
+            try:
+                connection.send({'type': 'stop'})
+            except (OSError, ValueError):
+                pass
+            connection.close()
+        listener, self.listener = self.listener, None
+        listener.close()
+        for process in self.processes:
+            process.join(timeout=10)
+
+if __name__ == "__main__":
+    import argparse
+    arg_parser = argparse.ArgumentParser(description='Sharded arbitrage scanner: one coordinator, N worker processes')
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    coordinator_parser = commands.add_parser('coordinator', help='fetch the feed, shard it and report arbs')
+    coordinator_parser.add_argument('capital', type=float)
+    coordinator_parser.add_argument('wait_time', type=int)
+    coordinator_parser.add_argument('min_profit_percentage', type=float)
+    coordinator_parser.add_argument('--shards', type=int, default=os.cpu_count() or 2, help='local worker processes to start (default: CPU count, 0 = remote workers only)')
+    coordinator_parser.add_argument('--expect', type=int, default=0, help='wait for this many workers before the first scan')
+    coordinator_parser.add_argument('--db', action='store_true', help='store events, odds snapshots and arbs in database.db')
+    coordinator_parser.add_argument('--metrics-port', type=int, default=METRICS_PORT, help='serve Prometheus metrics on this localhost port (default METRICS_PORT, 0 = off)')
+
+    worker_parser = commands.add_parser('worker', help='price the shards of a coordinator (e.g. on another host)')
+    worker_parser.add_argument('--name', default=None, help='stable worker name (default host-pid)')
+
+    for parser in (coordinator_parser, worker_parser):
+        parser.add_argument('--address', default=SHARD_ADDRESS, help=f'coordinator host:port (default SHARD_ADDRESS, {SHARD_ADDRESS})')
+        parser.add_argument('--workers', type=int, default=4, help='parallel odds requests per process (default 4)')
+        parser.add_argument('--sport', default='tennis', choices=sorted(SPORTS.registry), help='sport to scan (default tennis)')
+        parser.add_argument('--multi-market', action='store_true', help='also price set, totals and handicap markets')
+        parser.add_argument('--cache', action='store_true', help='serve odds from a start-time aware TTL cache')
+        parser.add_argument('--adaptive-geos', action='store_true', help='learn per tournament which geos add bookmakers or better prices and skip the others')
+    args = arg_parser.parse_args()
+
+    options = {'workers': args.workers, 'sport': args.sport, 'multi_market': args.multi_market, 'cache': args.cache, 'adaptive_geos': args.adaptive_geos}
+    if args.command == 'worker':
+        if not SHARD_AUTHKEY:
+            arg_parser.error('set SHARD_AUTHKEY in .env to the coordinator\'s key before starting a remote worker')
+        SHARD_WORKER(address=args.address, name=args.name, **options).run()
+    else:
+        if args.metrics_port:
+            Utils.write_log(METRICS.serve(args.metrics_port)[1])
+        calculator = CALCULATOR(
+            capital=args.capital,
+            min_profit_percentage=args.min_profit_percentage,
+            storage=STORAGE() if args.db else None,
+            **options
+        )
+        coordinator = SHARD_COORDINATOR(calculator, address=args.address)
+        if args.shards:
+            coordinator.spawn(args.shards, capital=args.capital, min_profit_percentage=args.min_profit_percentage, **options)
+        if args.expect:
+            coordinator.wait_for_workers(args.expect)
+        try:
+            coordinator.run_forever(args.wait_time)
+        finally:
+            coordinator.close()
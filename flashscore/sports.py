@@ -0,0 +1,89 @@
+from utils import Utils
+
+class SPORTS:
+    """
+    Registry of the sports the scanner knows how to price: their Flashscore sport id, the event and bulk
+    odds feed ids, the PARSER method that reads their event feed, the outcome layout of their main market and
+    the emoji heading their Telegram reports.
+    """
+    registry = {
+        'football': {
+            'name': 'Football',
+            'id': 1,
+            'alt_id': 'f_1_0_1_en_1',
+            'odd_id': 'fo_1_0_1_en_1_0',
+            'parser': 'parse_flashscore_events',
+            'betting_type': 'HOME_DRAW_AWAY',
+            'betting_scope': 'FULL_TIME',
+            'outcomes': ('XA', 'XX', 'XB'),
+            'emoji': '⚽'
+        },
+        'tennis': {
+            'name': 'Tennis',
+            'id': 2,
+            'alt_id': 'f_2_0_1_en_1',
+            'odd_id': 'fo_2_0_1_en_1_0',
+            'parser': 'parse_flashscore_tennis',
+            'betting_type': 'HOME_AWAY',
+            'betting_scope': 'FULL_TIME',
+            'outcomes': ('XA', 'XB'),
+            'emoji': '🎾'
+        },
+        'basketball': {
+            'name': 'Basketball',
+            'id': 3,
+            'alt_id': 'f_3_0_1_en_1',
+            'odd_id': 'fo_3_0_1_en_1_0',
+            'parser': 'parse_flashscore_events',
+            'betting_type': 'HOME_AWAY',
+            'betting_scope': 'FULL_TIME',
+            'outcomes': ('XA', 'XB'),
+            'emoji': '🏀'
+        }
+    }
+
+    @staticmethod
+    def key(sport):
+        return str(sport or '').strip().lower()
+
+    @staticmethod
+    def get(sport):
+        """
+        Returns the registry entry of a sport by name (case-insensitive), or None when it is not supported.
+        """
+        return SPORTS.registry.get(SPORTS.key(sport))
+
+    @staticmethod
+    def sport_id(sport, default=None):
+        entry = SPORTS.get(sport)
+        return entry['id'] if entry else default
+
+    @staticmethod
+    def feed_ids():
+        """
+        The {sport: {'id', 'alt_id', 'odd_id'}} layout FEEDS resolves feed urls from.
+        """
+        return {
+            sport: {'id': entry['id'], 'alt_id': entry['alt_id'], 'odd_id': entry['odd_id']}
+            for sport, entry in SPORTS.registry.items()
+        }
+
+    @staticmethod
+    def main_market(sport):
+        entry = SPORTS.get(sport)
+        return f"{entry['betting_type']}:{entry['betting_scope']}"
+
+    @staticmethod
+    def configured():
+        """
+        Sports listed in universals/sports.json that the registry supports, in file order.
+        """
+        sports = []
+        for name in Utils.load_sports():
+            key = SPORTS.key(name)
+            if key not in SPORTS.registry:
+                Utils.write_log(f"Sport {name} is not supported, skipping it")
+                continue
+            if key not in sports:
+                sports.append(key)
+        return sports
@@ -0,0 +1,89 @@
+from configs import numpy as np, chain
+from operator import itemgetter
+
+class BATCH_ARBITRAGE:
+    """
+    Vectorized counterpart of PRICING.calculate_arbitrage for every match of a scan at once.
+    Odds are held in a zero-padded (match x bookmaker x outcome) matrix; PRICING.calculate_arbitrage
+    stays the reference implementation and both give the same decisions and details.
+    """
+    outcomes = ('XA', 'XB')
+
+    @staticmethod
+    def pad_odds(odds_by_match, outcomes=outcomes):
+        """
+        Packs a list of per-match odds lists ([{'BI': '417', 'XA': 1.8, 'XB': 2.0}, ...]) into a padded matrix.
+        Returns: (odds float64 [matches, bookmakers, outcomes], flat list of bookmaker ids in input order, row counts int [matches])
+        """
+        matches = len(odds_by_match)
+        counts = np.fromiter((len(odds) for odds in odds_by_match), dtype=np.int64, count=matches)
+        total = int(counts.sum())
+        width = max(int(counts.max()) if matches else 0, 1)
+        odds_matrix = np.zeros((matches, width, len(outcomes)), dtype=np.float64)
+        flat = list(chain.from_iterable(odds_by_match))
+        bookmaker_ids = [bookmaker.get('BI') for bookmaker in flat]
+        if total:
+            try:
+                values = np.fromiter(chain.from_iterable(map(itemgetter(*outcomes), flat)), dtype=np.float64, count=total * len(outcomes))
+            except (KeyError, TypeError, ValueError):
+                values = np.array([[float(bookmaker.get(key, 0)) for key in outcomes] for bookmaker in flat], dtype=np.float64)
+            rows = np.repeat(np.arange(matches), counts)
+            columns = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            odds_matrix[rows, columns] = values.reshape(total, len(outcomes))
+        return odds_matrix, bookmaker_ids, counts
+
+    @staticmethod
+    def calculate(odds_matrix, counts, capital, min_profit_percentage=0):
+        """
+        Best prices, implied probabilities, stakes and profit for every match in one pass.
+        Returns: dict of arrays, `has_arb` being the final mask after the min_profit_percentage filter.
+        """
+        best_index = np.argmax(odds_matrix, axis=1)
+        best_odds = np.take_along_axis(odds_matrix, best_index[:, None, :], axis=1)[:, 0, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            implied = np.where(best_odds > 0, 1 / best_odds, 0)
+            total_implied = implied.sum(axis=1)
+            stakes = implied / total_implied[:, None] * capital
+            profit_amount = stakes[:, 0] * best_odds[:, 0] - capital
+            profit_percentage = profit_amount / capital * 100
+
+        offsets = np.cumsum(counts) - counts
+        has_arb = (
+            (counts >= 2)
+            & np.all(best_odds > 1, axis=1)
+            & (total_implied < 1)
+            & (total_implied > 0)
+            & np.isfinite(profit_percentage)
+            & (profit_percentage >= min_profit_percentage)
+        )
+        return {
+            'best_index': best_index,
+            'best_odds': best_odds,
+            'implied': implied,
+            'total_implied_prob': total_implied,
+            'stakes': stakes,
+            'profit_amount': profit_amount,
+            'profit_percentage': profit_percentage,
+            'offsets': offsets,
+            'has_arb': has_arb
+        }
+
+    @staticmethod
+    def arb_details(batch, bookmaker_ids, row):
+        """
+        The calculate_arbitrage style details dict for one match of a batch result.
+        """
+        best_index = batch['best_index'][row]
+        best_odds = batch['best_odds'][row]
+        stakes = batch['stakes'][row]
+        return {
+            'home_odds': float(best_odds[0]),
+            'away_odds': float(best_odds[1]),
+            'home_bookmaker_id': bookmaker_ids[batch['offsets'][row] + best_index[0]],
+            'away_bookmaker_id': bookmaker_ids[batch['offsets'][row] + best_index[1]],
+            'stake_home': round(float(stakes[0]), 2),
+            'stake_away': round(float(stakes[1]), 2),
+            'profit_amount': round(float(batch['profit_amount'][row]), 2),
+            'profit_percentage': round(float(batch['profit_percentage'][row]), 2),
+            'total_implied_prob': round(float(batch['total_implied_prob'][row]), 4)
+        }
@@ -0,0 +1,144 @@
+from configs import os, json, time, queue, datetime, Thread, Lock, atexit
+
+class LOGGER:
+    """
+    Background file logger. Callers only put records on a queue; a writer thread formats them in batches,
+    appends each batch with a single write, echoes it to the console and rotates the file by size and/or age.
+    Messages are formatted by the writer, so a logged object should not be mutated after it is logged.
+    """
+    levels = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+    instances = {}
+    instances_lock = Lock()
+
+    def __init__(self, log_file_path, level='INFO', json_lines=False, max_bytes=0, backups=5, rotate_seconds=0,
+                 console=True, flush_interval=0.5, batch_size=1000, max_pending=100000):
+        self.log_file_path = log_file_path
+        self.level = self.levels.get(str(level).upper(), 20)
+        self.json_lines = json_lines
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.rotate_seconds = rotate_seconds
+        self.console = console
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.file = None
+        self.opened_at = None
+        self.writer = Thread(target=self.write_loop, name=f'logger-{os.path.basename(log_file_path)}', daemon=True)
+        self.writer.start()
+
+    @classmethod
+    def get(cls, log_file_path, **options):
+        """
+        The shared logger of a file, created on first use with `options` (see configs for the LOG_* defaults).
+        """
+        logger = cls.instances.get(log_file_path)
+        if logger is not None:return logger
+        with cls.instances_lock:
+            if log_file_path not in cls.instances:
+                cls.instances[log_file_path] = cls(log_file_path, **options)
+            return cls.instances[log_file_path]
+
+    def enabled(self, level):
+        return self.levels.get(level, 20) >= self.level
+
+    def log(self, message, level='INFO', tag='LOG'):
+        """
+        Queues a record without touching the file. Records below the logger level are discarded here;
+        when the writer falls `max_pending` records behind, new records are dropped and counted.
+        """
+        if not self.enabled(level):return
+        try:
+            self.pending.put_nowait((time.time(), level, tag, message))
+        except queue.Full:
+            self.dropped += 1
+
+    def format(self, record):
+        created, level, tag, message = record
+        if self.json_lines:
+            return json.dumps({
+                'time': datetime.fromtimestamp(created).isoformat(timespec='milliseconds'),
+                'level': level,
+                'tag': tag,
+                'message': message if isinstance(message, (str, dict, list)) else str(message)
+            }, default=str, ensure_ascii=False)
+        current_datetime = datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
+        return f"[{current_datetime}] [{tag if level == 'INFO' else level}] {message}"
+
+    def open(self):
+        self.file = open(self.log_file_path, 'a', encoding='utf-8')
+        self.opened_at = time.time()
+
+    def should_rotate(self):
+        if self.max_bytes and self.file.tell() >= self.max_bytes:return True
+        if self.rotate_seconds and time.time() - self.opened_at >= self.rotate_seconds:return True
+        return False
+
+    def rotate(self):
+        """
+        Shifts app.log -> app.log.1 -> ... -> app.log.<backups>, dropping the oldest, and reopens the file.
+        """
+        self.file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f'{self.log_file_path}.{index}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.log_file_path}.{index + 1}')
+        if self.backups > 0:
+            os.replace(self.log_file_path, f'{self.log_file_path}.1')
+        else:
+            os.remove(self.log_file_path)
+        self.open()
+
+    def write_loop(self):
+        self.open()
+        while True:
+            try:
+                record = self.pending.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [record]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                stop = None in batch
+                records = [record for record in batch if record is not None]
+                if records:
+                    messages = [self.format(record) for record in records]
+                    self.file.write('\n'.join(messages) + '\n')
+                    self.file.flush()
+                    if self.console:
+                        print('\n'.join(str(record[3]) for record in records))
+                    if self.should_rotate():
+                        self.rotate()
+                if stop:
+                    self.file.close()
+                    return
+            except Exception as error:
+                print(f'Error writing {self.log_file_path}: {error}')
+            finally:
+                for _ in batch:
+                    self.pending.task_done()
+
+    def flush(self):
+        """
+        Blocks until every queued record is written.
+        """
+        self.pending.join()
+
+    def close(self):
+        if not self.writer.is_alive():return
+        self.pending.put(None)
+        self.writer.join()
+
+    @classmethod
+    def flush_all(cls):
+        for logger in list(cls.instances.values()):
+            if logger.writer.is_alive():
+                logger.flush()
+
+atexit.register(LOGGER.flush_all)
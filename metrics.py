@@ -0,0 +1,222 @@
+from configs import time, json, Lock, Thread, METRICS_ENABLED
+from bisect import bisect_left
+from functools import wraps
+
+class TIMER:
+    """
+    Times one call of a stage. `size` and `error` can be set inside the block; an exception escaping the
+    block is counted as an error and re-raised.
+    """
+    __slots__ = ('stage', 'labels', 'size', 'error', 'started')
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+        self.size = 0
+        self.error = False
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        METRICS.observe(self.stage, time.perf_counter() - self.started, size=self.size, error=self.error or exc_type is not None, **self.labels)
+        return False
+
+class METRICS:
+    """
+    Process-wide latency histograms with byte and error counters, one series per stage and label set
+    (e.g. stage='get_odds_data', geo='NG'; stage='http_request', proxy='1.2.3.4:8080').
+    Read them as Prometheus text (`prometheus()` or the endpoint started by `serve(port)`), or as a
+    per-iteration summary: take `snapshot()` before an iteration and pass it to `summary(since=...)` after.
+    Set METRICS_ENABLED=0 to turn every hook into a no-op.
+    """
+    enabled = METRICS_ENABLED
+    buckets = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    series = {}
+    lock = Lock()
+    server = None
+
+    @staticmethod
+    def key(stage, labels):
+        return (stage, tuple(sorted((name, str(value)) for name, value in labels.items() if value is not None)))
+
+    @classmethod
+    def observe(cls, stage, seconds, size=0, error=False, **labels):
+        if not cls.enabled:return
+        key = cls.key(stage, labels)
+        with cls.lock:
+            entry = cls.series.get(key)
+            if entry is None:
+                entry = cls.series[key] = {'count': 0, 'sum': 0.0, 'bytes': 0, 'errors': 0, 'buckets': [0] * (len(cls.buckets) + 1)}
+            entry['count'] += 1
+            entry['sum'] += seconds
+            entry['bytes'] += size
+            if error:entry['errors'] += 1
+            entry['buckets'][bisect_left(cls.buckets, seconds)] += 1
+
+    @classmethod
+    def timer(cls, stage, **labels):
+        return TIMER(stage, labels)
+
+    @classmethod
+    def instrument(cls, stage, failed=None):
+        """
+        Decorator timing every call of a function as `stage`. Exceptions count as errors, and so do results
+        for which `failed(result)` is true (e.g. a (False, 'Error ...') tuple).
+        """
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:return function(*args, **kwargs)
+                started = time.perf_counter()
+                error = True
+                try:
+                    result = function(*args, **kwargs)
+                    error = failed is not None and failed(result)
+                    return result
+                finally:
+                    cls.observe(stage, time.perf_counter() - started, error=error)
+            return wrapper
+        return decorator
+
+    @classmethod
+    def snapshot(cls):
+        with cls.lock:
+            return {key: {**entry, 'buckets': list(entry['buckets'])} for key, entry in cls.series.items()}
+
+    @classmethod
+    def reset(cls):
+        with cls.lock:
+            cls.series.clear()
+
+    @classmethod
+    def quantile(cls, buckets, share):
+        """
+        Upper bound of the bucket holding the `share` quantile (None past the last bucket).
+        """
+        total = sum(buckets)
+        if not total:return None
+        running = 0
+        for index, count in enumerate(buckets):
+            running += count
+            if running >= total * share:
+                return cls.buckets[index] if index < len(cls.buckets) else None
+        return None
+
+    @classmethod
+    def summary(cls, since=None):
+        """
+        Per-series calls, total/mean seconds, p50/p95 bucket bounds, errors and bytes, counting only what
+        was observed after the `since` snapshot. Series with no new calls are left out.
+        Returns: dict 'stage{label=value,...}' -> stats, slowest total first
+        """
+        since = since or {}
+        rows = []
+        for (stage, labels), entry in cls.snapshot().items():
+            previous = since.get((stage, labels))
+            count = entry['count'] - (previous['count'] if previous else 0)
+            if count <= 0:continue
+            seconds = entry['sum'] - (previous['sum'] if previous else 0)
+            buckets = [now - (previous['buckets'][index] if previous else 0) for index, now in enumerate(entry['buckets'])]
+            name = stage + ('{' + ','.join(f'{label}={value}' for label, value in labels) + '}' if labels else '')
+            rows.append((name, {
+                'calls': count,
+                'seconds': round(seconds, 4),
+                'mean_ms': round(seconds / count * 1000, 3),
+                'p50_le': cls.quantile(buckets, 0.5),
+                'p95_le': cls.quantile(buckets, 0.95),
+                'errors': entry['errors'] - (previous['errors'] if previous else 0),
+                'bytes': entry['bytes'] - (previous['bytes'] if previous else 0)
+            }))
+        rows.sort(key=lambda row: row[1]['seconds'], reverse=True)
+        return dict(rows)
+
+    @staticmethod
+    def format_summary(summary):
+        lines = ['Stage metrics:']
+        for name, stats in summary.items():
+            lines.append(
+                f"  {name}: {stats['calls']} calls, {stats['seconds']}s, mean {stats['mean_ms']}ms, "
+                f"p50<={stats['p50_le']}s, p95<={stats['p95_le']}s, {stats['errors']} errors, {stats['bytes'] / 1024 / 1024:.2f}MB"
+            )
+        return '\n'.join(lines)
+
+    @staticmethod
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    @classmethod
+    def prometheus(cls):
+        """
+        Every series in the Prometheus text exposition format.
+        """
+        series = cls.snapshot()
+        histogram, counters = [], {'bytes': [], 'errors': []}
+        for (stage, labels), entry in sorted(series.items()):
+            label_text = ','.join(f'{name}="{cls.escape(value)}"' for name, value in (('stage', stage),) + labels)
+            running = 0
+            for bound, count in zip(cls.buckets + ('+Inf',), entry['buckets']):
+                running += count
+                histogram.append(f'arb_stage_seconds_bucket{{{label_text},le="{bound}"}} {running}')
+            histogram.append(f'arb_stage_seconds_sum{{{label_text}}} {entry["sum"]:.6f}')
+            histogram.append(f'arb_stage_seconds_count{{{label_text}}} {entry["count"]}')
+            counters['bytes'].append(f'arb_stage_bytes_total{{{label_text}}} {entry["bytes"]}')
+            counters['errors'].append(f'arb_stage_errors_total{{{label_text}}} {entry["errors"]}')
+
+        lines = [
+            '# HELP arb_stage_seconds Latency of a scan stage.',
+            '# TYPE arb_stage_seconds histogram',
+            *histogram,
+            '# HELP arb_stage_bytes_total Bytes received or processed by a scan stage.',
+            '# TYPE arb_stage_bytes_total counter',
+            *counters['bytes'],
+            '# HELP arb_stage_errors_total Failed calls of a scan stage.',
+            '# TYPE arb_stage_errors_total counter',
+            *counters['errors']
+        ]
+        return '\n'.join(lines) + '\n'
+
+    @classmethod
+    def serve(cls, port, host='127.0.0.1'):
+        """
+        Serves /metrics (Prometheus text) and /metrics.json (summary since start) from a daemon thread.
+        Returns: (success, message)
+        """
+        try:
+            if cls.server is not None:return True, f'Metrics already served on port {cls.server.server_address[1]}'
+            from http.server import ThreadingHTTPServer
+            cls.server = ThreadingHTTPServer((host, port), cls.handler())
+            cls.server.daemon_threads = True
+            Thread(target=cls.server.serve_forever, name='metrics-endpoint', daemon=True).start()
+            return True, f'Metrics served on http://{host}:{cls.server.server_address[1]}/metrics'
+        except Exception as error:
+            return False, f'Error starting metrics endpoint: {error}'
+
+    @staticmethod
+    def handler():
+        # http.server is only imported by processes that serve metrics
+        from http.server import BaseHTTPRequestHandler
+
+        class METRICS_HANDLER(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = METRICS.prometheus(), 'text/plain; version=0.0.4; charset=utf-8'
+                elif self.path == '/metrics.json':
+                    body, content_type = json.dumps(METRICS.summary(), indent=2), 'application/json'
+                else:
+                    self.send_response(404)
+                    self.send_header('content-length', '0')
+                    self.end_headers()
+                    return
+                body = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('content-type', content_type)
+                self.send_header('content-length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return METRICS_HANDLER
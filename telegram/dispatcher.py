@@ -0,0 +1,174 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from configs import time, random, queue, traceback, Thread, Lock
+from utils import Utils
+
+class TOKEN_BUCKET:
+    """
+    Allows `rate` sends per second on average with bursts of up to `capacity`.
+    """
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """
+        Seconds until a token is available, 0 when one is available now.
+        """
+        self.refill()
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.refill()
+        self.tokens -= 1
+
+    def pause(self, seconds):
+        # A 429 means the server-side budget is spent: hold every token until retry_after has passed
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+class DISPATCHER:
+    """
+    Delivers Telegram messages from a background thread so the scanner never waits on the Bot API.
+    Messages are queued, sent through a token bucket sized for a channel's limits (20 messages a minute),
+    and whatever piled up while waiting for a token (or within `coalesce_window`) is coalesced into one
+    message of at most `max_length`.
+    Network errors and 5xx responses are retried with jittered exponential backoff, a 429 waits for the
+    `retry_after` it returns, and other errors (e.g. 400 on malformed HTML) are not retried.
+    `post(text)` makes one attempt and returns (status_code or None on network errors, retry_after, response text).
+    A message can carry an `on_delivered(delivered_at)` callback, called from the dispatcher thread with the
+    epoch time its (possibly coalesced) message was accepted, or None once it is dropped.
+    """
+    instances = {}
+    instances_lock = Lock()
+
+    def __init__(self, post, rate=20 / 60, burst=3, max_length=4000, coalesce_window=0.0, max_retries=5,
+                 base_delay=1.0, max_delay=60.0, max_pending=1000, separator='\n\n〰〰〰〰〰\n\n'):
+        self.post = post
+        self.bucket = TOKEN_BUCKET(rate, burst)
+        self.max_length = max_length
+        self.coalesce_window = coalesce_window
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.separator = separator
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.carry = None
+        self.stats = {'queued': 0, 'sent': 0, 'messages': 0, 'coalesced': 0, 'retries': 0, 'failed': 0, 'dropped': 0}
+        self.worker = Thread(target=self.send_loop, name='telegram-dispatcher', daemon=True)
+        self.worker.start()
+
+    @classmethod
+    def get(cls, key, post, **options):
+        """
+        The shared dispatcher of a bot/chat, so every scanner in the process draws on one rate limit.
+        """
+        with cls.instances_lock:
+            if key not in cls.instances:
+                cls.instances[key] = cls(post, **options)
+            return cls.instances[key]
+
+    def enqueue(self, message, on_delivered=None):
+        """
+        Queues a message for delivery and returns immediately.
+        Returns: (success, message)
+        """
+        try:
+            self.pending.put_nowait((message, on_delivered))
+            self.stats['queued'] += 1
+            return True, 'Message queued'
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False, 'Telegram queue full, message dropped'
+
+    def next_batch(self):
+        """
+        Blocks for the next message, waits for a send token and coalesces every message queued meanwhile
+        (or within `coalesce_window`) that still fits in one Telegram message.
+        """
+        if self.carry is not None:
+            messages, self.carry = [self.carry], None
+        else:
+            messages = [self.pending.get()]
+        deadline = time.monotonic() + self.coalesce_window
+        length = len(messages[0][0])
+        while True:
+            wait = max(self.bucket.wait_time(), deadline - time.monotonic())
+            try:
+                message = self.pending.get(timeout=wait) if wait > 0 else self.pending.get_nowait()
+            except queue.Empty:
+                if self.bucket.wait_time() > 0:continue
+                break
+            if length + len(self.separator) + len(message[0]) > self.max_length:
+                self.carry = message
+                break
+            messages.append(message)
+            length += len(self.separator) + len(message[0])
+
+        # A full message can leave the loop before the bucket has a token for it
+        wait = self.bucket.wait_time()
+        if wait > 0:time.sleep(wait)
+        return messages
+
+    def backoff(self, attempt):
+        # Full jitter: anywhere between 0 and the exponential cap, so retries from several bots do not align
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    @staticmethod
+    def retryable(status_code):
+        return status_code is None or status_code == 429 or status_code >= 500
+
+    def deliver(self, text):
+        for attempt in range(self.max_retries + 1):
+            self.bucket.take()
+            status_code, retry_after, response = self.post(text)
+            if status_code is not None and 200 <= status_code < 300:
+                return True, response
+            if attempt == self.max_retries or not self.retryable(status_code):
+                break
+            self.stats['retries'] += 1
+            if retry_after is not None:
+                self.bucket.pause(retry_after)
+                delay = retry_after + random.uniform(0, 1)
+            else:
+                delay = self.backoff(attempt)
+            Utils.write_log(f'Telegram send failed ({response}), retrying in {delay:.1f}s', level='WARNING')
+            time.sleep(delay)
+            wait = self.bucket.wait_time()
+            if wait > 0:time.sleep(wait)
+        return False, response
+
+    def send_loop(self):
+        while True:
+            messages = []
+            try:
+                messages = self.next_batch()
+                success, response = self.deliver(self.separator.join(message for message, _ in messages))
+                delivered_at = time.time() if success else None
+                for _, on_delivered in messages:
+                    if on_delivered is not None:on_delivered(delivered_at)
+                if success:
+                    self.stats['sent'] += 1
+                    self.stats['messages'] += len(messages)
+                    self.stats['coalesced'] += len(messages) - 1
+                else:
+                    self.stats['failed'] += len(messages)
+                    Utils.write_log(f'Dropped {len(messages)} Telegram message(s): {response}', level='ERROR')
+            except Exception as error:
+                traceback.print_exception(error)
+            finally:
+                for _ in messages:
+                    self.pending.task_done()
+
+    def flush(self):
+        """
+        Blocks until every queued message is delivered or dropped.
+        """
+        self.pending.join()
@@ -2,39 +2,86 @@ import sys,os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 
-from configs import TELEGRAM_BOT_TOKEN, TELEGRAM_CHANNEL_ID,TELEGRAM_BOT_NAME, requests, datetime, time, pytz
-from utils import Utils
+from configs import TELEGRAM_BOT_TOKEN, TELEGRAM_CHANNEL_ID,TELEGRAM_BOT_NAME, TELEGRAM_API_URL, requests, datetime, time, pytz, random
+from telegram.dispatcher import DISPATCHER
+from flashscore.sports import SPORTS
+from metrics import METRICS
 
 class MESSANGER:
-    def __init__(self):
-        pass
+    def __init__(self, dispatch=False, sport='tennis'):
+        """
+        With dispatch=True messages go through the process-wide DISPATCHER of this bot and chat:
+        send_message and the report_* methods only queue them and return at once.
+        Reports are headed with the emoji of `sport` (see SPORTS).
+        """
+        self.emoji = (SPORTS.get(sport) or {}).get('emoji', '🏅')
+        self.session = requests.Session()
+        self.dispatcher = DISPATCHER.get(f'{TELEGRAM_BOT_TOKEN}:{TELEGRAM_CHANNEL_ID}', self.post) if dispatch else None
+
+    def post(self, message, timeout=(5, 15)):
+        """
+        One sendMessage call.
+        Returns: (status_code or None on network errors, retry_after seconds on 429 or None, response text)
+        """
+        url = f"{TELEGRAM_API_URL}/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+        params = {
+            "chat_id": TELEGRAM_CHANNEL_ID,
+            "text": f"{TELEGRAM_BOT_NAME} \n\n {message}",
+            "parse_mode": "HTML"
+        }
+        try:
+            with METRICS.timer('telegram_post') as timer:
+                response = self.session.post(url, json=params, timeout=timeout)
+                timer.size = len(response.content)
+                timer.error = not response.ok
+        except requests.RequestException as error:
+            return None, None, str(error)
+
+        retry_after = None
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.json().get('parameters', {}).get('retry_after'))
+            except (ValueError, TypeError, AttributeError):
+                retry_after = float(response.headers.get('retry-after', 0)) or None
+        return response.status_code, retry_after, response.text
 
-    def send_message(self, message, is_arb=True):
+    @METRICS.instrument('send_message', failed=lambda result: not result[0])
+    def send_message(self, message, is_arb=True, on_delivered=None):
+        """
+        `on_delivered(delivered_at)` is called once Telegram accepted the message (None if it never did).
+        """
         try:
-            url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-            params = {
-                "chat_id": TELEGRAM_CHANNEL_ID,
-                "text": f"{TELEGRAM_BOT_NAME} \n\n {message}",
-                "parse_mode": "HTML"
-            }
+            if self.dispatcher is not None:
+                return self.dispatcher.enqueue(message, on_delivered=on_delivered)
+
             for attempt in range(3):
-                response = requests.post(url, json=params)
-                if response.ok:
+                status_code, retry_after, response = self.post(message)
+                if status_code is not None and 200 <= status_code < 300:
+                    if on_delivered is not None:on_delivered(time.time())
                     return True, "Message sent"
-                if response.status_code == 429:
-                    time.sleep(2 ** attempt)
-                    continue
-                return False, response.text
-            return False, "Failed after retries: Rate limit exceeded"
+                if not DISPATCHER.retryable(status_code):
+                    return False, response
+                time.sleep(retry_after if retry_after is not None else random.uniform(0, 2 ** attempt))
+            return False, f"Failed after retries: {response}"
         except Exception as error:
             return False, f"Exception in send_message: {str(error)}"
 
-    def report_arb(self,match_data, arb_details):
+    @staticmethod
+    def bookmaker_label(bookmaker):
+        """
+        HTML-safe bookmaker name. Registry entries (flashscore.bookmakers) carry it precomputed.
+        """
+        if 'display_name' in bookmaker:return bookmaker['display_name']
+        name = str(bookmaker.get('bookmaker', {}).get('name', 'Unknown'))
+        return name.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+    def report_arb(self,match_data, arb_details, on_delivered=None):
         """
         Sends arbitrage opportunity details to a Telegram chat.
         Args:
             match_data (dict): Match data containing match_id, home_player, away_player, etc.
             arb_details (dict): Arbitrage details with odds, bookmakers, stakes, and profit.
+            on_delivered (callable): Optional delivery callback, see send_message.
         Returns:
             bool: True if the message was sent successfully, False otherwise.
         """
@@ -59,17 +106,17 @@ class MESSANGER:
                 # Convert to WAT (UTC+1)
                 dt = dt.astimezone(pytz.timezone('Africa/Lagos'))
                 formatted_time = dt.strftime("%b %d, %Y %I:%M %p")
-            except (ValueError, TypeError) as e:
+            except (ValueError, TypeError):
                 formatted_time = escape_html(str(match_data['start_time']))
 
             # Format the message
             message = (
-                f"🎾 <b><u>Arbitrage Opportunity Found</u></b> \n"
+                f"{self.emoji} <b><u>Arbitrage Opportunity Found</u></b> \n"
                 f"<b>Match ID:</b> {escape_html(match_data['match_id'])}\n"
                 f"<b>Match:</b> {escape_html(match_data['home_player'])} vs {escape_html(match_data['away_player'])}\n\n"
                 f"<b>Odds:</b>\n"
-                f"  -Home: {escape_html(arb_details['home_odds'])} ({escape_html(arb_details['home_bookmaker'].get('bookmaker', {}).get('name', 'Unknown'))})\n"
-                f"  -Away: {escape_html(arb_details['away_odds'])} ({escape_html(arb_details['away_bookmaker'].get('bookmaker', {}).get('name', 'Unknown'))})\n\n"
+                f"  -Home: {escape_html(arb_details['home_odds'])} ({self.bookmaker_label(arb_details['home_bookmaker'])})\n"
+                f"  -Away: {escape_html(arb_details['away_odds'])} ({self.bookmaker_label(arb_details['away_bookmaker'])})\n\n"
                 f"<b>Stakes:</b>\n"
                 f"  -Home: {arb_details['stake_home']:.2f}\n"
                 f"  -Away: {arb_details['stake_away']:.2f}\n\n"
@@ -77,12 +124,52 @@ class MESSANGER:
                 f"<b>Time:</b> {formatted_time}"
             )
 
-            success, msg = self.send_message(message)
+            success, msg = self.send_message(message, on_delivered=on_delivered)
             if not success:raise Exception(msg)
-            return success, f"Successfully sent arb report for {match_data['match_id']} to Telegram"
+            return success, f"Successfully {'queued' if self.dispatcher else 'sent'} arb report for {match_data['match_id']} to Telegram"
         
         except Exception as error:
             return False, f"Error sending Telegram message for {match_data.get('match_id')}: {str(error)}"
+
+
+    def report_market_arb(self, match_data, market_details, on_delivered=None):
+        """
+        Sends an arbitrage opportunity on any market (set winner, totals, handicaps, 3-way) to a Telegram chat.
+        Args:
+            match_data (dict): Match data containing match_id, home_player, away_player, etc.
+            market_details (dict): CALCULATOR.calculate_market_arbitrage details with bookmakers attached.
+            on_delivered (callable): Optional delivery callback, see send_message.
+        """
+        try:
+            if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHANNEL_ID:
+                return False, "Telegram bot token or chat ID not configured"
+
+            def escape_html(text):
+                if not isinstance(text, str):
+                    text = str(text)
+                return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+            legs = "\n".join(
+                f"  -{escape_html(outcome)}: {escape_html(price)} "
+                f"({self.bookmaker_label(market_details['bookmakers'].get(outcome, {}))}) "
+                f"stake {market_details['stakes'][outcome]:.2f}"
+                for outcome, price in market_details['odds'].items()
+            )
+            message = (
+                f"{self.emoji} <b><u>Arbitrage Opportunity Found</u></b> \n"
+                f"<b>Match ID:</b> {escape_html(match_data['match_id'])}\n"
+                f"<b>Match:</b> {escape_html(match_data['home_player'])} vs {escape_html(match_data['away_player'])}\n"
+                f"<b>Market:</b> {escape_html(market_details['market'])}\n\n"
+                f"<b>Odds:</b>\n{legs}\n\n"
+                f"<b>Profit:</b> 💰 <b>{market_details['profit_percentage']:.2f}% ({market_details['profit_amount']:.2f})</b> 💰"
+            )
+
+            success, msg = self.send_message(message, on_delivered=on_delivered)
+            if not success:raise Exception(msg)
+            return success, f"Successfully {'queued' if self.dispatcher else 'sent'} market arb report for {match_data['match_id']} to Telegram"
+
+        except Exception as error:
+            return False, f"Error sending Telegram message for {match_data.get('match_id')}: {str(error)}"
         
 
 
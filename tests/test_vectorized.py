@@ -0,0 +1,46 @@
+import sys,os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+# The vectorized engine needs NumPy, which the scanner itself does not require
+pytest.importorskip('numpy')
+
+from flashscore.pricing import PRICING
+from benchmarks.bench_arbitrage import synthetic_match_odds
+
+def assert_equivalent(odds_by_match, capital, min_profit_percentage=0.5):
+    """
+    The vectorized engine must reproduce the scalar reference, decision and details, for every match.
+    """
+    batch = PRICING.calculate_arbitrage_batch(odds_by_match, capital, min_profit_percentage)
+    assert len(batch) == len(odds_by_match)
+    for odds, (batch_has_arb, batch_details) in zip(odds_by_match, batch):
+        has_arb, details = PRICING.calculate_arbitrage(odds, capital, min_profit_percentage)
+        assert batch_has_arb == has_arb, odds
+        if has_arb:
+            assert batch_details == details
+
+@pytest.mark.parametrize('bookmakers', [2, 10, 100])
+def test_batch_matches_scalar(bookmakers):
+    odds_by_match = synthetic_match_odds(matches=2000, bookmakers=bookmakers, arb_rate=0.2)
+    assert_equivalent(odds_by_match, 1000)
+
+@pytest.mark.parametrize('min_profit_percentage', [0, 0.5, 5])
+def test_min_profit_filter(min_profit_percentage):
+    odds_by_match = synthetic_match_odds(matches=500, bookmakers=20, arb_rate=0.5)
+    assert_equivalent(odds_by_match, 1000, min_profit_percentage)
+
+def test_edge_cases():
+    edge_cases = [
+        [],
+        [{'BI': '1', 'XA': 3, 'XB': 3}],
+        [{'BI': '1', 'XA': 0, 'XB': 2.5}, {'BI': '2', 'XA': 1.0, 'XB': 0}],
+        [{'BI': '1', 'XA': 2.2, 'XB': 1.5}, {'BI': '2', 'XA': 1.5, 'XB': 2.2}]
+    ]
+    assert_equivalent(edge_cases, 1000)
+
+def test_zero_capital():
+    assert_equivalent(synthetic_match_odds(matches=100, bookmakers=10, arb_rate=0.5), 0)
+
+def test_empty_batch():
+    assert PRICING.calculate_arbitrage_batch([], 1000, 0.5) == []
@@ -1,4 +1,8 @@
-from configs import *
+from configs import (
+    os, json, random, datetime, timedelta, timezone, lru_cache, logs_file, arbs_file,
+    LOG_LEVEL, LOG_JSON, LOG_MAX_BYTES, LOG_BACKUPS, LOG_ROTATE_SECONDS, LOG_CONSOLE
+)
+from logger import LOGGER
 
 root_dir = os.path.dirname(__file__)
 db_file = os.path.join(root_dir,'database.db')
@@ -50,10 +54,32 @@ class Utils:
         return data
     
     @staticmethod
-    def load_flash_bookies(country='NG'):
+    @lru_cache(maxsize=None)
+    def load_flash_bookies_file():
+        """
+        flashscore/bookies.json (geo -> bookmakers), parsed once per process. Shared, do not mutate.
+        """
         file = os.path.join(root_dir,'flashscore','bookies.json')
-        with open(file,"r") as f:data = json.load(f)
-        return [value for key,value in data.items() if key == country]
+        with open(file,"r") as f:return json.load(f)
+
+    @staticmethod
+    def parse_geos(text):
+        """
+        Parses an ODDS_GEOS list such as 'NG/NGLA,KE/,/' into [{'geo_ip', 'sub_geo_ip'}], in order and without duplicates.
+        """
+        geos = []
+        for item in str(text).split(','):
+            item = item.strip()
+            if not item:continue
+            geo_ip, _, sub_geo_ip = item.partition('/')
+            geo = {'geo_ip': geo_ip.strip().upper(), 'sub_geo_ip': sub_geo_ip.strip().upper()}
+            if geo not in geos:geos.append(geo)
+        return geos
+
+    @staticmethod
+    def load_flash_bookies(country='NG'):
+        data = Utils.load_flash_bookies_file()
+        return [data[country]] if country in data else []
 
     @staticmethod
     def generate_android_version():
@@ -105,18 +131,63 @@ class Utils:
         return random.choice(devices)
     
     @staticmethod
-    def generate_user_agent(device, count):
-        if str(device).lower() == 'android':
-            devices = Utils.generate_android_device()
-            devices = devices * (count // len(devices)) + devices[:count % len(devices)]
-            browsers = [
-                {"name":"Chrome","version":f"{random.choice([90,120])}.0.{random.choice([0,4430])}.{random.choice([0,210])}"},
-                {"name":"Firefox","version":f"{random.choice([90,121])}.0.{random.choice([0,4430])}.{random.choice([0,210])}"},
-            ]
-            browser = random.choice(browsers)
-            return f"Mozilla/5.0 (Linux; Android {Utils.generate_android_version()}; {Utils.generate_android_device()}) AppleWebKit/537.36 (KHTML, like Gecko) {browser['name']}/{browser['version']} Mobile Safari/537.36"
-        else:
-            return UserAgent(use_external_data=True)
+    def generate_android_user_agent():
+        browsers = [
+            {"name":"Chrome","version":f"{random.choice([90,120])}.0.{random.choice([0,4430])}.{random.choice([0,210])}"},
+            {"name":"Firefox","version":f"{random.choice([90,121])}.0.{random.choice([0,4430])}.{random.choice([0,210])}"},
+        ]
+        browser = random.choice(browsers)
+        return f"Mozilla/5.0 (Linux; Android {Utils.generate_android_version()}; {Utils.generate_android_device()}) AppleWebKit/537.36 (KHTML, like Gecko) {browser['name']}/{browser['version']} Mobile Safari/537.36"
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def load_user_agents():
+        """
+        The precomputed user-agent pools of universals/user_agents.json, read once per process.
+        """
+        file = os.path.join(root_dir,'universals','user_agents.json')
+        try:
+            with open(file,"r") as f:return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def user_agent_pool(device):
+        key = 'android' if str(device).lower() == 'android' else 'desktop'
+        pool = Utils.load_user_agents().get(key)
+        if pool:return tuple(pool)
+        if key == 'android':return tuple(Utils.generate_android_user_agent() for _ in range(64))
+        return ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',)
+
+    @staticmethod
+    def generate_user_agent(device, count=1):
+        """
+        Random user agent(s) for 'android' or desktop from the precomputed pool, without touching the network.
+        Returns: a user agent string, or a list of `count` of them when count > 1.
+        """
+        pool = Utils.user_agent_pool(str(device).lower())
+        if count > 1:return [random.choice(pool) for _ in range(count)]
+        return random.choice(pool)
+
+    @staticmethod
+    def save_user_agents(size=100):
+        """
+        Rebuilds universals/user_agents.json from fake_useragent's bundled browser data (no network).
+        """
+        from fake_useragent import UserAgent
+        filters = {
+            'desktop': lambda entry: entry['type'] == 'desktop' and entry['browser'] in ('Chrome', 'Firefox', 'Edge', 'Safari'),
+            'android': lambda entry: entry['os'] == 'Android' and entry['type'] == 'mobile' and entry['browser'] in ('Chrome Mobile', 'Firefox Mobile', 'Samsung Internet')
+        }
+        browsers = sorted(UserAgent().data_browsers, key=lambda entry: entry['percent'], reverse=True)
+        pools = {}
+        for key, accept in filters.items():
+            # Most common first, so the pool looks like real traffic
+            pools[key] = list(dict.fromkeys(entry['useragent'] for entry in browsers if accept(entry)))[:size]
+        file = os.path.join(root_dir,'universals','user_agents.json')
+        with open(file,"w") as f:json.dump(pools, f, indent=4)
+        return {key: len(pool) for key, pool in pools.items()}
     
     @staticmethod
     def time_diff(timestamp):
@@ -131,22 +202,28 @@ class Utils:
 
 
     @staticmethod
-    def write_log(message, log_file_path=logs_file):
-        current_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        with open(log_file_path, 'a',encoding='utf-8') as log_file:
-            log_file.write(f"[{current_datetime}] [LOG] {message}\n")
+    def logger(log_file_path, level=LOG_LEVEL):
+        return LOGGER.get(
+            log_file_path,
+            level=level,
+            json_lines=LOG_JSON,
+            max_bytes=LOG_MAX_BYTES,
+            backups=LOG_BACKUPS,
+            rotate_seconds=LOG_ROTATE_SECONDS,
+            console=LOG_CONSOLE
+        )
 
-        print(message)
+    @staticmethod
+    def write_log(message, log_file_path=logs_file, level='INFO'):
+        """
+        Queues a line for app.log; the LOGGER thread writes it. Lines below LOG_LEVEL are discarded.
+        """
+        Utils.logger(log_file_path).log(message, level=level)
 
     @staticmethod
     def write_arb(message, log_file_path=arbs_file):
-        current_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        with open(log_file_path, 'a',encoding='utf-8') as log_file:
-            log_file.write(f"[{current_datetime}] [LOG] {message}\n")
-
-        print(message)
+        # Arbs are always kept, whatever LOG_LEVEL is
+        Utils.logger(log_file_path, level='DEBUG').log(message)
 
     @staticmethod
     def check_values(values:list):
@@ -185,6 +262,23 @@ class Utils:
             return datetime.utcfromtimestamp(int(value)).strftime('%Y-%m-%d %H:%M:%S UTC')
         except (ValueError, TypeError):
             return value
+
+    @staticmethod
+    def parse_timestamp(value):
+        """
+        Converts a timestamp produced by convert_timestamp (or a raw Unix timestamp) back to epoch seconds.
+        Returns None if the value cannot be parsed.
+        """
+        if value is None:return None
+        if isinstance(value, (int, float)):return int(value)
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            pass
+        try:
+            return int(datetime.strptime(value, '%Y-%m-%d %H:%M:%S UTC').replace(tzinfo=timezone.utc).timestamp())
+        except (ValueError, TypeError):
+            return None
         
 if __name__ == '__main__':
     print(Utils.compare_date('2025-08-13T08:32:00.630Z'))